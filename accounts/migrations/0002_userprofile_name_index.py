@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:53
+
+from django.db import migrations, models
+
+
+def populate_name_index(apps, schema_editor):
+    """Preenche display_name/search_name dos perfis existentes"""
+    from accounts.name_index import normalize_name
+    
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    profiles = list(UserProfile.objects.select_related('user'))
+    for profile in profiles:
+        user = profile.user
+        full_name = f"{user.first_name} {user.last_name}".strip()
+        profile.display_name = full_name or user.username
+        profile.search_name = normalize_name(f"{full_name} {user.username}")
+    UserProfile.objects.bulk_update(profiles, ['display_name', 'search_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=300, verbose_name='Nome de Exibição'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=450, verbose_name='Nome Normalizado'),
+        ),
+        migrations.RunPython(populate_name_index, migrations.RunPython.noop),
+    ]
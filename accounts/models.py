@@ -1,6 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 class UserProfile(models.Model):
@@ -30,6 +30,11 @@ class UserProfile(models.Model):
         verbose_name="Visualização Preferida do Calendário"
     )
     
+    # Índice de nomes (mantido em save) para busca de responsáveis sem join com auth_user
+    display_name = models.CharField(max_length=300, blank=True, editable=False, verbose_name="Nome de Exibição")
+    search_name = models.CharField(max_length=450, blank=True, editable=False, db_index=True,
+                                 verbose_name="Nome Normalizado")
+    
     # Metadados
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -43,6 +48,17 @@ class UserProfile(models.Model):
         user_obj = self.user
         return f"{user_obj.get_full_name() or user_obj.username} ({self.get_user_type_display()})"  # type: ignore
     
+    def save(self, *args, **kwargs):
+        from .name_index import normalize_name
+        
+        user_obj = self.user
+        self.display_name = user_obj.get_full_name() or user_obj.username
+        self.search_name = normalize_name(f"{user_obj.get_full_name()} {user_obj.username}")
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'display_name', 'search_name'}
+        super().save(*args, **kwargs)
+    
     @property
     def is_administrator(self):
         return self.user_type == 'administrador'
@@ -86,6 +102,16 @@ def save_user_profile(sender, instance, **kwargs):
         instance.profile.save()
 
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_user_name_index(sender, instance, update_fields=None, **kwargs):
+    """Renova a lista de candidatos da busca de responsáveis (nomes, ativação, exclusão)"""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    from .name_index import bump_users_version
+    bump_users_version()
+
+
 class AccessLog(models.Model):
     """Log de acessos para auditoria"""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -0,0 +1,123 @@
+"""
+Índice de nomes de usuários para busca de responsáveis
+
+Os nomes normalizados (minúsculas, sem acentos) ficam em UserProfile.search_name
+e são carregados uma vez por processo em uma lista de candidatos, renovada quando
+algum usuário muda. Autocomplete, filtros de relatório e o formulário de eventos
+resolvem nomes sobre essa lista, sem join nem varredura da tabela auth_user.
+"""
+import threading
+import time
+import unicodedata
+from django.core.cache import cache
+
+# Carimbo compartilhado que invalida a lista de candidatos dos processos
+USERS_VERSION_KEY = 'accounts:users_version'
+
+# Similaridade mínima de trigramas para sugestões aproximadas
+TRIGRAM_THRESHOLD = 0.3
+
+_candidates = {'version': None, 'items': []}
+_lock = threading.Lock()
+
+
+def normalize_name(value):
+    """Normaliza um nome para busca: minúsculas, sem acentos e espaços únicos"""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.lower().split())
+
+
+def bump_users_version():
+    """Invalida a lista de candidatos em todos os processos"""
+    cache.set(USERS_VERSION_KEY, time.time_ns(), None)
+
+
+def _get_users_version():
+    version = cache.get(USERS_VERSION_KEY)
+    if version is None:
+        cache.add(USERS_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(USERS_VERSION_KEY, 0)
+    return version
+
+
+def _trigrams(value):
+    padded = f'  {value} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def get_user_candidates():
+    """Lista (user_id, search_name, display_name, is_active, trigramas) de todos os usuários"""
+    from .models import UserProfile
+    
+    version = _get_users_version()
+    if _candidates['version'] != version:
+        with _lock:
+            if _candidates['version'] != version:
+                rows = UserProfile.objects.values_list(
+                    'user_id', 'search_name', 'display_name', 'user__is_active'
+                )
+                _candidates['items'] = [
+                    (user_id, search_name, display_name, is_active, _trigrams(search_name))
+                    for user_id, search_name, display_name, is_active in rows
+                ]
+                _candidates['version'] = version
+    return _candidates['items']
+
+
+def search_users(term, limit=10, fuzzy=True, active_only=True):
+    """Retorna [(user_id, display_name)] ordenados por relevância
+    
+    Ordem: início de alguma palavra do nome, depois trecho contido no nome e,
+    se fuzzy, nomes semelhantes por trigramas. Usuários inativos só entram
+    com active_only=False (ex.: filtros sobre eventos antigos).
+    """
+    query = normalize_name(term)
+    if not query:
+        return []
+    
+    prefix_matches, contains_matches, fuzzy_matches = [], [], []
+    query_trigrams = _trigrams(query)
+    for user_id, search_name, display_name, is_active, trigrams in get_user_candidates():
+        if active_only and not is_active:
+            continue
+        if search_name.startswith(query) or f' {query}' in search_name:
+            prefix_matches.append((user_id, display_name))
+        elif query in search_name:
+            contains_matches.append((user_id, display_name))
+        elif fuzzy:
+            similarity = len(query_trigrams & trigrams) / len(query_trigrams | trigrams)
+            if similarity >= TRIGRAM_THRESHOLD:
+                fuzzy_matches.append((similarity, user_id, display_name))
+    
+    fuzzy_matches.sort(reverse=True)
+    results = prefix_matches + contains_matches + [(user_id, name) for _, user_id, name in fuzzy_matches]
+    return results[:limit] if limit else results
+
+
+def search_user_ids(term):
+    """IDs dos usuários cujo nome ou username contém o termo (sem acentos)"""
+    return [user_id for user_id, _ in search_users(term, limit=None, fuzzy=False, active_only=False)]
+
+
+def resolve_user_id(text):
+    """Resolve um nome digitado para um único usuário, ou None se ambíguo/inexistente"""
+    query = normalize_name(text)
+    if not query:
+        return None
+    
+    # search_name termina com o username: "nome sobrenome username"
+    exact = []
+    for user_id, search_name, _, is_active, _ in get_user_candidates():
+        if not is_active:
+            continue
+        *name_parts, username = search_name.split() or ['']
+        if query in (' '.join(name_parts), username):
+            exact.append(user_id)
+    if len(exact) == 1:
+        return exact[0]
+    
+    matches = search_users(text, limit=2, fuzzy=False)
+    if len(matches) == 1:
+        return matches[0][0]
+    return None
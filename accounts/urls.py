@@ -13,6 +13,7 @@ urlpatterns = [
     # AJAX validation endpoints
     path('validate/username/', views.validate_username_ajax, name='validate_username'),
     path('validate/email/', views.validate_email_ajax, name='validate_email'),
+    path('users/autocomplete/', views.user_autocomplete, name='user_autocomplete'),
     
     # Password Reset
     path('password-reset/', 
@@ -84,14 +84,15 @@ def can_edit_event(user: User, event) -> bool:
         return True
     
     # Gestores podem editar eventos do seu departamento ou eventos que criaram
+    # (comparação por ids, sem carregar os relacionamentos)
     if profile.is_manager:
-        return (event.department == profile.department or 
-                event.created_by == user or 
-                event.responsible_person == user)
+        return (event.department_id == profile.department_id or 
+                event.created_by_id == user.pk or 
+                event.responsible_person_id == user.pk)
     
     # Visualizadores só podem editar eventos que criaram (se tiverem permissão)
     if profile.is_viewer:
-        return event.created_by == user
+        return event.created_by_id == user.pk
     
     return False
 
@@ -111,35 +112,61 @@ def can_view_event(user: User, event) -> bool:
     
     # Gestores podem ver eventos do seu departamento
     if profile.is_manager:
-        return (event.department == profile.department or 
+        return (event.department_id == profile.department_id or 
                 event.is_public or
-                event.created_by == user or
-                event.responsible_person == user)
+                event.created_by_id == user.pk or
+                event.responsible_person_id == user.pk)
     
     # Visualizadores podem ver eventos públicos e eventos onde são responsáveis
     if profile.is_viewer:
         return (event.is_public or 
-                event.created_by == user or
-                event.responsible_person == user)
+                event.created_by_id == user.pk or
+                event.responsible_person_id == user.pk)
     
     return False
 
 
-def get_user_accessible_events(user: User):
-    """Retorna queryset de eventos que o usuário pode acessar"""
+def get_user_editable_events(user: User):
+    """Retorna queryset de eventos que o usuário pode editar (mesmas regras de can_edit_event)"""
     from events.models import Event
     from django.db.models import Q
     
+    profile = getattr(user, 'profile', None) if user.is_authenticated else None
+    if not profile:
+        return getattr(Event, 'objects').none()
+    
+    if profile.is_administrator:
+        return getattr(Event, 'objects').all()
+    
+    if profile.is_manager:
+        return getattr(Event, 'objects').filter(
+            Q(department=profile.department) | Q(created_by=user) | Q(responsible_person=user)
+        )
+    
+    if profile.is_viewer:
+        return getattr(Event, 'objects').filter(created_by=user)
+    
+    return getattr(Event, 'objects').none()
+
+
+def get_event_access_filter(user: User):
+    """Retorna o filtro (Q) das regras de acesso a eventos, ou None se o usuário vê todos
+    
+    Vale para qualquer modelo com os campos department, is_public, created_by
+    e responsible_person (eventos e registros de eventos removidos dos feeds).
+    """
+    from django.db.models import Q
+    
     if not user.is_authenticated:
-        return getattr(Event, 'objects').filter(is_public=True)
+        return Q(is_public=True)
     
     profile = getattr(user, 'profile', None)
     if not profile:
-        return getattr(Event, 'objects').filter(is_public=True)
+        return Q(is_public=True)
     
     # Administradores veem todos os eventos
     if profile.is_administrator:
-        return getattr(Event, 'objects').all()
+        return None
     
     # Gestores veem eventos do departamento
     if profile.is_manager:
@@ -147,13 +174,53 @@ def get_user_accessible_events(user: User):
         q_objects.add(Q(is_public=True), Q.OR)
         q_objects.add(Q(created_by=user), Q.OR)
         q_objects.add(Q(responsible_person=user), Q.OR)
-        return getattr(Event, 'objects').filter(q_objects).distinct()
+        return q_objects
     
     # Visualizadores veem eventos públicos e onde são responsáveis
     if profile.is_viewer:
         q_objects = Q(is_public=True)
         q_objects.add(Q(created_by=user), Q.OR)
         q_objects.add(Q(responsible_person=user), Q.OR)
-        return getattr(Event, 'objects').filter(q_objects).distinct()
+        return q_objects
+    
+    return Q(is_public=True)
+
+
+def get_user_accessible_events(user: User):
+    """Retorna queryset de eventos que o usuário pode acessar"""
+    from events.models import Event
+    
+    access_filter = get_event_access_filter(user)
+    if access_filter is None:
+        return getattr(Event, 'objects').all()
+    
+    events = getattr(Event, 'objects').filter(access_filter)
+    # Filtros com OR sobre relacionamentos podem repetir linhas
+    if len(access_filter) > 1:
+        events = events.distinct()
+    return events
+
+
+def get_access_scope_key(user: User) -> str:
+    """Retorna uma chave que identifica o conjunto de eventos visível ao usuário.
+    
+    Segue as mesmas regras de get_user_accessible_events, para que dados em
+    cache possam ser compartilhados entre usuários com o mesmo escopo.
+    """
+    if not user.is_authenticated:
+        return 'public'
+    
+    profile = getattr(user, 'profile', None)
+    if not profile:
+        return 'public'
+    
+    if profile.is_administrator:
+        return 'all'
+    
+    if profile.is_manager:
+        return f'manager:{profile.department_id}:{user.pk}'
+    
+    if profile.is_viewer:
+        return f'viewer:{user.pk}'
     
-    return getattr(Event, 'objects').filter(is_public=True)
+    return 'public'
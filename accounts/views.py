@@ -16,6 +16,7 @@ from django.views.decorators.csrf import csrf_exempt
 from .forms import UserRegistrationForm, UserProfileForm, CustomPasswordChangeForm
 from .models import UserProfile, AccessLog
 from .utils import log_user_action
+from .name_index import search_users
 
 
 def user_login(request):
@@ -249,4 +250,19 @@ def password_change_view(request):
     else:
         form = CustomPasswordChangeForm(request.user)
     
-    return render(request, 'accounts/password_change.html', {'form': form})
\ No newline at end of file
+    return render(request, 'accounts/password_change.html', {'form': form})
+
+
+@login_required
+def user_autocomplete(request):
+    """Sugestões de responsáveis por nome (prefixo, trecho ou semelhança), sem acentos"""
+    term = request.GET.get('q', '')
+    try:
+        limit = min(int(request.GET.get('limit', 10)), 50)
+    except ValueError:
+        limit = 10
+    
+    results = search_users(term, limit=limit) if len(term.strip()) >= 2 else []
+    return JsonResponse({
+        'results': [{'id': user_id, 'name': name} for user_id, name in results]
+    })
@@ -171,11 +171,40 @@ CACHES = {
         'LOCATION': 'eventosys-cache',
         'TIMEOUT': 300,  # 5 minutes default
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'MAX_ENTRIES': 10000,  # Inclui fragmentos de eventos do calendário
         }
     }
 }
 
+# Tempo de cache (segundos) dos dados de eventos. O conteúdo é invalidado
+# imediatamente pelos signals; o timeout apenas limita o uso de memória.
+EVENT_CACHE_TIMEOUTS = {
+    'calendar_data': 60 * 10,
+    'calendar_fragment': 60 * 60 * 24,
+    'ics_block': 60 * 60 * 24,
+    'event_count': 60 * 5,
+    # Feeds de calendário prontos (events.feed_store), espelho da tabela
+    # CalendarFeed: mantidos ao menos por FEED_MAX_AGE (30 min). Os feeds são
+    # regenerados pelo worker `manage.py refresh_calendar_feeds --loop 60`.
+    # Sem ele, como fallback de melhor esforço, um feed gerado há mais de
+    # 2 × FEED_MAX_AGE é regenerado por uma única requisição (trava no cache).
+    'calendar_feed': 60 * 60,
+}
+
+# Janela máxima (em dias) aceita pela API de dados do calendário
+CALENDAR_MAX_RANGE_DAYS = 62
+
+# Período máximo (em dias) e número de locais aceitos pela busca de horários livres
+AVAILABILITY_MAX_RANGE_DAYS = 186
+AVAILABILITY_MAX_LOCATIONS = 50
+
+# Eventos concluídos ou cancelados terminados há mais de N dias vão para o arquivo
+EVENT_ARCHIVE_HORIZON_DAYS = 365
+
+# Dias de retenção dos registros de remoção usados pelos feeds incrementais
+# (sync_token); tokens mais antigos são recusados e o cliente baixa o feed completo
+EVENT_FEED_TOMBSTONE_RETENTION_DAYS = 90
+
 # Logging configuration
 LOGGING = {
     'version': 1,
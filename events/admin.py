@@ -1,11 +1,18 @@
-from django.contrib import admin
+import io
+from django.contrib import admin, messages
+from django.shortcuts import redirect, render
+from django.urls import path
 from django.utils.html import format_html
 from django import forms
 from django.core.exceptions import ValidationError
 import json
+from accounts.name_index import resolve_user_id
+from .conflicts import find_conflicts, conflict_message
+from .deletion import soft_delete_events
+from .importer import EventImporter, IMPORT_COLUMNS
 from .models import (
     Department, EventType, Location, Event, 
-    EventHistory
+    EventHistory, EventSeries, EventSeriesException, ArchivedEvent, ArchivedEventHistory
     # EventDocument removed as requested
     # EventParticipant removed as requested
 )
@@ -136,6 +143,9 @@ class EventAdminForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
+        # Preenchido em clean() pelo nome digitado ou por um administrador
+        self.fields['responsible_person'].required = False
+        
         # Handle responsible person initialization
         if self.instance and self.instance.pk and hasattr(self.instance, 'responsible_person'):
             responsible = self.instance.responsible_person
@@ -183,6 +193,20 @@ class EventAdminForm(forms.ModelForm):
         responsible_text = cleaned_data.get('responsible_person_text', '')
         virtual_links = cleaned_data.get('virtual_links_multiple', [])
         
+        # Resolver o responsável pelo nome digitado (índice de nomes em memória)
+        # apenas quando nenhum usuário foi selecionado; seleção e nome divergentes são recusados
+        if responsible_text:
+            responsible_id = resolve_user_id(responsible_text)
+            current = cleaned_data.get('responsible_person')
+            if current is None:
+                if responsible_id is not None:
+                    from django.contrib.auth.models import User
+                    cleaned_data['responsible_person'] = User.objects.get(pk=responsible_id)
+            elif responsible_id is not None and current.pk != responsible_id:
+                raise ValidationError({
+                    'responsible_person_text': 'O nome informado não corresponde ao responsável selecionado.'
+                })
+        
         # Handle responsible person
         if not cleaned_data.get('responsible_person'):
             from django.contrib.auth.models import User
@@ -209,6 +233,16 @@ class EventAdminForm(forms.ModelForm):
         else:
             cleaned_data['virtual_link'] = ''
         
+        # Validate location double-booking
+        location = cleaned_data.get('location')
+        start_datetime = cleaned_data.get('start_datetime')
+        end_datetime = cleaned_data.get('end_datetime')
+        if (location and start_datetime and end_datetime and location_mode in ['presencial', 'hibrido']
+                and cleaned_data.get('status') != 'cancelado'):
+            conflicts = find_conflicts(location, start_datetime, end_datetime, exclude_id=self.instance.pk)
+            if conflicts:
+                raise ValidationError({'location': conflict_message(conflicts[0])})
+        
         return cleaned_data
     
     def save(self, commit=True):
@@ -273,6 +307,38 @@ class EventHistoryInline(admin.TabularInline):
     can_delete = False
 
 
+class EventImportForm(forms.Form):
+    """Upload de CSV para importação de eventos em lote"""
+    csv_file = forms.FileField(label="Arquivo CSV", help_text=f"Colunas: {', '.join(IMPORT_COLUMNS)}")
+    skip_invalid = forms.BooleanField(label="Importar linhas válidas mesmo se houver erros", required=False)
+    dry_run = forms.BooleanField(label="Apenas validar (não gravar)", required=False)
+
+
+class EventSeriesInline(admin.StackedInline):
+    model = EventSeries
+    extra = 0
+    max_num = 1
+    fields = ['rrule', 'ends_at']
+    readonly_fields = ['ends_at']
+
+
+class EventSeriesExceptionInline(admin.TabularInline):
+    model = EventSeriesException
+    extra = 0
+    fields = ['original_start', 'replacement', 'created_at']
+    readonly_fields = ['created_at']
+    raw_id_fields = ['replacement']
+
+
+@admin.register(EventSeries)
+class EventSeriesAdmin(admin.ModelAdmin):
+    list_display = ['event', 'rrule', 'ends_at']
+    search_fields = ['event__name', 'rrule']
+    raw_id_fields = ['event']
+    readonly_fields = ['ends_at', 'created_at', 'updated_at']
+    inlines = [EventSeriesExceptionInline]
+
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     form = EventAdminForm
@@ -314,7 +380,7 @@ class EventAdmin(admin.ModelAdmin):
         }),
     )
     
-    inlines = [EventHistoryInline]  # EventDocumentInline and EventParticipantInline removed
+    inlines = [EventSeriesInline, EventHistoryInline]  # EventDocumentInline and EventParticipantInline removed
     
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -322,6 +388,42 @@ class EventAdmin(admin.ModelAdmin):
         form._current_user = request.user
         return form
     
+    change_list_template = 'admin/events/event/change_list.html'
+    
+    def get_urls(self):
+        urls = [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv_view), name='events_event_import_csv'),
+        ]
+        return urls + super().get_urls()
+    
+    def import_csv_view(self, request):
+        """Importação de eventos em lote a partir de CSV"""
+        if not self.has_add_permission(request):
+            return redirect('admin:events_event_changelist')
+        
+        result = None
+        if request.method == 'POST':
+            form = EventImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                lines = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+                importer = EventImporter(request.user, skip_invalid=form.cleaned_data['skip_invalid'])
+                result = importer.run(lines, dry_run=form.cleaned_data['dry_run'])
+                if result.created:
+                    self.message_user(request, f"{result.created} evento(s) importado(s).", messages.SUCCESS)
+                    if not result.errors:
+                        return redirect('admin:events_event_changelist')
+        else:
+            form = EventImportForm()
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar eventos (CSV)',
+            'form': form,
+            'result': result,
+        }
+        return render(request, 'admin/events/event/import_csv.html', context)
+    
     def save_model(self, request, obj, form, change):
         if not change:  # Se é um novo objeto
             obj.created_by = request.user
@@ -329,6 +431,13 @@ class EventAdmin(admin.ModelAdmin):
             if not obj.responsible_person:
                 obj.responsible_person = request.user
         super().save_model(request, obj, form, change)
+    
+    def delete_model(self, request, obj):
+        # Exclusão lógica; a remoção definitiva é feita por purge_deleted_events
+        soft_delete_events([obj.pk])
+    
+    def delete_queryset(self, request, queryset):
+        soft_delete_events(list(queryset.values_list('pk', flat=True)))
 
 
 # EventDocumentAdmin removed as requested
@@ -351,3 +460,29 @@ class EventHistoryAdmin(admin.ModelAdmin):
 
 # EventParticipantAdmin removed as requested
 # All participant functionality has been eliminated from the admin interface
+
+
+class ArchivedEventHistoryInline(admin.TabularInline):
+    model = ArchivedEventHistory
+    extra = 0
+    readonly_fields = ['field_name', 'old_value', 'new_value', 'changed_at', 'changed_by']
+    can_delete = False
+
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(admin.ModelAdmin):
+    """Arquivo somente leitura (preenchido pelo comando archive_events)"""
+    list_display = ['name', 'event_type', 'start_datetime', 'department', 'status', 'archived_at']
+    list_filter = ['status', 'event_type', 'department']
+    search_fields = ['name', 'description']
+    date_hierarchy = 'start_datetime'
+    inlines = [ArchivedEventHistoryInline]
+    
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in self.model._meta.fields]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
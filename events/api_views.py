@@ -0,0 +1,127 @@
+"""
+JSON REST API for events
+
+Read endpoint for integrations: the client picks the fields it needs with
+``fields=`` and only those columns are fetched with ``.values()`` (foreign
+keys as ids, names from the denormalized display columns, no joins). Filters
+mirror ``EventFilterForm`` and pages use the same (start_datetime, id) cursor
+as the event list.
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_GET
+from accounts.utils import get_user_accessible_events, get_access_scope_key
+from .cache import get_data_version, make_params_key, get_cache_timeout
+from .conditional import conditional_event_data
+from .forms import EventFilterForm
+from .pagination import keyset_paginate, get_cached_count
+from .views import filter_events, EVENT_FILTER_PARAMS, EVENTS_PER_PAGE
+
+# Campos expostos pela API -> coluna lida com .values()
+API_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'event_type': 'event_type_id',
+    'event_type_label': 'event_type_label',
+    'event_type_color': 'event_type_color',
+    'start_datetime': 'start_datetime',
+    'end_datetime': 'end_datetime',
+    'location_mode': 'location_mode',
+    'location': 'location_id',
+    'location_display': 'location_display',
+    'virtual_link': 'virtual_link',
+    'target_audience': 'target_audience',
+    'responsible_person': 'responsible_person_id',
+    'responsible_name': 'responsible_name',
+    'department': 'department_id',
+    'department_name': 'department_name',
+    'status': 'status',
+    'description': 'description',
+    'observations': 'observations',
+    'is_public': 'is_public',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+# Campos retornados quando fields= não é informado
+DEFAULT_API_FIELDS = ('id', 'name', 'start_datetime', 'end_datetime', 'status')
+
+# Colunas sempre lidas: posição do cursor de paginação
+CURSOR_COLUMNS = ('id', 'start_datetime')
+
+MAX_API_PER_PAGE = 100
+
+
+def parse_api_fields(value):
+    """Campos pedidos em fields= (separados por vírgula); ValueError se houver campo desconhecido"""
+    fields = [field.strip() for field in (value or '').split(',') if field.strip()]
+    if not fields:
+        return DEFAULT_API_FIELDS
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {', '.join(unknown)}.")
+    return tuple(dict.fromkeys(fields))
+
+
+def parse_per_page(value):
+    """Itens por página (1 a MAX_API_PER_PAGE); ValueError se inválido"""
+    if not value:
+        return EVENTS_PER_PAGE
+    per_page = int(value)
+    if not 1 <= per_page <= MAX_API_PER_PAGE:
+        raise ValueError
+    return per_page
+
+
+@login_required
+@require_GET
+@gzip_page
+@conditional_event_data('events_rest_api')
+def events_rest_api(request):
+    """Lista de eventos em JSON com seleção de campos e paginação por cursor
+
+    Parâmetros:
+        fields: campos retornados (padrão: DEFAULT_API_FIELDS)
+        event_type, department, status, responsible_person, start_date,
+        end_date, search: mesmos filtros da listagem de eventos
+        cursor: next_cursor/previous_cursor da página anterior
+        per_page: itens por página (máximo MAX_API_PER_PAGE)
+        count: "1" para incluir o total de eventos filtrados
+    """
+    try:
+        fields = parse_api_fields(request.GET.get('fields'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e), 'fields': list(API_FIELDS)}, status=400)
+    try:
+        per_page = parse_per_page(request.GET.get('per_page'))
+    except ValueError:
+        return JsonResponse({'error': f'per_page deve estar entre 1 e {MAX_API_PER_PAGE}.'}, status=400)
+
+    form = EventFilterForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Filtros inválidos.', 'errors': form.errors}, status=400)
+
+    queryset = filter_events(get_user_accessible_events(request.user), form)
+
+    total_count = None
+    if request.GET.get('count') == '1':
+        params_key = make_params_key(request.GET, EVENT_FILTER_PARAMS)
+        count_key = f'events:count:{get_data_version()}:{get_access_scope_key(request.user)}:{params_key}'
+        total_count = get_cached_count(queryset, count_key, get_cache_timeout('event_count'))
+
+    # Apenas as colunas pedidas (mais as do cursor), sem instanciar modelos
+    columns = dict.fromkeys(CURSOR_COLUMNS + tuple(API_FIELDS[field] for field in fields))
+    page_obj = keyset_paginate(queryset.values(*columns), request.GET.get('cursor'), per_page, total_count)
+
+    data = {
+        'count': len(page_obj),
+        'next_cursor': page_obj.next_cursor,
+        'previous_cursor': page_obj.previous_cursor,
+        'events': [{field: row[API_FIELDS[field]] for field in fields} for row in page_obj],
+    }
+    if total_count is not None:
+        data['total_count'] = total_count
+
+    # Saída compacta (sem espaços), comprimida com gzip quando o cliente aceita
+    return JsonResponse(data, json_dumps_params={'separators': (',', ':')})
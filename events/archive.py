@@ -0,0 +1,105 @@
+"""
+Hot/cold archival of old events
+
+Concluded and cancelled events that ended before the archive horizon are
+copied, with their history, into ArchivedEvent/ArchivedEventHistory and
+removed from the main table, keeping events_event and its indexes small.
+Reports union the archive only when the requested period reaches it.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from .cache import bump_data_version
+from .models import Event, EventHistory, ArchivedEvent, ArchivedEventHistory
+
+# Status que podem ser arquivados
+ARCHIVABLE_STATUSES = ('concluido', 'cancelado')
+
+# Chave do fim do evento arquivado mais recente (limite do arquivo)
+ARCHIVE_BOUNDARY_KEY = 'events:archive_boundary'
+
+EVENT_COLUMNS = [field.attname for field in ArchivedEvent._meta.concrete_fields if field.attname != 'archived_at']
+HISTORY_COLUMNS = [field.attname for field in EventHistory._meta.concrete_fields if field.attname != 'id']
+
+
+def get_archive_horizon_days():
+    """Idade (em dias desde o término) a partir da qual eventos são arquivados"""
+    return getattr(settings, 'EVENT_ARCHIVE_HORIZON_DAYS', 365)
+
+
+def archivable_events(now=None, horizon_days=None):
+    """Eventos concluídos ou cancelados que terminaram antes do horizonte
+
+    Eventos-modelo de séries recorrentes ficam na tabela principal, pois
+    suas ocorrências são expandidas a partir deles.
+    """
+    now = now or timezone.now()
+    horizon_days = get_archive_horizon_days() if horizon_days is None else horizon_days
+    return Event.objects.filter(
+        status__in=ARCHIVABLE_STATUSES,
+        end_datetime__lt=now - timedelta(days=horizon_days),
+        series__isnull=True,
+    )
+
+
+def archive_events(now=None, horizon_days=None, batch_size=500):
+    """Move os eventos arquiváveis para o arquivo, em lotes; retorna a quantidade movida"""
+    candidates = archivable_events(now, horizon_days)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            ids = list(candidates.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            ArchivedEvent.objects.bulk_create([
+                ArchivedEvent(**values)
+                for values in Event.objects.filter(pk__in=ids).values(*EVENT_COLUMNS)
+            ])
+            ArchivedEventHistory.objects.bulk_create([
+                ArchivedEventHistory(**values)
+                for values in EventHistory.objects.filter(event_id__in=ids).values(*HISTORY_COLUMNS)
+            ], batch_size=batch_size)
+            Event.objects.filter(pk__in=ids).delete()
+        archived += len(ids)
+
+    if archived:
+        cache.delete(ARCHIVE_BOUNDARY_KEY)
+        bump_data_version()
+    return archived
+
+
+def get_archive_boundary():
+    """Data de término do evento arquivado mais recente (None se o arquivo está vazio)"""
+    boundary = cache.get(ARCHIVE_BOUNDARY_KEY)
+    if boundary is None:
+        boundary = ArchivedEvent.objects.aggregate(latest=Max('end_datetime'))['latest'] or False
+        cache.set(ARCHIVE_BOUNDARY_KEY, boundary, None)
+    return boundary or None
+
+
+def archive_reaches(start_date):
+    """Indica se um período iniciado em start_date (date ou None) alcança o arquivo"""
+    boundary = get_archive_boundary()
+    if boundary is None:
+        return False
+    return start_date is None or start_date <= timezone.localtime(boundary).date()
+
+
+def get_user_accessible_archived_events(user):
+    """Eventos arquivados visíveis ao usuário (mesmas regras de get_user_accessible_events)"""
+    objects = ArchivedEvent.objects
+    profile = getattr(user, 'profile', None) if user.is_authenticated else None
+    if not profile:
+        return objects.filter(is_public=True)
+    if profile.is_administrator:
+        return objects.all()
+    if profile.is_manager:
+        return objects.filter(
+            Q(department=profile.department) | Q(is_public=True) | Q(created_by=user) | Q(responsible_person=user)
+        )
+    if profile.is_viewer:
+        return objects.filter(Q(is_public=True) | Q(created_by=user) | Q(responsible_person=user))
+    return objects.filter(is_public=True)
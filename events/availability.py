@@ -0,0 +1,83 @@
+"""
+Free-slot finder for locations
+
+All bookings of the requested locations in the period are loaded with a
+single query, ordered by (location, start_datetime), together with the
+occurrences of the recurring series active in the period, and each location
+is swept once across its working-hour windows to emit the free gaps.
+"""
+from datetime import datetime, timedelta
+from django.utils import timezone
+from .conflicts import bookings, is_exclusive, occurrence_bookings
+
+
+def working_windows(range_start, range_end, work_start, work_end, weekdays):
+    """Janelas [início, fim) de expediente contidas no período, em ordem
+
+    Args:
+        work_start, work_end: horários (time) do expediente, no fuso local
+        weekdays: dias da semana considerados (0 = segunda-feira)
+    """
+    day = timezone.localtime(range_start).date()
+    last_day = timezone.localtime(range_end).date()
+    while day <= last_day:
+        if day.weekday() in weekdays:
+            window_start = max(timezone.make_aware(datetime.combine(day, work_start)), range_start)
+            window_end = min(timezone.make_aware(datetime.combine(day, work_end)), range_end)
+            if window_start < window_end:
+                yield window_start, window_end
+        day += timedelta(days=1)
+
+
+def _free_intervals(busy, windows, min_duration):
+    """Varre as reservas (ordenadas pelo início) e devolve os intervalos livres"""
+    free = []
+    first = 0
+    for window_start, window_end in windows:
+        # Reservas encerradas antes da janela não voltam a ser consideradas
+        while first < len(busy) and busy[first][1] <= window_start:
+            first += 1
+
+        cursor = window_start
+        position = first
+        while position < len(busy) and busy[position][0] < window_end:
+            booking_start, booking_end = busy[position]
+            if booking_start > cursor and booking_start - cursor >= min_duration:
+                free.append((cursor, booking_start))
+            cursor = max(cursor, booking_end)
+            position += 1
+
+        if window_end > cursor and window_end - cursor >= min_duration:
+            free.append((cursor, window_end))
+    return free
+
+
+def find_free_slots(locations, range_start, range_end, min_duration, work_start, work_end,
+                    weekdays=range(5)):
+    """Intervalos livres de cada local no período
+
+    Returns:
+        dict: location.pk -> lista de (início, fim) livres com duração mínima
+    """
+    windows = list(working_windows(range_start, range_end, work_start, work_end, set(weekdays)))
+
+    exclusive_ids = [location.pk for location in locations if is_exclusive(location)]
+    busy = {location.pk: [] for location in locations}
+    rows = bookings().filter(
+        location_id__in=exclusive_ids
+    ).overlapping(range_start, range_end).order_by(
+        'location_id', 'start_datetime'
+    ).values_list('location_id', 'start_datetime', 'end_datetime')
+    for location_id, start, end in rows:
+        busy[location_id].append((start, end))
+    occurrences = occurrence_bookings(exclusive_ids, range_start, range_end)
+    for occurrence in occurrences:
+        busy[occurrence.location_id].append((occurrence.start_datetime, occurrence.end_datetime))
+    if occurrences:
+        for intervals in busy.values():
+            intervals.sort()
+
+    return {
+        location.pk: _free_intervals(busy[location.pk], windows, min_duration)
+        for location in locations
+    }
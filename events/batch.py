@@ -0,0 +1,307 @@
+"""
+Batch creation and update of events from a JSON array
+
+Every item is validated with ``EventForm`` (the same rules as the create and
+edit pages), plus a check for location double-booking between items of the
+same batch. Valid items are written in one transaction with ``bulk_create``
+and ``bulk_update``; the history rows and notifications that the
+per-instance signals would produce are written in bulk, one notification
+pass per type for the whole batch.
+"""
+import uuid
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from accounts.utils import has_permission, get_user_editable_events
+from notifications.services import NotificationService
+from .bulk import STATUS_NOTIFICATIONS
+from .cache import bump_data_version
+from .conflicts import check_slots
+from .forms import EventForm
+from .feed_store import mark_feeds_dirty
+from .fragments import build_calendar_fragments
+from .models import Event, EventHistory, EventSeries
+from .signals import TRACKED_FIELDS
+from .sync import record_event_changes
+
+# Limite de itens por requisição
+MAX_BATCH_ITEMS = 500
+
+# Campos gravados nas atualizações (campos do formulário, visibilidade e colunas de exibição)
+UPDATE_FIELDS = (
+    *EventForm.Meta.fields, 'is_public', 'updated_at',
+    *(column for columns in Event.DISPLAY_COLUMNS.values() for column in columns),
+)
+
+
+class BatchItem:
+    """Item do lote: dados recebidos, formulário e resultado"""
+
+    def __init__(self, index, data):
+        self.index = index
+        self.data = data
+        self.event_id = None
+        self.form = None
+        self.status = None  # created, updated, unchanged, denied, invalid
+        self.errors = {}
+
+    @property
+    def is_valid(self):
+        return self.status is None
+
+    def reject(self, status, errors=None):
+        self.status = status
+        self.errors = errors or {}
+
+    def as_dict(self):
+        result = {'index': self.index, 'status': self.status}
+        if self.event_id:
+            result['id'] = self.event_id
+        if self.errors:
+            result['errors'] = self.errors
+        return result
+
+
+class BatchResult:
+    """Resultado de um lote"""
+
+    def __init__(self, items):
+        self.items = items
+        self.applied = False
+
+    @property
+    def has_errors(self):
+        return any(item.status in ('denied', 'invalid') for item in self.items)
+
+    def count(self, status):
+        return sum(item.status == status for item in self.items)
+
+    def as_dict(self):
+        return {
+            'applied': self.applied,
+            'created': self.count('created'),
+            'updated': self.count('updated'),
+            'results': [item.as_dict() for item in self.items],
+        }
+
+
+def _form_values(form):
+    """Valores iniciais do formulário (como exibidos na página de edição)"""
+    return {name: form[name].value() for name in form.fields}
+
+
+def _display_name(user):
+    return user.get_full_name() or user.username
+
+
+def _tracked_values(event):
+    """Valores dos campos monitorados no histórico (como em track_event_changes)"""
+    return {field: getattr(event, field, None) for field in TRACKED_FIELDS}
+
+
+def _saved_values(event):
+    """Valores gravados dos campos do formulário (inclui os que não entram no histórico)"""
+    return {field: getattr(event, Event._meta.get_field(field).attname) for field in EventForm.Meta.fields}
+
+
+def _changes(old_values, event):
+    changes = []
+    for field, field_name in TRACKED_FIELDS.items():
+        old_value, new_value = old_values[field], getattr(event, field, None)
+        if old_value != new_value:
+            changes.append(EventHistory(
+                event_id=event.pk,
+                field_name=field_name,
+                old_value=str(old_value) if old_value is not None else '',
+                new_value=str(new_value) if new_value is not None else '',
+            ))
+    return changes
+
+
+def apply_event_batch(user, payload, skip_invalid=False):
+    """Valida e grava os itens do lote
+
+    Args:
+        user: usuário que faz as alterações (permissões, criador e histórico)
+        payload: lista de dicts com os campos do EventForm; itens com "id" são atualizações
+        skip_invalid: grava os itens válidos mesmo se houver itens com erro
+
+    Raises:
+        ValueError: se payload não for uma lista de 1 a MAX_BATCH_ITEMS itens
+    """
+    if not isinstance(payload, list) or not 1 <= len(payload) <= MAX_BATCH_ITEMS:
+        raise ValueError(f'Envie uma lista de 1 a {MAX_BATCH_ITEMS} eventos.')
+
+    items = [BatchItem(index, data) for index, data in enumerate(payload)]
+    result = BatchResult(items)
+    can_create = has_permission(user, 'create_event')
+
+    # Eventos atualizados (com permissão) e responsáveis informados, uma consulta cada
+    update_ids = set()
+    for item in items:
+        if not isinstance(item.data, dict):
+            item.reject('invalid', {'__all__': ['Formato inválido.']})
+        elif item.data.get('id'):
+            try:
+                item.event_id = str(uuid.UUID(str(item.data['id'])))
+            except ValueError:
+                item.reject('invalid', {'id': ['Identificador de evento inválido.']})
+                continue
+            if item.event_id in update_ids:
+                # Os itens partiriam da mesma instância do evento
+                item.reject('invalid', {'id': ['Evento repetido no lote.']})
+                continue
+            update_ids.add(item.event_id)
+        elif not can_create:
+            item.reject('denied', {'__all__': ['Você não tem permissão para criar eventos.']})
+
+    editable = {
+        str(event.pk): event
+        for event in get_user_editable_events(user).filter(pk__in=update_ids).select_related(
+            'event_type', 'location', 'responsible_person', 'department'
+        )
+    }
+    responsible_ids = {
+        item.data['responsible_person'] for item in items
+        if item.is_valid and isinstance(item.data.get('responsible_person'), int)
+    }
+    responsibles = User.objects.in_bulk(responsible_ids)
+
+    old_values, old_saved = {}, {}
+    for item in items:
+        if not item.is_valid:
+            continue
+        data = {key: value for key, value in item.data.items() if key != 'id'}
+        if item.event_id:
+            event = editable.get(item.event_id)
+            if event is None:
+                item.reject('denied', {'__all__': ['Evento inexistente ou sem permissão de edição.']})
+                continue
+            old_values[item.event_id] = _tracked_values(event)
+            old_saved[item.event_id] = _saved_values(event)
+            # Atualização parcial: campos ausentes mantêm os valores atuais
+            values = _form_values(EventForm(instance=event, user=user))
+        else:
+            event = None
+            # Mesmos valores iniciais da página de criação (responsável, departamento, status)
+            values = _form_values(EventForm(user=user))
+        if 'responsible_person' in data and 'responsible_person_text' not in data:
+            responsible = responsibles.get(data['responsible_person'])
+            values['responsible_person_text'] = _display_name(responsible) if responsible else ''
+        values.update(data)
+
+        item.form = EventForm(values, instance=event, user=user)
+        if not item.form.is_valid():
+            item.reject('invalid', item.form.errors.get_json_data())
+
+    _check_clashes([item for item in items if item.is_valid])
+
+    if result.has_errors and not skip_invalid:
+        for item in items:
+            if item.is_valid:
+                item.status = 'valid'
+        return result
+
+    _apply(user, [item for item in items if item.is_valid], old_values, old_saved)
+    result.applied = True
+    return result
+
+
+def _check_clashes(items):
+    """Rejeita itens que reservam o mesmo local no mesmo horário que outro item do lote"""
+    candidates = []
+    for item in items:
+        data = item.form.cleaned_data
+        if (data.get('location') and data.get('location_mode') in ['presencial', 'hibrido']
+                and data.get('status') != 'cancelado'):
+            candidates.append(item)
+    if len(candidates) < 2:
+        return
+
+    slots = [
+        {
+            'location': item.form.cleaned_data['location'],
+            'start': item.form.cleaned_data['start_datetime'],
+            'end': item.form.cleaned_data['end_datetime'],
+            'exclude': item.form.instance.pk,
+        }
+        for item in candidates
+    ]
+    # Reservas já gravadas foram verificadas pelo EventForm
+    for item, check in zip(candidates, check_slots(slots)):
+        if check['clashes']:
+            others = ', '.join(str(candidates[other].index) for other in check['clashes'])
+            item.reject('invalid', {'__all__': [f'O local também é reservado pelo(s) item(ns) {others} do lote.']})
+
+
+def _apply(user, items, old_values, old_saved):
+    """Grava os itens válidos, o histórico e as notificações em lote
+
+    Um item é alterado se qualquer campo do formulário mudou; TRACKED_FIELDS
+    define apenas as linhas de histórico.
+    """
+    now = timezone.now()
+    created, updated, status_changed = [], [], []
+    history = []
+    departments = set()
+
+    for item in items:
+        event = item.form.save(commit=False)
+        # bulk_create e bulk_update não chamam save()
+        event.refresh_display_fields()
+        departments.add(event.department_id)
+        if item.event_id:
+            changes = _changes(old_values[item.event_id], event)
+            if not changes and _saved_values(event) == old_saved[item.event_id]:
+                item.status = 'unchanged'
+                continue
+            event.updated_at = now
+            departments.add(old_values[item.event_id]['department'].pk)
+            item.status = 'updated'
+            updated.append(event)
+            history.extend(changes)
+            if any(change.field_name == TRACKED_FIELDS['status'] for change in changes):
+                status_changed.append(event)
+        else:
+            event.created_by = user
+            item.status = 'created'
+            item.event_id = str(event.pk)
+            created.append(event)
+            history.append(EventHistory(
+                event_id=event.pk,
+                field_name='Evento Criado',
+                old_value='',
+                new_value=f'Evento "{event.name}" criado (lote)',
+            ))
+
+    for entry in history:
+        entry.changed_by = user
+
+    previous = {}
+    with transaction.atomic():
+        if updated:
+            # O que as alterações tiram dos feeds incrementais, comparado aos valores gravados
+            previous = Event.objects.select_related('series').in_bulk([event.pk for event in updated])
+            record_event_changes((previous[event.pk], event) for event in updated)
+        Event.objects.bulk_create(created, batch_size=MAX_BATCH_ITEMS)
+        Event.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=MAX_BATCH_ITEMS)
+        EventHistory.objects.bulk_create(history, batch_size=MAX_BATCH_ITEMS)
+        # Término das séries cujo evento-modelo mudou de horário (como refresh_series_end)
+        for series in EventSeries.objects.filter(event__in=updated).select_related('event'):
+            series.event = next(event for event in updated if event.pk == series.event_id)
+            series.save(update_fields=['ends_at', 'updated_at'])
+
+    if not created and not updated:
+        return
+
+    # Operações em lote não disparam os sinais: invalida caches e gera os fragmentos aqui
+    bump_data_version(department_ids=departments)
+    mark_feeds_dirty(created + updated + list(previous.values()))
+    build_calendar_fragments(created + updated)
+
+    NotificationService.create_bulk_event_notifications(created, 'event_created', sender=user)
+    NotificationService.create_bulk_event_notifications(updated, 'event_updated', sender=user)
+    for status, notification_type in STATUS_NOTIFICATIONS.items():
+        NotificationService.create_bulk_event_notifications(
+            [event for event in status_changed if event.status == status], notification_type
+        )
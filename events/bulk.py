@@ -0,0 +1,138 @@
+"""
+Bulk edits of selected events
+
+A change set (status, department, visibility) is applied to many events
+with one UPDATE. Permissions and current values come from a single query
+and the history rows and notifications that the per-instance signals
+would produce are written in bulk.
+"""
+import uuid
+from django.db import transaction
+from django.utils import timezone
+from accounts.utils import get_user_editable_events
+from notifications.services import NotificationService
+from .cache import bump_data_version
+from .feed_store import mark_feeds_dirty
+from .fragments import rebuild_calendar_fragments
+from .models import Event, EventHistory
+from .signals import TRACKED_FIELDS
+from .sync import record_tombstones
+
+# Campos que podem ser alterados em lote
+BULK_FIELDS = ('status', 'department', 'is_public')
+
+# Notificações extras por novo status (mesmas de handle_status_changes)
+STATUS_NOTIFICATIONS = {
+    'cancelado': 'event_cancelled',
+    'concluido': 'event_ended',
+}
+
+
+class BulkUpdateResult:
+    """Resultado de uma edição em lote"""
+
+    def __init__(self):
+        self.updated = []
+        self.unchanged = []
+        self.denied = []
+
+
+def _display(field, row):
+    """Valor exibido no histórico (como em track_event_changes)"""
+    if field == 'department':
+        return row['department__name'] or ''
+    return str(row[field])
+
+
+def bulk_update_events(user, event_ids, changes):
+    """Aplica changes ({campo: valor}) aos eventos selecionados que o usuário pode editar
+
+    Args:
+        user: usuário que faz a alteração (permissões e histórico)
+        event_ids: ids dos eventos selecionados (ValueError se algum for inválido)
+        changes: valores para os campos de BULK_FIELDS (department como Department)
+    """
+    result = BulkUpdateResult()
+    changes = {field: value for field, value in changes.items() if field in BULK_FIELDS}
+    event_ids = {str(uuid.UUID(str(event_id))) for event_id in event_ids}
+    if not changes or not event_ids:
+        result.unchanged = sorted(event_ids)
+        return result
+
+    new_values = {
+        field: ({'department__name': value.name} if field == 'department' else {field: value})
+        for field, value in changes.items()
+    }
+    columns = {'department': 'department_id'}
+    new_raw = {columns.get(field, field): getattr(value, 'pk', value) for field, value in changes.items()}
+    # Colunas de exibição desnormalizadas acompanham o departamento
+    display = Event.display_values('department', changes['department']) if 'department' in changes else {}
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Permissão e valores atuais em uma única consulta
+        rows = get_user_editable_events(user).filter(pk__in=event_ids).values(
+            'id', 'status', 'department_id', 'department__name', 'is_public', 'created_by_id', 'responsible_person_id'
+        )
+        history = []
+        status_changed = []
+        hidden = []
+        feed_scopes = []
+        departments = {new_raw.get('department_id')}
+        for row in rows:
+            event_changes = [
+                field for field in changes
+                if row[columns.get(field, field)] != new_raw[columns.get(field, field)]
+            ]
+            if not event_changes:
+                result.unchanged.append(str(row['id']))
+                continue
+            result.updated.append(row['id'])
+            # Feeds que exibiam o evento e os que passam a exibi-lo
+            feed_scopes.extend((row, {**row, **new_raw}))
+            departments.add(row['department_id'])
+            if 'status' in event_changes:
+                status_changed.append(row['id'])
+            if 'department' in event_changes or 'is_public' in event_changes:
+                hidden.append(row['id'])
+            history.extend(
+                EventHistory(
+                    event_id=row['id'],
+                    field_name=TRACKED_FIELDS[field],
+                    old_value=_display(field, row),
+                    new_value=_display(field, new_values[field]),
+                    changed_by=user,
+                )
+                for field in event_changes
+            )
+
+        if hidden:
+            # Eventos que saem de feeds (departamento ou visibilidade), com os valores anteriores
+            record_tombstones(Event.objects.filter(pk__in=hidden).select_related('series'), 'hidden')
+        if result.updated:
+            Event.objects.filter(pk__in=result.updated).update(updated_at=now, **new_raw, **display)
+            EventHistory.objects.bulk_create(history, batch_size=500)
+
+    found = {str(event_id) for event_id in result.updated} | set(result.unchanged)
+    result.denied = sorted(event_ids - found)
+    if not result.updated:
+        return result
+
+    # UPDATE não dispara os sinais: invalida caches e renova os fragmentos aqui
+    bump_data_version(department_ids=departments)
+    mark_feeds_dirty(feed_scopes)
+    updated = Event.objects.filter(pk__in=result.updated)
+    rebuild_calendar_fragments(updated)
+
+    events = list(updated.only(
+        'id', 'name', 'start_datetime', 'status', 'department_id', 'responsible_person_id', 'created_by_id'
+    ))
+    NotificationService.create_bulk_event_notifications(events, 'event_updated', sender=user)
+    notification_type = STATUS_NOTIFICATIONS.get(changes.get('status'))
+    if notification_type and status_changed:
+        NotificationService.create_bulk_event_notifications(
+            [event for event in events if event.pk in status_changed], notification_type
+        )
+
+    result.updated = [str(event_id) for event_id in result.updated]
+    return result
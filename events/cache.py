@@ -0,0 +1,89 @@
+"""
+Cache helpers for event data served to the calendar and APIs
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+# Prefixo das chaves de carimbos de versão dos dados de eventos
+VERSION_KEY_PREFIX = 'events:version:'
+
+
+def get_version(name):
+    """Retorna o carimbo de versão atual identificado por name"""
+    key = VERSION_KEY_PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        # Primeiro acesso (ou cache reiniciado): cria um carimbo novo.
+        # cache.add evita sobrescrever um carimbo criado por outra requisição.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_version(name):
+    """Renova o carimbo de versão identificado por name"""
+    version = time.time_ns()
+    cache.set(VERSION_KEY_PREFIX + name, version, None)
+    return version
+
+
+def get_data_version():
+    """Carimbo global: muda a cada alteração de eventos ou cadastros relacionados"""
+    return get_version('data')
+
+
+def bump_data_version(department_ids=None):
+    """Invalida todos os dados em cache derivados de eventos
+
+    Também renova o carimbo dos departamentos afetados; sem department_ids
+    (alterações em lote de departamentos desconhecidos), o de todos eles.
+    """
+    version = bump_version('data')
+    if department_ids is None:
+        cache.set(VERSION_KEY_PREFIX + 'departments', version, None)
+    else:
+        cache.set_many({
+            f'{VERSION_KEY_PREFIX}department:{department_id}': version
+            for department_id in department_ids if department_id is not None
+        }, None)
+    return version
+
+
+def get_department_version(department_id):
+    """Carimbo dos eventos de um departamento: momento da última alteração que o afetou"""
+    keys = [f'{VERSION_KEY_PREFIX}department:{department_id}', VERSION_KEY_PREFIX + 'departments']
+    versions = cache.get_many(keys)
+    if keys[1] not in versions:
+        # Sem carimbo geral (cache reiniciado): parte do carimbo global
+        versions[keys[1]] = get_data_version()
+        cache.add(keys[1], versions[keys[1]], None)
+    return max(versions.values())
+
+
+def get_related_version():
+    """Carimbo dos cadastros exibidos junto aos eventos (tipo, local, departamento, usuário)"""
+    return get_version('related')
+
+
+def bump_related_version():
+    """Invalida dados em cache que exibem nomes de cadastros relacionados"""
+    return bump_version('related')
+
+
+def make_params_key(params, names):
+    """Gera uma chave estável a partir dos parâmetros relevantes da requisição"""
+    parts = [f"{name}={params.get(name, '')}" for name in sorted(names)]
+    return hashlib.sha1('&'.join(parts).encode('utf-8')).hexdigest()
+
+
+def make_etag(*parts):
+    """Gera um ETag forte a partir das partes informadas"""
+    raw = ':'.join(str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def get_cache_timeout(name, default=300):
+    """Obtém o tempo de cache configurado em settings.EVENT_CACHE_TIMEOUTS"""
+    return getattr(settings, 'EVENT_CACHE_TIMEOUTS', {}).get(name, default)
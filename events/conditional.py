@@ -0,0 +1,94 @@
+"""
+Conditional GET for event data endpoints
+
+Responses are validated against the event data-version stamps, which are
+``time.time_ns()`` values renewed whenever events change: the global stamp,
+or the per-department stamps when the request filters by department, plus
+the stamp of the related records (names shown next to the events). Requests
+carrying If-None-Match / If-Modified-Since are answered with 304 before the
+view body runs.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from django.contrib import messages
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from accounts.utils import get_access_scope_key
+from .cache import get_data_version, get_department_version, get_related_version, make_etag
+
+
+def _data_stamps(request, department_param, department_id=None):
+    """Carimbos dos dados exibidos: por departamento, se a requisição filtra por departamento"""
+    department_ids = sorted({value for value in request.GET.getlist(department_param) if value}) \
+        if department_param else []
+    if department_id is not None:
+        # Departamento na URL (feeds)
+        department_ids = [str(department_id)]
+    if department_ids and all(value.isdigit() for value in department_ids):
+        stamps = [get_department_version(int(value)) for value in department_ids]
+    else:
+        stamps = [get_data_version()]
+    stamps.append(get_related_version())
+    return stamps
+
+
+def _scope(request, per_user):
+    """Parte do validador que identifica quem vê a resposta"""
+    if per_user:
+        # Páginas HTML exibem o usuário e o token CSRF (get_token garante o segredo em CSRF_COOKIE)
+        get_token(request)
+        return f"user:{request.user.pk}:{request.META.get('CSRF_COOKIE', '')}"
+    return get_access_scope_key(request.user)
+
+
+def get_validators(request, name, department_param='department', per_user=False, time_bucket=None,
+                   department_id=None):
+    """(ETag, Last-Modified) da resposta, calculados sem consultar eventos
+
+    Retorna (None, None) quando a resposta não deve ser validada (mensagens
+    pendentes a exibir em páginas HTML).
+    """
+    if not hasattr(request, '_conditional_validators'):
+        validators = (None, None)
+        if not (per_user and len(messages.get_messages(request))):
+            stamps = _data_stamps(request, department_param, department_id)
+            if time_bucket:
+                # Conteúdo que depende do horário atual expira a cada time_bucket segundos
+                stamps.append(int(time.time()) // time_bucket * time_bucket * 10 ** 9)
+            query = '&'.join(f'{key}={",".join(values)}' for key, values in sorted(request.GET.lists()))
+            etag = make_etag(name, *stamps, _scope(request, per_user), request.path, query)
+            last_modified = datetime.fromtimestamp(max(stamps) / 10 ** 9, tz=dt_timezone.utc)
+            validators = (etag, last_modified)
+        request._conditional_validators = validators
+    return request._conditional_validators
+
+
+def conditional_event_data(name, department_param='department', per_user=False, time_bucket=None):
+    """Decorator: GET condicional (ETag/Last-Modified) pelos carimbos de dados de eventos
+
+    Args:
+        name: identificador da resposta no ETag
+        department_param: parâmetro GET com o(s) departamento(s) filtrado(s)
+        per_user: a resposta é específica do usuário (páginas HTML)
+        time_bucket: segundos de validade de respostas que dependem do horário atual
+    """
+    def etag_func(request, *args, **kwargs):
+        return get_validators(request, name, department_param, per_user, time_bucket)[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return get_validators(request, name, department_param, per_user, time_bucket)[1]
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.has_header('ETag'):
+                # Força o navegador a revalidar a cada navegação
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
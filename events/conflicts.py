@@ -0,0 +1,230 @@
+"""
+Location double-booking detection
+
+Bookings of a location are looked up through the composite index
+(location, start_datetime, end_datetime). The scan is bounded on both sides
+of start_datetime using the longest booking duration, so each check is an
+index seek plus the few bookings that can actually overlap the slot. The
+virtual occurrences of recurring series are not stored, so the series
+active in the checked window are expanded and treated as bookings too.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import F, Max
+from .cache import get_data_version, get_cache_timeout
+from .models import Event
+from .recurrence import expand_occurrences
+
+# Status que não ocupam o local
+NON_BLOCKING_STATUSES = ('cancelado',)
+
+# Tipos de local que comportam eventos simultâneos
+SHARED_LOCATION_TYPES = ('virtual',)
+
+# Campos devolvidos para cada reserva conflitante
+BOOKING_FIELDS = ('id', 'name', 'location_id', 'start_datetime', 'end_datetime')
+
+
+def bookings():
+    """Eventos que ocupam algum local"""
+    return Event.objects.filter(location__isnull=False).exclude(status__in=NON_BLOCKING_STATUSES)
+
+
+def get_max_booking_duration():
+    """Maior duração entre as reservas (em cache por versão dos dados)"""
+    key = f'events:conflicts:max_duration:{get_data_version()}'
+    duration = cache.get(key)
+    if duration is None:
+        duration = bookings().aggregate(
+            longest=Max(F('end_datetime') - F('start_datetime'))
+        )['longest'] or timedelta(0)
+        cache.set(key, duration, get_cache_timeout('event_count'))
+    return duration
+
+
+def _booking_window(queryset, start, end):
+    """Restringe o queryset às reservas que podem se sobrepor a [start, end)"""
+    return queryset.filter(
+        start_datetime__gt=start - get_max_booking_duration(),
+        start_datetime__lt=end,
+        end_datetime__gt=start,
+    )
+
+
+def occurrence_bookings(location_ids, range_start, range_end, exclude_id=None):
+    """Ocorrências virtuais das séries que ocupam os locais no intervalo
+
+    Ocorrências de exclude_id (evento-modelo em edição) são ignoradas, como o próprio evento.
+    """
+    templates = bookings().filter(location_id__in=location_ids)
+    if exclude_id:
+        templates = templates.exclude(pk=exclude_id)
+    return expand_occurrences(templates, range_start, range_end)
+
+
+def is_exclusive(location):
+    """Indica se o local não admite eventos simultâneos"""
+    return location is not None and location.name not in SHARED_LOCATION_TYPES
+
+
+def find_conflicts(location, start, end, exclude_id=None):
+    """Reservas do local (eventos e ocorrências de séries) que se sobrepõem a [start, end), pelo início"""
+    if not is_exclusive(location):
+        return []
+    conflicts = _booking_window(bookings().filter(location=location), start, end)
+    if exclude_id:
+        conflicts = conflicts.exclude(pk=exclude_id)
+    conflicts = list(conflicts) + occurrence_bookings([location.pk], start, end, exclude_id)
+    conflicts.sort(key=lambda booking: booking.start_datetime)
+    return conflicts
+
+
+def conflict_message(conflict):
+    """Mensagem de validação para uma reserva conflitante"""
+    start = conflict.start_datetime
+    end = conflict.end_datetime
+    return (
+        f"O local já está reservado para \"{conflict.name}\" "
+        f"({start:%d/%m/%Y %H:%M} - {end:%d/%m/%Y %H:%M})."
+    )
+
+
+class BookingIndex:
+    """Índice em memória das reservas por local, ordenadas pelo início
+
+    Carregado com uma única consulta para todos os locais e o período de um
+    lote de horários (mais a expansão das séries ativas no período); cada
+    verificação é uma busca binária no local.
+    """
+
+    def __init__(self, location_ids, range_start, range_end):
+        self.max_duration = get_max_booking_duration()
+        rows = _booking_window(
+            bookings().filter(location_id__in=location_ids), range_start, range_end
+        ).order_by('location_id', 'start_datetime').values(*BOOKING_FIELDS)
+
+        self._rows = {}
+        for row in rows:
+            self._rows.setdefault(row['location_id'], []).append(row)
+        occurrences = occurrence_bookings(location_ids, range_start, range_end)
+        for occurrence in occurrences:
+            # Ocorrências identificadas pelo evento-modelo (exclude também as ignora)
+            self._rows.setdefault(occurrence.location_id, []).append(
+                {field: getattr(occurrence, field) for field in BOOKING_FIELDS}
+            )
+        if occurrences:
+            for location_rows in self._rows.values():
+                location_rows.sort(key=lambda row: row['start_datetime'])
+        self._starts = {
+            location_id: [row['start_datetime'] for row in location_rows]
+            for location_id, location_rows in self._rows.items()
+        }
+
+    def overlapping(self, location_id, start, end, exclude_id=None):
+        """Reservas do local que se sobrepõem a [start, end)"""
+        starts = self._starts.get(location_id, [])
+        rows = self._rows.get(location_id, [])
+        first = bisect_right(starts, start - self.max_duration)
+        last = bisect_left(starts, end)
+        return [
+            row for row in rows[first:last]
+            if row['end_datetime'] > start and str(row['id']) != str(exclude_id)
+        ]
+
+
+def find_clashes(slots):
+    """Sobreposições entre os próprios horários (varredura por local, sem consultas)
+
+    Args:
+        slots: lista de dicts com location (Location), start e end
+
+    Returns:
+        list: para cada horário, índices ordenados dos outros horários no mesmo local
+    """
+    clashes = [[] for _ in slots]
+    by_location = {}
+    for i, slot in enumerate(slots):
+        if is_exclusive(slot['location']):
+            by_location.setdefault(slot['location'].pk, []).append(i)
+    for indexes in by_location.values():
+        indexes.sort(key=lambda i: slots[i]['start'])
+        active = []
+        for i in indexes:
+            active = [j for j in active if slots[j]['end'] > slots[i]['start']]
+            for j in active:
+                clashes[i].append(j)
+                clashes[j].append(i)
+            active.append(i)
+    for indexes in clashes:
+        indexes.sort()
+    return clashes
+
+
+def check_slots(slots, with_clashes=True):
+    """Verifica uma lista de horários propostos
+
+    Args:
+        slots: lista de dicts com location (Location), start, end e exclude (opcional)
+        with_clashes: False omite a verificação entre os próprios horários
+            (feita por find_clashes quando os horários são verificados em lotes)
+
+    Returns:
+        list: para cada horário, dict com available, conflicts (reservas existentes)
+        e clashes (índices de outros horários do mesmo lote no mesmo local)
+    """
+    results = [{'available': True, 'conflicts': [], 'clashes': []} for _ in slots]
+    exclusive = [index for index, slot in enumerate(slots) if is_exclusive(slot['location'])]
+    if not exclusive:
+        return results
+
+    index = BookingIndex(
+        {slots[i]['location'].pk for i in exclusive},
+        min(slots[i]['start'] for i in exclusive),
+        max(slots[i]['end'] for i in exclusive),
+    )
+
+    for i in exclusive:
+        slot = slots[i]
+        results[i]['conflicts'] = index.overlapping(
+            slot['location'].pk, slot['start'], slot['end'], slot.get('exclude')
+        )
+
+    if with_clashes:
+        for result, clashes in zip(results, find_clashes(slots)):
+            result['clashes'] = clashes
+
+    for result in results:
+        result['available'] = not result['conflicts'] and not result['clashes']
+    return results
+
+    index = BookingIndex(
+        {slots[i]['location'].pk for i in exclusive},
+        min(slots[i]['start'] for i in exclusive),
+        max(slots[i]['end'] for i in exclusive),
+    )
+
+    for i in exclusive:
+        slot = slots[i]
+        results[i]['conflicts'] = index.overlapping(
+            slot['location'].pk, slot['start'], slot['end'], slot.get('exclude')
+        )
+
+    # Sobreposição entre os próprios horários do lote (varredura por local)
+    by_location = {}
+    for i in exclusive:
+        by_location.setdefault(slots[i]['location'].pk, []).append(i)
+    for indexes in by_location.values():
+        indexes.sort(key=lambda i: slots[i]['start'])
+        active = []
+        for i in indexes:
+            active = [j for j in active if slots[j]['end'] > slots[i]['start']]
+            for j in active:
+                results[i]['clashes'].append(j)
+                results[j]['clashes'].append(i)
+            active.append(i)
+
+    for result in results:
+        result['clashes'].sort()
+        result['available'] = not result['conflicts'] and not result['clashes']
+    return results
@@ -6,6 +6,7 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 from accounts.utils import get_user_accessible_events, has_permission
 from events.models import Event, EventType, Department
+from events.conditional import conditional_event_data
 from accounts.models import User, AccessLog
 from notifications.models import Notification
 import json
@@ -49,6 +50,11 @@ def monitoring_dashboard(request):
         return render(request, 'dashboard/access_denied.html')
 
 
+# Métricas que dependem do horário atual são revalidadas a cada minuto
+METRICS_REVALIDATE_SECONDS = 60
+
+
+@conditional_event_data('dashboard_metrics', department_param=None, time_bucket=METRICS_REVALIDATE_SECONDS)
 def dashboard_metrics_api(request):
     """API para métricas do dashboard em tempo real"""
     try:
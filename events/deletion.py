@@ -0,0 +1,80 @@
+"""
+Soft delete of events and chunked purge
+
+Deleting an event only stamps ``deleted_at``, which the default manager
+hides immediately; the notification views hide the event's notifications
+by the same column. ``purge_deleted_events`` (run in the background by the
+purge_deleted_events command) later removes the notifications and history
+of those events in small chunks, each in its own short transaction, and
+then the event row, so no request holds a long write lock on SQLite.
+"""
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification
+from .cache import bump_data_version
+from .models import Event, EventHistory
+from .feed_store import mark_feeds_dirty
+from .sync import record_tombstones
+
+# Linhas dependentes removidas por transação
+PURGE_CHUNK_SIZE = 200
+
+# Modelos com muitas linhas por evento, removidos em lotes antes do evento
+CHUNKED_RELATED_MODELS = (Notification, EventHistory)
+
+
+def soft_delete_events(event_ids):
+    """Marca os eventos como excluídos com um UPDATE; retorna a quantidade marcada
+
+    As notificações dos eventos ficam ocultas e são removidas junto com o
+    histórico por purge_deleted_events. Até essa remoção, os eventos marcados continuam
+    referenciando tipo, local, departamento e usuários (on_delete=PROTECT):
+    excluir esses cadastros levanta ProtectedError enquanto houver eventos
+    excluídos aguardando a purga.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Saída dos feeds incrementais, com os valores atuais (e as ocorrências das séries)
+        events = list(Event.objects.filter(pk__in=event_ids).select_related('series'))
+        record_tombstones(events, 'deleted')
+        count = Event.objects.filter(pk__in=event_ids).update(deleted_at=now, updated_at=now)
+    if count:
+        # UPDATE não dispara os sinais: invalida os caches e os feeds aqui
+        bump_data_version()
+        mark_feeds_dirty(events)
+    return count
+
+
+def deleted_events(older_than=None):
+    """Eventos excluídos que aguardam a remoção definitiva"""
+    events = Event.all_objects.filter(deleted_at__isnull=False)
+    if older_than is not None:
+        events = events.filter(deleted_at__lte=timezone.now() - older_than)
+    return events
+
+
+def _delete_in_chunks(queryset, chunk_size):
+    """Remove as linhas do queryset em lotes de chunk_size (uma transação curta por lote)"""
+    model = queryset.model
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        model.objects.filter(pk__in=ids).delete()
+
+
+def purge_deleted_events(chunk_size=PURGE_CHUNK_SIZE, older_than=None):
+    """Remove definitivamente os eventos excluídos e suas linhas dependentes
+
+    Returns:
+        int: quantidade de eventos removidos
+    """
+    purged = 0
+    for event_id in list(deleted_events(older_than).values_list('id', flat=True)):
+        for model in CHUNKED_RELATED_MODELS:
+            _delete_in_chunks(model.objects.filter(event_id=event_id), chunk_size)
+        # Restam apenas a série e suas exceções (poucas linhas)
+        with transaction.atomic():
+            deleted, _ = Event.all_objects.filter(pk=event_id, deleted_at__isnull=False).delete()
+        purged += bool(deleted)
+    return purged
@@ -0,0 +1,197 @@
+"""
+Materialized calendar feeds
+
+Feed bodies are generated in the background and stored in ``CalendarFeed``
+rows (mirrored in the cache), so subscriber requests serve a ready body
+without querying events. Event changes mark as dirty the feeds that showed
+or now show the event: the public feed, its department feed and the
+personal feeds of the users who can see it. The refresh_calendar_feeds
+command regenerates dirty feeds, and feeds older than ``FEED_MAX_AGE``
+(the window, alarms and DTSTAMP depend on the current time); run it as a
+worker (``manage.py refresh_calendar_feeds --loop 60``) or schedule it every
+minute. As a best-effort fallback when the worker stops, a feed older than
+``FEED_STALE_AFTER`` is regenerated by a single request (guarded by a cache
+lock) while concurrent requests keep serving the stored body.
+"""
+import hashlib
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from .cache import get_cache_timeout
+from .integrations import CalendarFeedIntegration
+from .models import CalendarFeed
+from .sync import SCOPE_FIELDS, make_sync_token
+
+# Idade máxima de um feed sem alterações antes de ser regenerado
+FEED_MAX_AGE = timedelta(minutes=30)
+
+# Idade a partir da qual uma requisição regenera o feed (worker parado)
+FEED_STALE_AFTER = 2 * FEED_MAX_AGE
+
+# Validade da trava da regeneração feita por requisição (segundos)
+FEED_REFRESH_LOCK_TIMEOUT = 60 * 5
+
+PUBLIC_FEED_KEY = 'public'
+
+# Campos do feed servidos às requisições (e guardados no cache)
+ENTRY_FIELDS = ('body', 'etag', 'sync_token', 'token', 'filename', 'generated_at')
+
+
+def department_feed_key(department_id):
+    return f'department:{department_id}'
+
+
+def user_feed_key(user_id):
+    return f'user:{user_id}'
+
+
+def feed_cache_key(key):
+    return f'events:calendar_feed:{key}'
+
+
+def _entry(feed):
+    entry = {field: getattr(feed, field) for field in ENTRY_FIELDS}
+    entry['body'] = bytes(entry['body'])
+    return entry
+
+
+def _cache_entry(key, entry):
+    cache.set(feed_cache_key(key), entry, get_cache_timeout('calendar_feed', 60))
+
+
+def get_stored_feed(key):
+    """Feed pronto (dict com ENTRY_FIELDS) ou None se ainda não foi gerado
+
+    Feeds gerados há mais de FEED_STALE_AFTER (worker parado) são regenerados
+    por uma única requisição, que obtém a trava no cache; as demais continuam
+    recebendo o feed gravado. Fallback de melhor esforço: com o worker ativo,
+    nenhuma requisição chega a regenerar o feed.
+    """
+    entry = cache.get(feed_cache_key(key))
+    if entry is None:
+        feed = CalendarFeed.objects.filter(pk=key).only(*ENTRY_FIELDS).first()
+        if feed is None:
+            return None
+        entry = _entry(feed)
+        _cache_entry(key, entry)
+    if entry['generated_at'] < timezone.now() - FEED_STALE_AFTER:
+        entry = _refresh_stale_feed(key) or entry
+    return entry
+
+
+def _refresh_stale_feed(key):
+    """Regenera o feed se nenhuma outra requisição o estiver regenerando; retorna o feed novo ou None"""
+    lock = f'{feed_cache_key(key)}:lock'
+    if not cache.add(lock, True, FEED_REFRESH_LOCK_TIMEOUT):
+        return None
+    try:
+        feed = CalendarFeed.objects.filter(pk=key).select_related('department', 'user__profile').defer('body').first()
+        if feed is None:
+            return None
+        refresh_feed(feed)
+        return _entry(feed)
+    finally:
+        cache.delete(lock)
+
+
+def build_feed(feed):
+    """Gera o conteúdo do feed com os eventos e o acesso atuais"""
+    from .feed_views import generate_user_token
+
+    # Token gerado antes da leitura dos eventos (alterações durante a leitura são reenviadas)
+    feed.sync_token = make_sync_token()
+    if feed.kind == 'user':
+        user = feed.user
+        profile = getattr(user, 'profile', None)
+        feed.sees_all = bool(profile and profile.is_administrator)
+        feed.department_id = profile.department_id if profile and profile.is_manager else None
+        feed.token = generate_user_token(user)
+        feed.filename = f'eventosys_user_{user.username}.ics'
+        body = CalendarFeedIntegration.generate_user_calendar_feed(user, include_private=True)
+    elif feed.kind == 'department':
+        feed.filename = f'eventosys_dept_{feed.department.name.lower()}.ics'
+        body = CalendarFeedIntegration.generate_department_calendar_feed(feed.department)
+    else:
+        feed.filename = 'eventosys_public.ics'
+        body = CalendarFeedIntegration.generate_public_calendar_feed()
+    feed.body = b''.join(body)
+    feed.etag = f'"{hashlib.sha1(feed.body).hexdigest()}"'
+    feed.generated_at = timezone.now()
+    return feed
+
+
+def materialize_feed(key, kind, department=None, user=None):
+    """Gera e grava um feed ainda não materializado (primeira assinatura); retorna o feed pronto"""
+    feed = build_feed(CalendarFeed(key=key, kind=kind, department=department, user=user))
+    feed.save()
+    entry = _entry(feed)
+    _cache_entry(key, entry)
+    return entry
+
+
+def refresh_feed(feed):
+    """Regenera um feed gravado
+
+    Marcações feitas durante a geração são mantidas: o feed continua
+    desatualizado e é regenerado na próxima passada.
+    """
+    started = timezone.now()
+    build_feed(feed)
+    CalendarFeed.objects.filter(pk=feed.pk).update(
+        sees_all=feed.sees_all, department_id=feed.department_id, token=feed.token, filename=feed.filename,
+        body=feed.body, etag=feed.etag, sync_token=feed.sync_token, generated_at=feed.generated_at,
+    )
+    CalendarFeed.objects.filter(pk=feed.pk, dirty_since__lte=started).update(dirty_since=None)
+    _cache_entry(feed.pk, _entry(feed))
+
+
+def refresh_calendar_feeds(max_age=FEED_MAX_AGE):
+    """Regenera os feeds desatualizados e os expirados; retorna a quantidade regenerada"""
+    feeds = CalendarFeed.objects.filter(
+        Q(dirty_since__isnull=False) | Q(generated_at__lt=timezone.now() - max_age)
+    ).select_related('department', 'user__profile').defer('body').order_by(
+        F('dirty_since').asc(nulls_last=True), 'generated_at'
+    )
+    refreshed = 0
+    for feed in feeds:
+        refresh_feed(feed)
+        refreshed += 1
+    return refreshed
+
+
+def _scope(item):
+    return item if isinstance(item, dict) else {field: getattr(item, field) for field in SCOPE_FIELDS}
+
+
+def mark_feeds_dirty(events):
+    """Marca como desatualizados os feeds que exibem os eventos
+
+    Args:
+        events: eventos, ou dicts com SCOPE_FIELDS, com os valores atuais e,
+            se mudaram, também os anteriores (feeds que deixam de exibi-los)
+    """
+    public_departments, departments, users = set(), set(), set()
+    for scope in map(_scope, events):
+        departments.add(scope['department_id'])
+        users.update((scope['created_by_id'], scope['responsible_person_id']))
+        if scope['is_public']:
+            public_departments.add(scope['department_id'])
+    if not departments:
+        return 0
+
+    feeds = Q(kind='user') & (Q(sees_all=True) | Q(department_id__in=departments) | Q(user_id__in=users))
+    if public_departments:
+        # Eventos públicos aparecem em todos os feeds pessoais
+        feeds |= Q(kind__in=('public', 'user')) | Q(kind='department', department_id__in=public_departments)
+    return CalendarFeed.objects.filter(feeds).update(dirty_since=timezone.now())
+
+
+def mark_user_feeds_dirty(user_ids):
+    """Marca os feeds pessoais dos usuários (perfil ou permissões alterados)"""
+    return CalendarFeed.objects.filter(kind='user', user_id__in=user_ids).update(dirty_since=timezone.now())
+
+
+def mark_all_feeds_dirty():
+    """Marca todos os feeds (cadastros exibidos nos eventos alterados)"""
+    return CalendarFeed.objects.update(dirty_since=timezone.now())
@@ -1,56 +1,141 @@
 """
 Calendar feed views for external calendar subscriptions
+
+Full feeds are served from the materialized bodies kept up to date by the
+refresh_calendar_feeds command (see ``events.feed_store``).
 """
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, StreamingHttpResponse, Http404
 from django.shortcuts import get_object_or_404, render
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.utils import timezone
-from django.views.decorators.cache import cache_page
-from django.views.decorators.http import require_GET
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, condition
 from django.contrib.sites.models import Site
-from datetime import timedelta
 import hashlib
 
 # Direct import of Event class
 from events.models import Event, Department
 from events.integrations import CalendarFeedIntegration, GoogleCalendarIntegration, OutlookIntegration
 from accounts.utils import get_user_accessible_events
+from events.conditional import get_validators
+from events.feed_store import (
+    PUBLIC_FEED_KEY, department_feed_key, user_feed_key, get_stored_feed, materialize_feed,
+)
+from events.sync import InvalidSyncToken, make_sync_token, parse_sync_token
+
+
+# Validade (segundos) dos feeds no cliente: conteúdo com alarmes e janela relativos ao horário atual
+USER_FEED_MAX_AGE = 1800
+PUBLIC_FEED_MAX_AGE = 3600
+
+
+def _stored_feed(request, key, token=None):
+    """Feed pronto da requisição (None em requisições incrementais ou se ainda não foi gerado)"""
+    if not hasattr(request, '_stored_feed'):
+        entry = None if request.GET.get('sync_token') else get_stored_feed(key)
+        # Feeds pessoais: o token da URL é conferido com o do feed gravado
+        if entry is not None and entry['token'] != (token or ''):
+            entry = None
+        request._stored_feed = entry
+    return request._stored_feed
+
+
+def feed_condition(name, feed_key, department_kwarg=None, time_bucket=None):
+    """
+    Decorator: GET condicional pelo ETag e pela data de geração do feed pronto;
+    requisições incrementais usam os carimbos de dados de eventos
+    """
+    def validators(request, kwargs):
+        if request.GET.get('sync_token'):
+            department_id = kwargs.get(department_kwarg) if department_kwarg else None
+            return get_validators(request, name, None, time_bucket=time_bucket, department_id=department_id)
+        entry = _stored_feed(request, feed_key(**kwargs), kwargs.get('token'))
+        return (entry['etag'], entry['generated_at']) if entry else (None, None)
+    
+    return condition(
+        etag_func=lambda request, *args, **kwargs: validators(request, kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: validators(request, kwargs)[1],
+    )
+
+
+def _stored_feed_response(entry, max_age):
+    """Resposta com o feed pronto, sem consultar eventos"""
+    response = HttpResponse(entry['body'], content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{entry["filename"]}"'
+    response['Cache-Control'] = f'max-age={max_age}'
+    response['X-Sync-Token'] = entry['sync_token']
+    # Também na primeira requisição, quando o feed é gerado depois da verificação condicional
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['generated_at'].timestamp())
+    return response
+
+
+def _delta_feed_response(request, generate_feed, filename, max_age):
+    """
+    Apenas as alterações desde o ``sync_token`` da requisição
+    
+    O token da resposta (cabeçalho X-Sync-Token) é gerado antes da leitura
+    dos eventos; tokens inválidos ou expirados recebem 410 e o cliente volta
+    a baixar o feed completo.
+    """
+    try:
+        since = parse_sync_token(request.GET['sync_token'])
+    except InvalidSyncToken:
+        return HttpResponse('Invalid or expired sync token', status=410, content_type='text/plain')
+    
+    sync_token = make_sync_token()
+    response = StreamingHttpResponse(generate_feed(since=since), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = f'max-age={max_age}'
+    response['X-Sync-Token'] = sync_token
+    return response
 
 
 @require_GET
-@cache_page(60 * 30)  # Cache for 30 minutes
+@feed_condition('user_calendar_feed', lambda user_id, token: user_feed_key(user_id), time_bucket=USER_FEED_MAX_AGE)
 def user_calendar_feed(request, user_id, token):
     """
     Personal calendar feed for a specific user
     Requires authentication token for security
     
+    Served from the materialized feed; the user is only loaded for the
+    first request and for incremental (sync_token) requests.
+    
     URL: /events/calendar/feed/user/<user_id>/<token>/
     """
     try:
-        user = get_object_or_404(User, id=user_id)
-        
-        # Verify token
-        expected_token = generate_user_token(user)
-        if token != expected_token:
-            raise Http404("Invalid token")
-        
-        # Generate calendar feed
-        calendar = CalendarFeedIntegration.generate_user_calendar_feed(user, include_private=True)
+        entry = _stored_feed(request, user_feed_key(user_id), token)
+        if entry is None:
+            user = get_object_or_404(User, id=user_id)
+            
+            # Verify token
+            expected_token = generate_user_token(user)
+            if token != expected_token:
+                raise Http404("Invalid token")
+            
+            if request.GET.get('sync_token'):
+                return _delta_feed_response(
+                    request,
+                    lambda since: CalendarFeedIntegration.generate_user_calendar_feed(
+                        user, include_private=True, since=since
+                    ),
+                    f'eventosys_user_{user.username}.ics',
+                    USER_FEED_MAX_AGE,
+                )
+            entry = materialize_feed(user_feed_key(user_id), 'user', user=user)
         
-        # Return iCalendar response
-        response = HttpResponse(calendar.to_ical(), content_type='text/calendar; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="eventosys_user_{user.username}.ics"'
-        response['Cache-Control'] = 'max-age=1800'  # 30 minutes
-        
-        return response
+        return _stored_feed_response(entry, USER_FEED_MAX_AGE)
         
     except Exception as e:
         raise Http404("Calendar feed not found")
 
 
 @require_GET
-@cache_page(60 * 60)  # Cache for 1 hour
+@feed_condition(
+    'department_calendar_feed', department_feed_key, department_kwarg='department_id',
+    time_bucket=PUBLIC_FEED_MAX_AGE,
+)
 def department_calendar_feed(request, department_id):
     """
     Public calendar feed for a specific department
@@ -58,24 +143,27 @@ def department_calendar_feed(request, department_id):
     URL: /events/calendar/feed/department/<department_id>/
     """
     try:
-        department = get_object_or_404(Department, id=department_id)
-        
-        # Generate calendar feed
-        calendar = CalendarFeedIntegration.generate_department_calendar_feed(department)
+        entry = _stored_feed(request, department_feed_key(department_id))
+        if entry is None:
+            department = get_object_or_404(Department, id=department_id)
+            
+            if request.GET.get('sync_token'):
+                return _delta_feed_response(
+                    request,
+                    lambda since: CalendarFeedIntegration.generate_department_calendar_feed(department, since=since),
+                    f'eventosys_dept_{department.name.lower()}.ics',
+                    PUBLIC_FEED_MAX_AGE,
+                )
+            entry = materialize_feed(department_feed_key(department_id), 'department', department=department)
         
-        # Return iCalendar response
-        response = HttpResponse(calendar.to_ical(), content_type='text/calendar; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="eventosys_dept_{department.name.lower()}.ics"'
-        response['Cache-Control'] = 'max-age=3600'  # 1 hour
-        
-        return response
+        return _stored_feed_response(entry, PUBLIC_FEED_MAX_AGE)
         
     except Exception as e:
         raise Http404("Department calendar feed not found")
 
 
 @require_GET
-@cache_page(60 * 60)  # Cache for 1 hour
+@feed_condition('public_calendar_feed', lambda: PUBLIC_FEED_KEY, time_bucket=PUBLIC_FEED_MAX_AGE)
 def public_calendar_feed(request):
     """
     Public calendar feed for all public events
@@ -83,39 +171,16 @@ def public_calendar_feed(request):
     URL: /events/calendar/feed/public/
     """
     try:
-        # Get public events
-        events = Event.objects.filter(is_public=True)  # type: ignore
-        
-        # Filter future events (next 6 months)
-        now = timezone.now()
-        six_months = now + timedelta(days=180)
-        events = events.filter(
-            start_datetime__gte=now,
-            start_datetime__lte=six_months
-        ).select_related('event_type', 'location', 'responsible_person', 'department')
-        
-        # Create calendar
-        from icalendar import Calendar
-        cal = Calendar()
-        cal.add('prodid', '-//EventoSys//Eventos Públicos//PT')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        cal.add('method', 'PUBLISH')
-        cal.add('x-wr-calname', 'EventoSys - Eventos Públicos')
-        cal.add('x-wr-caldesc', 'Calendário público de eventos institucionais')
-        cal.add('x-wr-timezone', 'America/Sao_Paulo')
-        
-        # Add events
-        for event in events:
-            ical_event = CalendarFeedIntegration._create_ical_event(event)
-            cal.add_component(ical_event)
-        
-        # Return iCalendar response
-        response = HttpResponse(cal.to_ical(), content_type='text/calendar; charset=utf-8')
-        response['Content-Disposition'] = 'attachment; filename="eventosys_public.ics"'
-        response['Cache-Control'] = 'max-age=3600'  # 1 hour
+        if request.GET.get('sync_token'):
+            return _delta_feed_response(
+                request,
+                lambda since: CalendarFeedIntegration.generate_public_calendar_feed(since=since),
+                'eventosys_public.ics',
+                PUBLIC_FEED_MAX_AGE,
+            )
         
-        return response
+        entry = _stored_feed(request, PUBLIC_FEED_KEY) or materialize_feed(PUBLIC_FEED_KEY, 'public')
+        return _stored_feed_response(entry, PUBLIC_FEED_MAX_AGE)
         
     except Exception as e:
         raise Http404("Public calendar feed not found")
@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from .models import Event, EventType, Location, Department  # EventDocument removed
+from .conflicts import find_conflicts, conflict_message
+from accounts.name_index import resolve_user_id
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Fieldset, Submit, Row, Column, HTML
 
@@ -101,6 +103,8 @@ class EventForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
+        # Preenchido em clean() pelo nome digitado ou pelo usuário atual
+        self.fields['responsible_person'].required = False
         
         # Handle responsible person initialization
         if self.instance and self.instance.pk and hasattr(self.instance, 'responsible_person'):
@@ -186,6 +190,19 @@ class EventForm(forms.ModelForm):
         location = cleaned_data.get('location')
         responsible_text = cleaned_data.get('responsible_person_text', '')
         
+        # Resolver o responsável pelo nome digitado (índice de nomes em memória)
+        # apenas quando nenhum usuário foi selecionado; seleção e nome divergentes são recusados
+        if responsible_text:
+            responsible_id = resolve_user_id(responsible_text)
+            current = cleaned_data.get('responsible_person')
+            if current is None:
+                if responsible_id is not None:
+                    cleaned_data['responsible_person'] = User.objects.get(pk=responsible_id)
+            elif responsible_id is not None and current.pk != responsible_id:
+                raise ValidationError({
+                    'responsible_person_text': 'O nome informado não corresponde ao responsável selecionado.'
+                })
+        
         # Handle responsible person - set to current user as fallback
         if not cleaned_data.get('responsible_person'):
             if self.user:
@@ -209,6 +226,13 @@ class EventForm(forms.ModelForm):
         if location_mode in ['presencial', 'hibrido'] and not location:
             raise ValidationError("Localização é obrigatória para eventos presenciais ou híbridos.")
         
+        # Validar reserva simultânea do local
+        if (location and start_datetime and end_datetime and location_mode in ['presencial', 'hibrido']
+                and cleaned_data.get('status') != 'cancelado'):
+            conflicts = find_conflicts(location, start_datetime, end_datetime, exclude_id=self.instance.pk)
+            if conflicts:
+                raise ValidationError(conflict_message(conflicts[0]))
+        
         return cleaned_data
     
     def save(self, commit=True):
@@ -294,4 +318,32 @@ class EventFilterForm(forms.Form):
 
 # Formsets have been removed (documents and participants functionality eliminated)
 # EventDocumentFormSet has been removed as requested
-# EventParticipantFormSet has been removed as requested
\ No newline at end of file
+# EventParticipantFormSet has been removed as requested
+
+class EventBulkUpdateForm(forms.Form):
+    """Alterações aplicadas em lote aos eventos selecionados na listagem"""
+    
+    status = forms.ChoiceField(
+        choices=[('', 'Manter')] + Event.STATUS_CHOICES,
+        required=False
+    )
+    
+    department = forms.ModelChoiceField(
+        queryset=Department.objects.all(), # type: ignore
+        required=False
+    )
+    
+    is_public = forms.NullBooleanField(required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.get_changes():
+            raise ValidationError("Informe ao menos uma alteração.")
+        return cleaned_data
+    
+    def get_changes(self):
+        """Campos informados, no formato esperado por bulk_update_events"""
+        return {
+            field: value for field, value in self.cleaned_data.items()
+            if value not in (None, '')
+        }
@@ -0,0 +1,115 @@
+"""
+Pre-serialized per-event fragments for the calendar JSON API
+
+Each event is encoded once into a JSON object string and kept in the cache,
+keyed by event id, ``updated_at`` and variant (internal or public calendar).
+Calendar responses are then assembled by concatenating these fragments.
+"""
+import json
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from .cache import get_cache_timeout
+from .models import Event
+
+# Variantes do fragmento: o calendário público não expõe o link de detalhes
+CALENDAR_VARIANTS = ('private', 'public')
+
+
+def calendar_fragment_key(event_id, updated_at, variant):
+    """Chave de cache do fragmento de um evento"""
+    return f'events:calendar_fragment:{event_id}:{updated_at.timestamp()}:{variant}'
+
+
+def serialize_calendar_event(event, public_only=False):
+    """Converte um evento para o formato do FullCalendar"""
+    # Determine text color based on background
+    text_color = '#ffffff' if event.event_type_color else '#000000'
+
+    return {
+        'id': str(event.id),
+        'title': event.name,
+        'start': event.start_datetime.isoformat(),
+        'end': event.end_datetime.isoformat(),
+        # Remove the URL to prevent automatic navigation - we'll handle clicks in JavaScript
+        'backgroundColor': event.event_type_color,
+        'borderColor': event.event_type_color,
+        'textColor': text_color,
+        'extendedProps': {
+            'type': event.event_type_label,
+            'status': event.get_status_display(),
+            'location': event.location_display,
+            'responsible': event.responsible_name,
+            'department': event.department_name,
+            'isPublic': event.is_public,
+            'description': event.description[:100] + '...' if len(event.description) > 100 else event.description,
+            # Add the URL to extendedProps so we can use it in the modal
+            'url': reverse('events:event_detail', kwargs={'pk': event.pk}) if not public_only else '#',
+        }
+    }
+
+
+def build_calendar_fragments(events):
+    """Serializa os eventos em todas as variantes e grava os fragmentos no cache
+
+    Returns:
+        dict: chave de cache -> fragmento JSON
+    """
+    fragments = {}
+    for event in events:
+        for variant in CALENDAR_VARIANTS:
+            key = calendar_fragment_key(event.pk, event.updated_at, variant)
+            data = serialize_calendar_event(event, public_only=(variant == 'public'))
+            fragments[key] = json.dumps(data, cls=DjangoJSONEncoder)
+
+    if fragments:
+        cache.set_many(fragments, get_cache_timeout('calendar_fragment', 60 * 60 * 24))
+    return fragments
+
+
+def get_calendar_fragments(rows, public_only=False):
+    """Retorna os fragmentos JSON para as linhas (id, updated_at) informadas, na mesma ordem
+
+    Fragmentos ausentes do cache são reconstruídos com uma única consulta.
+    """
+    variant = 'public' if public_only else 'private'
+    keys = [calendar_fragment_key(event_id, updated_at, variant) for event_id, updated_at in rows]
+    fragments = cache.get_many(keys)
+
+    missing_ids = [event_id for (event_id, _), key in zip(rows, keys) if key not in fragments]
+    if missing_ids:
+        events = Event.objects.filter(pk__in=missing_ids).display_projection()
+        fragments.update(build_calendar_fragments(events))
+
+    for key in keys:
+        if key in fragments:
+            yield fragments[key]
+
+
+def get_occurrence_fragments(occurrences, public_only=False):
+    """Fragmentos JSON das ocorrências virtuais de séries, derivados do fragmento do evento-modelo"""
+    rows = {(occurrence.event.pk, occurrence.event.updated_at) for occurrence in occurrences}
+    templates = dict(zip(
+        (event_id for event_id, _ in rows),
+        get_calendar_fragments(list(rows), public_only=public_only)
+    ))
+
+    for occurrence in occurrences:
+        data = json.loads(templates[occurrence.event.pk])
+        data['id'] = occurrence.occurrence_key
+        data['start'] = occurrence.start_datetime.isoformat()
+        data['end'] = occurrence.end_datetime.isoformat()
+        data['extendedProps']['recurring'] = True
+        yield json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def rebuild_calendar_fragments(queryset):
+    """Reconstrói os fragmentos dos eventos do queryset (após mudança em cadastros relacionados)"""
+    events = queryset.display_projection().order_by()
+    batch = []
+    for event in events.iterator(chunk_size=500):
+        batch.append(event)
+        if len(batch) >= 500:
+            build_calendar_fragments(batch)
+            batch = []
+    build_calendar_fragments(batch)
@@ -0,0 +1,168 @@
+"""
+Streaming iCalendar (RFC 5545) writer
+
+Writes content lines directly as text: TEXT values are escaped, lines are
+folded at 75 octets and properties are emitted in the same order as
+``icalendar`` (canonical order, then alphabetical), so the output is
+byte-compatible with ``Calendar.to_ical()``. Each VEVENT is rendered to one
+text block and a calendar is streamed block by block while the events are
+read from the database.
+"""
+from datetime import timezone as dt_timezone
+
+CRLF = '\r\n'
+
+# Ordem canônica das propriedades (as demais seguem em ordem alfabética)
+CALENDAR_ORDER = ('VERSION', 'PRODID', 'CALSCALE', 'METHOD')
+EVENT_ORDER = (
+    'SUMMARY', 'DTSTART', 'DTEND', 'DURATION', 'DTSTAMP',
+    'UID', 'RECURRENCE-ID', 'SEQUENCE', 'RRULE', 'RDATE', 'EXDATE',
+)
+
+# Caracteres que exigem aspas em valores de parâmetros
+QUOTABLE_PARAM_CHARS = set(",;: ’'")
+
+FOLD_LIMIT = 75
+
+
+def escape_text(value):
+    """Escapa um valor TEXT (barra invertida, ponto e vírgula, vírgula e quebras de linha)"""
+    return (
+        str(value).replace('\\N', '\n')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line):
+    """Dobra a linha em partes de até 75 octetos (continuações iniciadas por espaço)"""
+    if line.isascii():
+        return '\r\n '.join(line[i:i + FOLD_LIMIT - 1] for i in range(0, len(line), FOLD_LIMIT - 1))
+
+    chars = []
+    byte_count = 0
+    for char in line:
+        char_bytes = len(char.encode('utf-8'))
+        byte_count += char_bytes
+        if byte_count >= FOLD_LIMIT:
+            chars.append('\r\n ')
+            byte_count = char_bytes
+        chars.append(char)
+    return ''.join(chars)
+
+
+def _param(value):
+    value = value.replace('"', "'")
+    return f'"{value}"' if QUOTABLE_PARAM_CHARS & set(value) else value
+
+
+def _tzid(dt):
+    tzinfo = dt.tzinfo
+    if hasattr(tzinfo, 'zone'):
+        return tzinfo.zone
+    if hasattr(tzinfo, 'key'):
+        return tzinfo.key
+    if tzinfo is not None:
+        return tzinfo.tzname(dt)
+    return None
+
+
+# Valores tipados: (parâmetros, valor) prontos para a linha de conteúdo
+
+def text(value):
+    return '', escape_text(value)
+
+
+def uri(value):
+    return '', str(value)
+
+
+def integer(value):
+    return '', str(int(value))
+
+
+def date_time(dt):
+    """DATE-TIME em UTC (sufixo Z) ou com TZID (sem frações de segundo)"""
+    value = f'{dt.year:04}{dt.month:02}{dt.day:02}T{dt.hour:02}{dt.minute:02}{dt.second:02}'
+    tzid = _tzid(dt)
+    if tzid == 'UTC' or dt.tzinfo is dt_timezone.utc:
+        return '', value + 'Z'
+    if tzid:
+        return f';TZID={_param(tzid)}', value
+    return '', value
+
+
+def duration(td):
+    """DURATION (ex.: -P1D, -PT1H)"""
+    sign = ''
+    if td.days < 0:
+        sign = '-'
+        td = -td
+    time_part = ''
+    if td.seconds:
+        hours, minutes, seconds = td.seconds // 3600, td.seconds % 3600 // 60, td.seconds % 60
+        time_part = 'T'
+        if hours:
+            time_part += f'{hours}H'
+        if minutes or (hours and seconds):
+            time_part += f'{minutes}M'
+        if seconds:
+            time_part += f'{seconds}S'
+    if td.days == 0 and time_part:
+        return '', f'{sign}P{time_part}'
+    return '', f'{sign}P{td.days}D{time_part}'
+
+
+def content_line(name, value):
+    params, value = value
+    return fold_line(f'{name}{params}:{value}') + CRLF
+
+
+def render_component(name, properties, canonical_order=(), components=()):
+    """Renderiza um componente (BEGIN ... END) como texto
+
+    Args:
+        name: nome do componente (VEVENT, VALARM...)
+        properties: dict nome -> valor tipado (text, date_time...); None é ignorado
+        canonical_order: propriedades emitidas primeiro, nessa ordem
+        components: subcomponentes já renderizados
+    """
+    names = [key for key, value in properties.items() if value is not None]
+    head = [key for key in canonical_order if key in names]
+    tail = sorted(key for key in names if key not in canonical_order)
+    lines = [f'BEGIN:{name}{CRLF}']
+    lines.extend(content_line(key, properties[key]) for key in head + tail)
+    lines.extend(components)
+    lines.append(f'END:{name}{CRLF}')
+    return ''.join(lines)
+
+
+def stream_calendar(properties, events):
+    """Gera o VCALENDAR em blocos de bytes: cabeçalho, um bloco por VEVENT e término
+
+    Args:
+        properties: propriedades do calendário (dict nome -> valor tipado)
+        events: iterável de VEVENTs renderizados (consumido sob demanda)
+    """
+    header = render_component('VCALENDAR', properties, CALENDAR_ORDER)
+    yield header[:-len(f'END:VCALENDAR{CRLF}')].encode('utf-8')
+    for block in events:
+        yield block.encode('utf-8')
+    yield f'END:VCALENDAR{CRLF}'.encode('utf-8')
+
+
+def calendar_properties(prodid, name, description, relcalid=None, method='PUBLISH'):
+    """Propriedades padrão dos calendários exportados"""
+    return {
+        'PRODID': text(prodid),
+        'VERSION': text('2.0'),
+        'CALSCALE': text('GREGORIAN'),
+        'METHOD': text(method),
+        'X-WR-CALNAME': text(name),
+        'X-WR-CALDESC': text(description),
+        'X-WR-TIMEZONE': text('America/Sao_Paulo'),
+        'X-WR-RELCALID': text(relcalid) if relcalid else None,
+    }
@@ -0,0 +1,56 @@
+"""
+Cached per-event iCalendar blocks shared by the ICS exports and feeds
+
+Each event is serialized once per variant (internal export, public export,
+feeds with or without the details link) and kept in the cache, keyed by
+event id, ``updated_at``, variant and the related-records version. Exports
+and feeds are assembled from these blocks; the feed blocks leave out the
+lines that depend on the subscriber (UID prefix, [PRIVADO] tag, DTSTAMP).
+"""
+from django.core.cache import cache
+from .cache import get_related_version, get_cache_timeout
+
+# Eventos por consulta ao cache (get_many/set_many)
+ICS_CHUNK_SIZE = 500
+
+
+def ics_block_key(event_key, updated_at, variant, version):
+    """Chave de cache do bloco de um evento (ou ocorrência) em uma variante"""
+    return f'events:ics_block:{event_key}:{updated_at.timestamp()}:{variant}:{version}'
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_ics_blocks(items, variant, render, chunk_size=ICS_CHUNK_SIZE):
+    """Gera os blocos dos itens na mesma ordem, lendo do cache em lotes
+
+    Args:
+        items: iterável de eventos ou ocorrências de séries (consumido sob demanda)
+        variant: nome da variante, ou função item -> variante
+        render: função item -> bloco, chamada apenas para blocos ausentes do cache
+    """
+    version = get_related_version()
+    timeout = get_cache_timeout('ics_block', 60 * 60 * 24)
+    variant_of = variant if callable(variant) else (lambda item: variant)
+
+    for chunk in _chunks(items, chunk_size):
+        keys = [
+            ics_block_key(getattr(item, 'occurrence_key', item.pk), item.updated_at, variant_of(item), version)
+            for item in chunk
+        ]
+        blocks = cache.get_many(keys)
+        missing = {key: render(item) for key, item in zip(keys, chunk) if key not in blocks}
+        if missing:
+            cache.set_many(missing, timeout)
+            blocks.update(missing)
+        for key in keys:
+            yield blocks[key]
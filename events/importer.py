@@ -0,0 +1,290 @@
+"""
+Bulk import of events from CSV
+
+Rows are validated in memory against cadastros loaded once per import,
+checked for location double-booking in batches, and inserted with
+``bulk_create``. Creation history and notifications, which the per-event
+signals would produce one row at a time, are written in bulk afterwards.
+"""
+import csv
+from datetime import datetime
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from accounts.name_index import normalize_name, resolve_user_id
+from notifications.services import NotificationService
+from .cache import bump_data_version
+from .conflicts import check_slots, find_clashes
+from .feed_store import mark_feeds_dirty
+from .fragments import build_calendar_fragments
+from .models import Event, EventHistory, EventType, Location, Department
+
+# Cabeçalho aceito no CSV (nomes dos campos do modelo Event)
+IMPORT_COLUMNS = (
+    'name', 'event_type', 'start_datetime', 'end_datetime', 'location_mode', 'location',
+    'virtual_link', 'target_audience', 'responsible_person', 'department', 'status',
+    'description', 'observations', 'is_public',
+)
+REQUIRED_COLUMNS = (
+    'name', 'event_type', 'start_datetime', 'end_datetime', 'location_mode',
+    'target_audience', 'department',
+)
+
+# Campos de relacionamento resolvidos pelos cadastros em memória
+RELATED_FIELDS = ('event_type', 'location', 'responsible_person', 'department', 'created_by')
+
+IMPORT_BATCH_SIZE = 500
+DATETIME_FORMATS = ('%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S')
+TRUE_VALUES = ('1', 'sim', 's', 'true', 'yes', 'x')
+
+
+def parse_import_datetime(value):
+    """Converte data/hora ISO 8601 ou dd/mm/aaaa HH:MM em datetime com fuso"""
+    value = (value or '').strip()
+    parsed = None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        pass
+    for date_format in DATETIME_FORMATS:
+        if parsed is not None:
+            break
+        try:
+            parsed = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ImportLookups:
+    """Cadastros carregados uma vez por importação, indexados por código e rótulo normalizados"""
+
+    def __init__(self):
+        self.event_types = self._index(
+            EventType.objects.all(), lambda event_type: (event_type.name, event_type.get_name_display())
+        )
+        self.locations = self._index(Location.objects.all(), self._location_keys)
+        self.departments = self._index(Department.objects.all(), lambda department: (department.name,))
+        self._users = {}
+
+    @staticmethod
+    def _location_keys(location):
+        if location.custom_name:
+            return (str(location),)
+        return (location.name, location.get_name_display())
+
+    @staticmethod
+    def _index(objects, keys):
+        index = {}
+        for obj in objects:
+            for key in keys(obj):
+                index.setdefault(normalize_name(key), obj)
+        return index
+
+    def user_id(self, value):
+        """Resolve nome completo ou username pelo índice de nomes (None se ambíguo)"""
+        key = normalize_name(value)
+        if key not in self._users:
+            self._users[key] = resolve_user_id(value)
+        return self._users[key]
+
+
+class ImportResult:
+    """Resultado de uma importação"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.created = 0
+        self.errors = []  # (linha, mensagem)
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+class EventImporter:
+    """Importa eventos de um CSV em lotes
+
+    Args:
+        user: usuário registrado como criador (e responsável padrão)
+        skip_invalid: importa as linhas válidas mesmo se houver erros
+        batch_size: linhas por lote de validação e inserção
+    """
+
+    def __init__(self, user, skip_invalid=False, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.skip_invalid = skip_invalid
+        self.batch_size = batch_size
+
+    def run(self, lines, dry_run=False):
+        """Valida e importa as linhas do CSV (iterável de str)"""
+        result = ImportResult()
+        lines = iter(lines)
+        first_line = next(lines, '')
+        delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+        reader = csv.DictReader(self._chain(first_line, lines), delimiter=delimiter)
+
+        header = [column.strip() for column in reader.fieldnames or []]
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            result.add_error(1, f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+            return result
+        reader.fieldnames = header
+
+        lookups = ImportLookups()
+        valid = []  # (linha, evento)
+        for row in reader:
+            result.total_rows += 1
+            line = reader.line_num
+            event, errors = self._build_event(row, lookups)
+            for message in errors:
+                result.add_error(line, message)
+            if not errors:
+                valid.append((line, event))
+
+        valid = self._check_conflicts(valid, result)
+
+        if (result.errors and not self.skip_invalid) or dry_run or not valid:
+            return result
+
+        events = [event for _, event in valid]
+        self._attach_users(events)
+        self._insert(events)
+        result.created = len(events)
+        return result
+
+    @staticmethod
+    def _chain(first_line, lines):
+        yield first_line
+        yield from lines
+
+    def _build_event(self, row, lookups):
+        """Monta o evento (não gravado) a partir da linha; retorna (evento, erros)"""
+        row = {key: (value or '').strip() for key, value in row.items() if key}
+        errors = []
+
+        event = Event(
+            name=row.get('name', ''),
+            location_mode=row.get('location_mode', ''),
+            virtual_link=row.get('virtual_link', ''),
+            target_audience=row.get('target_audience', ''),
+            status=row.get('status') or 'planejado',
+            description=row.get('description', ''),
+            observations=row.get('observations', ''),
+            is_public=row.get('is_public', '').lower() in TRUE_VALUES,
+            created_by=self.user,
+        )
+
+        event.start_datetime = parse_import_datetime(row.get('start_datetime'))
+        event.end_datetime = parse_import_datetime(row.get('end_datetime'))
+        if event.start_datetime is None or event.end_datetime is None:
+            errors.append("Data/hora de início ou término inválida.")
+
+        event_type = lookups.event_types.get(normalize_name(row.get('event_type')))
+        if event_type is None:
+            errors.append(f"Tipo de evento desconhecido: {row.get('event_type')!r}.")
+        event.event_type = event_type
+
+        department = lookups.departments.get(normalize_name(row.get('department')))
+        if department is None:
+            errors.append(f"Departamento desconhecido: {row.get('department')!r}.")
+        event.department = department
+
+        if row.get('location'):
+            location = lookups.locations.get(normalize_name(row['location']))
+            if location is None:
+                errors.append(f"Localização desconhecida: {row['location']!r}.")
+            event.location = location
+
+        if row.get('responsible_person'):
+            responsible_id = lookups.user_id(row['responsible_person'])
+            if responsible_id is None:
+                errors.append(f"Responsável não encontrado ou ambíguo: {row['responsible_person']!r}.")
+            event.responsible_person_id = responsible_id
+        else:
+            event.responsible_person_id = self.user.pk
+
+        if errors:
+            return event, errors
+
+        try:
+            event.clean_fields(exclude=RELATED_FIELDS)
+            event.clean()
+        except ValidationError as e:
+            return event, e.messages
+
+        # Mesmas regras do EventForm
+        if event.location_mode in ['virtual', 'hibrido'] and not event.virtual_link:
+            errors.append("Link virtual é obrigatório para eventos virtuais ou híbridos.")
+        if event.location_mode in ['presencial', 'hibrido'] and not event.location:
+            errors.append("Localização é obrigatória para eventos presenciais ou híbridos.")
+        return event, errors
+
+    def _check_conflicts(self, valid, result):
+        """Verifica reservas simultâneas de local; retorna as linhas sem conflito
+
+        As sobreposições entre linhas do arquivo são verificadas de uma vez,
+        sobre todas as linhas; apenas a consulta às reservas gravadas é feita em lotes.
+        """
+        candidates = [
+            (line, event) for line, event in valid
+            if event.location and event.location_mode in ['presencial', 'hibrido'] and event.status != 'cancelado'
+        ]
+        slots = [
+            {'location': event.location, 'start': event.start_datetime, 'end': event.end_datetime}
+            for _, event in candidates
+        ]
+        conflicts = []
+        for start in range(0, len(slots), self.batch_size):
+            conflicts.extend(
+                check['conflicts'] for check in check_slots(slots[start:start + self.batch_size], with_clashes=False)
+            )
+
+        rejected = set()
+        for (line, event), booked, clashes in zip(candidates, conflicts, find_clashes(slots)):
+            for conflict in booked:
+                result.add_error(line, f"O local já está reservado para \"{conflict['name']}\".")
+            for other in clashes:
+                result.add_error(line, f"O local também é reservado pela linha {candidates[other][0]} do arquivo.")
+            if booked or clashes:
+                rejected.add(line)
+        return [(line, event) for line, event in valid if line not in rejected]
+
+    @staticmethod
+    def _attach_users(events):
+        """Carrega os responsáveis com uma consulta e preenche as colunas de exibição"""
+        users = User.objects.in_bulk({event.responsible_person_id for event in events})
+        for event in events:
+            event.responsible_person = users[event.responsible_person_id]
+            # bulk_create não chama save()
+            event.refresh_display_fields()
+
+    def _insert(self, events):
+        """Grava eventos, histórico e notificações em lote"""
+        with transaction.atomic():
+            for start in range(0, len(events), self.batch_size):
+                batch = events[start:start + self.batch_size]
+                Event.objects.bulk_create(batch)
+                EventHistory.objects.bulk_create([
+                    EventHistory(
+                        event=event,
+                        field_name='Evento Criado',
+                        old_value='',
+                        new_value=f'Evento "{event.name}" criado (importação)',
+                        changed_by=self.user,
+                    )
+                    for event in batch
+                ])
+                NotificationService.create_bulk_event_notifications(batch, 'event_created', sender=self.user)
+
+        # bulk_create não dispara os sinais: invalida caches e gera os fragmentos aqui
+        bump_data_version(department_ids={event.department_id for event in events})
+        mark_feeds_dirty(events)
+        build_calendar_fragments(events)
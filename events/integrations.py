@@ -3,14 +3,22 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 from django.contrib.sites.models import Site
-from icalendar import Calendar, Event as ICalEvent, Alarm
+from icalendar import Calendar, Event as ICalEvent
 from datetime import timedelta
+from django.db.models import Q
 from urllib.parse import urlencode
 from .models import Event
+from .recurrence import expand_occurrences
+from . import ics
+from .ics_fragments import get_ics_blocks
+from .sync import FEED_WINDOW, tombstones_since
 import logging
 
 logger = logging.getLogger('events')
 
+# Id usado para gerar a URL de detalhes uma vez por feed
+EVENT_URL_PLACEHOLDER = '00000000-0000-0000-0000-000000000000'
+
 
 class GoogleCalendarIntegration:
     """
@@ -158,126 +166,211 @@ class CalendarFeedIntegration:
     """
     
     @staticmethod
-    def generate_user_calendar_feed(user, include_private=True):
+    def generate_user_calendar_feed(user, include_private=True, since=None):
         """
         Generate personalized calendar feed for a user
         
         Args:
             user: User object
             include_private: Include private events the user has access to
+            since: only the changes after this moment (sync token)
             
         Returns:
-            Calendar: iCalendar object
+            iterator: iCalendar bytes, streamed one VEVENT at a time
         """
-        from accounts.utils import get_user_accessible_events
-        from django.apps import apps
+        from accounts.utils import get_user_accessible_events, get_event_access_filter
         
         # Get user accessible events
         if include_private:
             events = get_user_accessible_events(user)
+            access_filter = get_event_access_filter(user)
         else:
-            EventModel = apps.get_model('events', 'Event')
-            events = EventModel.objects.filter(is_public=True)
-        
-        # Filter future events (next 6 months)
-        now = timezone.now()
-        six_months = now + timedelta(days=180)
-        events = events.filter(
-            start_datetime__gte=now,
-            start_datetime__lte=six_months
-        ).select_related('event_type', 'location', 'responsible_person', 'department')
-        
-        # Create calendar
-        cal = Calendar()
-        cal.add('prodid', f'-//EventoSys//Calendário de {user.get_full_name() or user.username}//PT')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        cal.add('method', 'PUBLISH')
-        cal.add('x-wr-calname', f'EventoSys - {user.get_full_name() or user.username}')
-        cal.add('x-wr-caldesc', f'Calendário personalizado de eventos para {user.get_full_name() or user.username}')
-        cal.add('x-wr-timezone', 'America/Sao_Paulo')
-        cal.add('x-wr-relcalid', f'eventosys-user-{user.id}')
-        
-        # Add events
-        for event in events:
-            ical_event = CalendarFeedIntegration._create_ical_event(event, user)
-            cal.add_component(ical_event)
-        
-        return cal
+            events = Event.objects.filter(is_public=True)
+            access_filter = Q(is_public=True)
+        
+        name = user.get_full_name() or user.username
+        properties = ics.calendar_properties(
+            f'-//EventoSys//Calendário de {name}//PT',
+            f'EventoSys - {name}',
+            f'Calendário personalizado de eventos para {name}',
+            relcalid=f'eventosys-user-{user.id}',
+        )
+        return CalendarFeedIntegration._stream_feed(properties, events, user, since, access_filter)
     
     @staticmethod
-    def generate_department_calendar_feed(department):
+    def generate_department_calendar_feed(department, since=None):
         """
         Generate calendar feed for a specific department
         
         Args:
             department: Department object
+            since: only the changes after this moment (sync token)
             
         Returns:
-            Calendar: iCalendar object
+            iterator: iCalendar bytes, streamed one VEVENT at a time
         """
-        from django.apps import apps
-        
-        # Get department events
-        EventModel = apps.get_model('events', 'Event')
-        events = EventModel.objects.filter(
+        events = Event.objects.filter(
             department=department,
             is_public=True
         )
-        
-        # Filter future events (next 6 months)
-        now = timezone.now()
-        six_months = now + timedelta(days=180)
-        events = events.filter(
-            start_datetime__gte=now,
-            start_datetime__lte=six_months
-        ).select_related('event_type', 'location', 'responsible_person')
-        
-        # Create calendar
-        cal = Calendar()
-        cal.add('prodid', f'-//EventoSys//Calendário {department.name}//PT')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        cal.add('method', 'PUBLISH')
-        cal.add('x-wr-calname', f'EventoSys - {department.name}')
-        cal.add('x-wr-caldesc', f'Calendário de eventos do {department.name}')
-        cal.add('x-wr-timezone', 'America/Sao_Paulo')
-        cal.add('x-wr-relcalid', f'eventosys-dept-{department.id}')
-        
-        # Add events
-        for event in events:
-            ical_event = CalendarFeedIntegration._create_ical_event(event)
-            cal.add_component(ical_event)
-        
-        return cal
+        properties = ics.calendar_properties(
+            f'-//EventoSys//Calendário {department.name}//PT',
+            f'EventoSys - {department.name}',
+            f'Calendário de eventos do {department.name}',
+            relcalid=f'eventosys-dept-{department.id}',
+        )
+        return CalendarFeedIntegration._stream_feed(
+            properties, events, since=since, access_filter=Q(department=department, is_public=True)
+        )
     
     @staticmethod
-    def _create_ical_event(event, user=None):
-        """Create iCalendar event with proper formatting and alarms"""
-        ical_event = ICalEvent()
+    def generate_public_calendar_feed(since=None):
+        """
+        Generate calendar feed for all public events
         
-        # Basic event info
-        uid_prefix = f'user-{user.id}-' if user else 'public-'
-        ical_event.add('uid', f'{uid_prefix}event-{event.id}@eventosys.local')
-        ical_event.add('dtstart', event.start_datetime)
-        ical_event.add('dtend', event.end_datetime)
-        ical_event.add('dtstamp', timezone.now())
+        Args:
+            since: only the changes after this moment (sync token)
+            
+        Returns:
+            iterator: iCalendar bytes, streamed one VEVENT at a time
+        """
+        events = Event.objects.filter(is_public=True)
+        properties = ics.calendar_properties(
+            '-//EventoSys//Eventos Públicos//PT',
+            'EventoSys - Eventos Públicos',
+            'Calendário público de eventos institucionais',
+        )
+        return CalendarFeedIntegration._stream_feed(properties, events, since=since, access_filter=Q(is_public=True))
+    
+    @staticmethod
+    def _stream_feed(properties, events, user=None, since=None, access_filter=None):
+        """
+        Eventos dos próximos 6 meses, montados a partir dos blocos em cache;
+        com since, apenas as alterações posteriores e as remoções (canceladas)
+        """
+        context = FeedContext(with_details=user is not None)
+        range_end = context.now + FEED_WINDOW
+        events = events.select_related('event_type')
+        if since is None:
+            items = CalendarFeedIntegration.get_feed_items(events, context.now, range_end)
+        else:
+            items = CalendarFeedIntegration.get_changed_items(events, since, context.now, range_end)
+        parts = get_ics_blocks(
+            items, context.variant_of,
+            lambda item: CalendarFeedIntegration.render_feed_parts(item, context)
+        )
+        if since is None:
+            blocks = (CalendarFeedIntegration.assemble_feed_event(part, context, user) for part in parts)
+        else:
+            blocks = CalendarFeedIntegration._with_cancellations(
+                parts, tombstones_since(since, access_filter), context, user
+            )
+        return ics.stream_calendar(properties, blocks)
+    
+    @staticmethod
+    def _with_cancellations(parts, tombstones, context, user=None):
+        """Alterações seguidas das remoções que não foram reenviadas como alteradas"""
+        sent = set()
+        for part in parts:
+            sent.add(part[0])
+            yield CalendarFeedIntegration.assemble_feed_event(part, context, user)
+        for tombstone in tombstones.iterator(chunk_size=500):
+            if tombstone.event_key not in sent:
+                sent.add(tombstone.event_key)
+                yield CalendarFeedIntegration.render_cancellation(tombstone, context, user)
+    
+    @staticmethod
+    def get_feed_items(events, range_start, range_end):
+        """
+        Events starting within the feed window plus the occurrences of
+        recurring series, expanded only for that window
+        """
+        occurrences = [
+            occurrence for occurrence in expand_occurrences(events, range_start, range_end)
+            if occurrence.start_datetime >= range_start
+        ]
+        # Eventos lidos em lotes durante a serialização
+        yield from events.filter(
+            start_datetime__gte=range_start,
+            start_datetime__lte=range_end
+        ).iterator(chunk_size=500)
+        yield from occurrences
+    
+    @staticmethod
+    def get_changed_items(events, since, range_start, range_end):
+        """
+        Events changed after since, plus the window occurrences of the series
+        whose template or recurrence changed after since
+        """
+        changed_series = events.filter(Q(updated_at__gt=since) | Q(series__updated_at__gt=since))
+        occurrences = [
+            occurrence for occurrence in expand_occurrences(changed_series, range_start, range_end)
+            if occurrence.start_datetime >= range_start
+        ]
+        yield from events.filter(updated_at__gt=since).iterator(chunk_size=500)
+        yield from occurrences
+    
+    @staticmethod
+    def render_feed_event(event, user=None):
+        """Render the feed VEVENT (with alarms) as iCalendar text"""
+        context = FeedContext(with_details=user is not None)
+        parts = CalendarFeedIntegration.render_feed_parts(event, context)
+        return CalendarFeedIntegration.assemble_feed_event(parts, context, user)
+    
+    @staticmethod
+    def assemble_feed_event(parts, context, user=None):
+        """Complete the cached VEVENT parts with the subscriber-specific lines"""
+        event_key, name, is_public, times, tail = parts
         
         # Event title with privacy indicator
-        if user and not event.is_public:
-            title = f"[PRIVADO] {event.name}"
+        if user and not is_public:
+            title = f"[PRIVADO] {name}"
         else:
-            title = event.name
-        ical_event.add('summary', title)
+            title = name
+        
+        return ''.join((
+            'BEGIN:VEVENT\r\n',
+            ics.content_line('SUMMARY', ics.text(title)),
+            times,
+            context.dtstamp,
+            ics.content_line('UID', ics.text(CalendarFeedIntegration.feed_uid(event_key, user))),
+            tail,
+        ))
+    
+    @staticmethod
+    def feed_uid(event_key, user=None):
+        """UID of an event in the feed (per subscriber in personal feeds)"""
+        uid_prefix = f'user-{user.id}-' if user else 'public-'
+        return f'{uid_prefix}event-{event_key}@eventosys.local'
+    
+    @staticmethod
+    def render_cancellation(tombstone, context, user=None):
+        """Cancelled VEVENT for an event or occurrence removed from the feed"""
+        return ics.render_component('VEVENT', {
+            'DTSTART': ics.date_time(tombstone.start_datetime),
+            'DTEND': ics.date_time(tombstone.end_datetime),
+            'DTSTAMP': ics.date_time(context.now),
+            'UID': ics.text(CalendarFeedIntegration.feed_uid(tombstone.event_key, user)),
+            'STATUS': ics.text('CANCELLED'),
+        }, ics.EVENT_ORDER)
+    
+    @staticmethod
+    def render_feed_parts(event, context):
+        """
+        Render the parts of the feed VEVENT that are the same for every
+        subscriber: (event key, name, is_public, DTSTART/DTEND lines, remaining lines)
+        """
+        # Ocorrências de séries recorrentes têm UID próprio
+        event_key = getattr(event, 'occurrence_key', event.id)
         
         # Detailed description
         description_parts = []
-        description_parts.append(f"Tipo: {event.event_type.get_name_display()}")
+        description_parts.append(f"Tipo: {event.event_type_label}")
         
-        if event.department:
-            description_parts.append(f"Departamento: {event.department.name}")
+        if event.department_name:
+            description_parts.append(f"Departamento: {event.department_name}")
         
-        description_parts.append(f"Responsável: {event.responsible_person.get_full_name() or event.responsible_person.username}")
+        description_parts.append(f"Responsável: {event.responsible_name}")
         
         if event.location_mode != 'presencial':
             description_parts.append(f"Modalidade: {event.get_location_mode_display()}")
@@ -285,9 +378,6 @@ class CalendarFeedIntegration:
         if event.virtual_link:
             description_parts.append(f"Link: {event.virtual_link}")
         
-        if event.expected_participants:
-            description_parts.append(f"Participantes esperados: {event.expected_participants}")
-        
         # Event description
         if event.description:
             description_parts.append("")
@@ -299,42 +389,17 @@ class CalendarFeedIntegration:
         description_parts.append("---")
         description_parts.append("Evento criado via EventoSys - Sistema de Gestão de Eventos Institucionais")
         
-        if user:
+        if context.detail_url:
             # Add personalized link to event details
-            try:
-                site = Site.objects.get_current()
-                event_url = f"https://{site.domain}{reverse('events:event_detail', args=[event.id])}"
-                description_parts.append(f"Ver detalhes: {event_url}")
-            except:
-                pass
-        
-        ical_event.add('description', '\\n'.join(description_parts))
-        
-        # Location
-        if event.location:
-            ical_event.add('location', str(event.location))
-        
-        # URL
-        if event.virtual_link:
-            ical_event.add('url', event.virtual_link)
+            description_parts.append(f"Ver detalhes: {context.event_url(event)}")
         
         # Categories and classification
-        categories = [event.event_type.get_name_display()]
-        if event.department:
-            categories.append(event.department.name)
+        categories = [event.event_type_label]
+        if event.department_name:
+            categories.append(event.department_name)
         if not event.is_public:
             categories.append('Privado')
         
-        ical_event.add('categories', ','.join(categories))
-        
-        # Event status
-        if event.status == 'cancelado':
-            ical_event.add('status', 'CANCELLED')
-        elif event.status == 'concluido':
-            ical_event.add('status', 'CONFIRMED')
-        else:
-            ical_event.add('status', 'CONFIRMED')
-        
         # Priority based on event type
         priority_map = {
             'reuniao': 5,
@@ -344,33 +409,69 @@ class CalendarFeedIntegration:
             'assembleia': 8,
             'coletiva_imprensa': 7,
         }
-        priority = priority_map.get(event.event_type.name, 5)
-        ical_event.add('priority', priority)
-        
-        # Transparency (show as busy or free)
-        ical_event.add('transp', 'OPAQUE')  # Show as busy
-        
-        # Created and modified timestamps
-        ical_event.add('created', event.created_at)
-        ical_event.add('last-modified', event.updated_at)
-        
-        # Add alarms for upcoming events
-        if event.start_datetime > timezone.now():
-            # Add 24-hour reminder
-            alarm_24h = Alarm()
-            alarm_24h.add('action', 'DISPLAY')
-            alarm_24h.add('description', f'Lembrete: {event.name} amanhã')
-            alarm_24h.add('trigger', timedelta(hours=-24))
-            ical_event.add_component(alarm_24h)
-            
-            # Add 1-hour reminder
-            alarm_1h = Alarm()
-            alarm_1h.add('action', 'DISPLAY')
-            alarm_1h.add('description', f'Lembrete: {event.name} em 1 hora')
-            alarm_1h.add('trigger', timedelta(hours=-1))
-            ical_event.add_component(alarm_1h)
-        
-        return ical_event
+        
+        # Add alarms for upcoming events (24-hour and 1-hour reminders)
+        alarms = []
+        if context.is_upcoming(event):
+            for trigger, reminder in ((timedelta(hours=-24), 'amanhã'), (timedelta(hours=-1), 'em 1 hora')):
+                alarms.append(ics.render_component('VALARM', {
+                    'ACTION': ics.text('DISPLAY'),
+                    'DESCRIPTION': ics.text(f'Lembrete: {event.name} {reminder}'),
+                    'TRIGGER': ics.duration(trigger),
+                }))
+        
+        times = ics.content_line('DTSTART', ics.date_time(event.start_datetime)) + \
+            ics.content_line('DTEND', ics.date_time(event.end_datetime))
+        
+        # Demais propriedades (fora da ordem canônica) em ordem alfabética
+        tail = ics.render_component('VEVENT', {
+            'DESCRIPTION': ics.text('\\n'.join(description_parts)),
+            'LOCATION': ics.text(event.location_display) if event.location_display else None,
+            'URL': ics.uri(event.virtual_link) if event.virtual_link else None,
+            'CATEGORIES': ics.text(','.join(categories)),
+            'STATUS': ics.text('CANCELLED' if event.status == 'cancelado' else 'CONFIRMED'),
+            'PRIORITY': ics.integer(priority_map.get(event.event_type.name, 5)),
+            'TRANSP': ics.text('OPAQUE'),  # Show as busy
+            'CREATED': ics.date_time(event.created_at),
+            'LAST-MODIFIED': ics.date_time(event.updated_at),
+        }, components=alarms)[len('BEGIN:VEVENT\r\n'):]
+        
+        return event_key, event.name, event.is_public, times, tail
+    
+    @staticmethod
+    def _create_ical_event(event, user=None):
+        """Create iCalendar event with proper formatting and alarms"""
+        return ICalEvent.from_ical(CalendarFeedIntegration.render_feed_event(event, user))
+
+
+class FeedContext:
+    """
+    Data shared by every event of a feed, computed once per feed: current
+    time (DTSTAMP and alarms) and the details link base URL
+    """
+    
+    def __init__(self, with_details=False):
+        self.now = timezone.now()
+        self.dtstamp = ics.content_line('DTSTAMP', ics.date_time(self.now))
+        self.detail_url = None
+        self.variant = 'feed'
+        if with_details:
+            try:
+                site = Site.objects.get_current()
+                self.detail_url = f"https://{site.domain}{reverse('events:event_detail', args=[EVENT_URL_PLACEHOLDER])}"
+                self.variant = f'feed:{site.domain}'
+            except:
+                pass
+    
+    def event_url(self, event):
+        return self.detail_url.replace(EVENT_URL_PLACEHOLDER, str(event.id))
+    
+    def is_upcoming(self, event):
+        return event.start_datetime > self.now
+    
+    def variant_of(self, event):
+        """Variante do bloco em cache: com ou sem link de detalhes, com ou sem alarmes"""
+        return f"{self.variant}:{'upcoming' if self.is_upcoming(event) else 'started'}"
 
 
 class EmailInviteIntegration:
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from events.archive import archivable_events, archive_events, get_archive_horizon_days
+
+
+class Command(BaseCommand):
+    help = 'Move eventos concluídos ou cancelados antigos (e seu histórico) para o arquivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days',
+            type=int,
+            default=None,
+            help='Arquiva eventos terminados há mais de N dias (padrão: EVENT_ARCHIVE_HORIZON_DAYS)',
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Eventos movidos por transação (padrão: 500)',
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra quantos eventos seriam arquivados',
+        )
+
+    def handle(self, *args, **options):
+        horizon_days = options['horizon_days']
+        if horizon_days is None:
+            horizon_days = get_archive_horizon_days()
+        if horizon_days < 0 or options['batch_size'] < 1:
+            raise CommandError('--horizon-days não pode ser negativo e --batch-size deve ser positivo.')
+
+        if options['dry_run']:
+            count = archivable_events(horizon_days=horizon_days).count()
+            self.stdout.write(
+                self.style.WARNING(f'Modo DRY RUN - {count} evento(s) seriam arquivados')  # type: ignore
+            )
+            return
+
+        archived = archive_events(horizon_days=horizon_days, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(  # type: ignore
+                f'{archived} evento(s) terminados há mais de {horizon_days} dias arquivados'
+            )
+        )
@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from events.importer import EventImporter, IMPORT_COLUMNS
+
+
+class Command(BaseCommand):
+    help = 'Importa eventos em lote a partir de um arquivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help=f'Arquivo CSV com as colunas: {", ".join(IMPORT_COLUMNS)}')
+
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username registrado como criador dos eventos (e responsável padrão)',
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas valida o arquivo, sem gravar eventos',
+        )
+
+        parser.add_argument(
+            '--skip-invalid',
+            action='store_true',
+            help='Importa as linhas válidas mesmo se houver linhas com erro',
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Linhas por lote de validação e inserção (padrão: 500)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário "{options["user"]}" não encontrado.')
+
+        importer = EventImporter(user, skip_invalid=options['skip_invalid'], batch_size=options['batch_size'])
+
+        try:
+            with open(options['csv_file'], encoding='utf-8-sig', newline='') as csv_file:
+                result = importer.run(csv_file, dry_run=options['dry_run'])
+        except OSError as e:
+            raise CommandError(f'Não foi possível ler o arquivo: {e}')
+
+        for line, message in result.errors:
+            self.stdout.write(self.style.ERROR(f'Linha {line}: {message}'))  # type: ignore
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING(  # type: ignore
+                    f'Modo DRY RUN - {result.total_rows} linha(s) lida(s), {len(result.errors)} erro(s).'
+                )
+            )
+        elif result.created:
+            self.stdout.write(
+                self.style.SUCCESS(f'{result.created} evento(s) importado(s) de {result.total_rows} linha(s).')  # type: ignore
+            )
+        elif result.errors:
+            raise CommandError('Nenhum evento importado. Corrija os erros ou use --skip-invalid.')
+        else:
+            self.stdout.write('Nenhum evento encontrado no arquivo.')
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.utils import timezone
-from events.models import EventType, Location, Department, Event  # EventParticipant removed
+from events.models import EventType, Location, Department, Event, EventSeries  # EventParticipant removed
 from accounts.models import UserProfile
 from reports.models import Report
 
@@ -188,10 +188,10 @@ class Command(BaseCommand):
         
         now = timezone.now()
         start_date = now - timedelta(days=30)  # Começar 1 mês atrás
-        end_date = now + timedelta(days=90)    # Terminar 3 meses à frente
         
         # Tipos de recorrência
         recurrence_types = ['diário', 'semanal', 'mensal']
+        recurrence_rules = {'diário': 'DAILY', 'semanal': 'WEEKLY', 'mensal': 'MONTHLY'}
         statuses = ['planejado', 'em_andamento', 'concluido', 'cancelado']
         location_modes = ['presencial', 'virtual', 'hibrido']
         target_audiences = ['publico_interno', 'publico_externo', 'ambos']
@@ -237,44 +237,14 @@ class Command(BaseCommand):
                     is_public=True
                 )
                 
-                self.stdout.write(f'Evento recorrente base criado: {event.name} - {recurrence_type}')
+                # Recorrência como regra (RRULE): as demais ocorrências não são gravadas,
+                # são expandidas sob demanda no calendário, feeds e listagem
+                EventSeries.objects.create(  # type: ignore
+                    event=event,
+                    rrule=f'FREQ={recurrence_rules[recurrence_type]};COUNT=6'
+                )
                 
-                # Criar instâncias recorrentes (5 instâncias para cada)
-                for j in range(1, 6):
-                    if recurrence_type == 'diário':
-                        instance_date = start_datetime + timedelta(days=j)
-                    elif recurrence_type == 'semanal':
-                        instance_date = start_datetime + timedelta(weeks=j)
-                    else:  # mensal
-                        instance_date = start_datetime + timedelta(days=30*j)
-                    
-                    # Ajustar para não ultrapassar o limite final
-                    if instance_date > end_date:
-                        break
-                    
-                    instance_start = instance_date.replace(hour=hour, minute=0)
-                    instance_end = instance_start + timedelta(hours=1)
-                    
-                    # Criar instância do evento recorrente
-                    recurring_event = Event.objects.create(  # type: ignore
-                        name=f'{event.name} - Instância {j}',
-                        event_type=event_type,
-                        start_datetime=instance_start,
-                        end_datetime=instance_end,
-                        location_mode=location_mode,
-                        location=location,
-                        virtual_link='https://meet.google.com/test-recurring' if location_mode in ['virtual', 'hibrido'] else '',
-                        target_audience=target_audience,
-                        responsible_person=responsible,
-                        department=department,
-                        status=random.choice(statuses),  # Status pode variar nas instâncias
-                        description=f'Instância {j} do {event.name}',
-                        observations=f'Instância {j} gerada automaticamente',
-                        created_by=creator,
-                        is_public=True
-                    )
-                    
-                    self.stdout.write(f'  Instância criada: {recurring_event.name} - {instance_start.strftime("%d/%m/%Y %H:%M")}')
+                self.stdout.write(f'Evento recorrente criado: {event.name} - {recurrence_type} (6 ocorrências)')
     
     def generate_participants(self):
         """Participantes functionality has been removed from the system"""
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from events.deletion import PURGE_CHUNK_SIZE, deleted_events, purge_deleted_events
+from events.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Remove definitivamente os eventos excluídos, com notificações e histórico, em lotes pequenos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PURGE_CHUNK_SIZE,
+            help=f'Linhas dependentes removidas por transação (padrão: {PURGE_CHUNK_SIZE})',
+        )
+
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=0,
+            metavar='MINUTOS',
+            help='Remove apenas eventos excluídos há mais de MINUTOS (padrão: 0)',
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra quantos eventos seriam removidos',
+        )
+
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SEGUNDOS',
+            help='Executa continuamente, verificando a cada SEGUNDOS (0 = executa uma vez)',
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(minutes=options['older_than'])
+
+        if options['dry_run']:
+            count = deleted_events(older_than).count()
+            self.stdout.write(
+                self.style.WARNING(f'Modo DRY RUN - {count} evento(s) excluído(s) seriam removidos')  # type: ignore
+            )
+            return
+
+        while True:
+            purged = purge_deleted_events(chunk_size=options['chunk_size'], older_than=older_than)
+            if purged:
+                self.stdout.write(self.style.SUCCESS(f'{purged} evento(s) excluído(s) removidos definitivamente'))  # type: ignore
+            # Registros de remoção dos feeds incrementais além da retenção
+            purge_tombstones()
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,36 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from events.feed_store import FEED_MAX_AGE, refresh_calendar_feeds
+
+
+class Command(BaseCommand):
+    help = 'Regenera os feeds de calendário desatualizados por alterações de eventos ou expirados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            default=int(FEED_MAX_AGE.total_seconds() // 60),
+            metavar='MINUTOS',
+            help=f'Regenera também feeds gerados há mais de MINUTOS (padrão: {int(FEED_MAX_AGE.total_seconds() // 60)})',
+        )
+
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SEGUNDOS',
+            help='Executa continuamente, verificando a cada SEGUNDOS (0 = executa uma vez)',
+        )
+
+    def handle(self, *args, **options):
+        max_age = timedelta(minutes=options['max_age'])
+
+        while True:
+            refreshed = refresh_calendar_feeds(max_age=max_age)
+            if refreshed:
+                self.stdout.write(self.style.SUCCESS(f'{refreshed} feed(s) de calendário regenerado(s)'))  # type: ignore
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
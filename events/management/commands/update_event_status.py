@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from events.transitions import apply_status_transitions, pending_transitions
+
+
+class Command(BaseCommand):
+    help = 'Atualiza o status dos eventos pelo horário (planejado → em andamento → concluído)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas mostra quantos eventos seriam alterados',
+        )
+
+        parser.add_argument(
+            '--loop',
+            type=int,
+            default=0,
+            metavar='SEGUNDOS',
+            help='Executa continuamente, verificando a cada SEGUNDOS (0 = executa uma vez)',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            pending = pending_transitions()
+            self.stdout.write(
+                self.style.WARNING(  # type: ignore
+                    f"Modo DRY RUN - {len(pending['em_andamento'])} evento(s) iniciariam e "
+                    f"{len(pending['concluido'])} seriam concluídos"
+                )
+            )
+            return
+
+        while True:
+            self._run_once()
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def _run_once(self):
+        changed = apply_status_transitions()
+        if any(changed.values()):
+            self.stdout.write(
+                self.style.SUCCESS(  # type: ignore
+                    f"{timezone.localtime().strftime('%d/%m/%Y %H:%M:%S')} - "
+                    f"{changed['em_andamento']} evento(s) em andamento, {changed['concluido']} concluído(s)"
+                )
+            )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_remove_document_model'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_datetime', 'end_datetime'], name='events_even_start_d_e338a8_idx'),
+        ),
+    ]
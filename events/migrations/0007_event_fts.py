@@ -0,0 +1,65 @@
+from django.db import migrations, OperationalError
+
+FTS_TABLE = 'events_event_fts'
+
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        event_id UNINDEXED, name, description, observations,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""INSERT INTO {FTS_TABLE} (event_id, name, description, observations)
+        SELECT id, name, description, observations FROM events_event""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON events_event BEGIN
+        INSERT INTO {FTS_TABLE} (event_id, name, description, observations)
+        VALUES (new.id, new.name, new.description, new.observations);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON events_event BEGIN
+        DELETE FROM {FTS_TABLE} WHERE event_id = old.id;
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, description, observations ON events_event BEGIN
+        DELETE FROM {FTS_TABLE} WHERE event_id = old.id;
+        INSERT INTO {FTS_TABLE} (event_id, name, description, observations)
+        VALUES (new.id, new.name, new.description, new.observations);
+    END""",
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    """Cria o índice FTS5 (apenas SQLite com FTS5 disponível)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(content)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+        except OperationalError:
+            # SQLite compilado sem FTS5: a busca usa o fallback com icontains
+            return
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_event_range_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
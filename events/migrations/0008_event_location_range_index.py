@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location', 'start_datetime', 'end_datetime'], name='events_even_locatio_647872_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_event_location_range_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rrule', models.CharField(help_text='Formato RFC 5545, ex.: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10', max_length=500, verbose_name='Regra de Recorrência')),
+                ('ends_at', models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='Término da Última Ocorrência')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='events.event', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Série de Eventos',
+                'verbose_name_plural': 'Séries de Eventos',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventSeriesException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField(verbose_name='Início Original da Ocorrência')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('replacement', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='replaced_occurrence', to='events.event', verbose_name='Evento Substituto')),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='events.eventseries', verbose_name='Série')),
+            ],
+            options={
+                'verbose_name': 'Exceção da Série',
+                'verbose_name_plural': 'Exceções das Séries',
+                'ordering': ['original_start'],
+                'constraints': [models.UniqueConstraint(fields=('series', 'original_start'), name='unique_series_exception')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_series'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200, verbose_name='Nome do Evento')),
+                ('start_datetime', models.DateTimeField(verbose_name='Data e Hora de Início')),
+                ('end_datetime', models.DateTimeField(verbose_name='Data e Hora de Término')),
+                ('location_mode', models.CharField(choices=[('presencial', 'Presencial'), ('virtual', 'Virtual'), ('hibrido', 'Híbrido')], max_length=20, verbose_name='Modalidade do Evento')),
+                ('virtual_link', models.URLField(blank=True, verbose_name='Link Virtual')),
+                ('target_audience', models.CharField(choices=[('publico_interno', 'Público Interno'), ('publico_externo', 'Público Externo'), ('ambos', 'Ambos')], max_length=20, verbose_name='Público-alvo')),
+                ('status', models.CharField(choices=[('planejado', 'Planejado'), ('em_andamento', 'Em Andamento'), ('concluido', 'Concluído'), ('cancelado', 'Cancelado')], max_length=20, verbose_name='Status')),
+                ('description', models.TextField(blank=True, verbose_name='Descrição')),
+                ('observations', models.TextField(blank=True, verbose_name='Observações')),
+                ('created_at', models.DateTimeField(verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(verbose_name='Atualizado em')),
+                ('is_public', models.BooleanField(default=False, verbose_name='Evento Público')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Arquivado em')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='events.department', verbose_name='Departamento Responsável')),
+                ('event_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='events.eventtype', verbose_name='Tipo de Evento')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='events.location', verbose_name='Localização')),
+                ('responsible_person', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Responsável do Evento')),
+            ],
+            options={
+                'verbose_name': 'Evento Arquivado',
+                'verbose_name_plural': 'Eventos Arquivados',
+                'ordering': ['-start_datetime'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEventHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=50, verbose_name='Campo Alterado')),
+                ('old_value', models.TextField(verbose_name='Valor Anterior')),
+                ('new_value', models.TextField(verbose_name='Novo Valor')),
+                ('changed_at', models.DateTimeField(verbose_name='Data da Alteração')),
+                ('changed_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Alterado por')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='events.archivedevent')),
+            ],
+            options={
+                'verbose_name': 'Histórico do Evento Arquivado',
+                'verbose_name_plural': 'Histórico dos Eventos Arquivados',
+                'ordering': ['-changed_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['start_datetime'], name='events_arch_start_d_8d5edb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['department'], name='events_arch_departm_ac3d13_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_archived_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='Excluído em'),
+        ),
+    ]
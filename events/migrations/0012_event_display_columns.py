@@ -0,0 +1,107 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:17
+
+from importlib import import_module
+from django.db import migrations, models
+
+# No SQLite, as novas colunas com valor padrão recriam a tabela events_event,
+# descartando os gatilhos do índice FTS: o índice é recriado ao final
+fts = import_module('events.migrations.0007_event_fts')
+
+
+def rebuild_fts_index(apps, schema_editor):
+    fts.drop_fts_index(apps, schema_editor)
+    fts.create_fts_index(apps, schema_editor)
+
+
+def fill_display_columns(apps, schema_editor):
+    """Preenche as colunas de exibição dos eventos existentes (uma UPDATE por cadastro)"""
+    EventType = apps.get_model('events', 'EventType')
+    Location = apps.get_model('events', 'Location')
+    Department = apps.get_model('events', 'Department')
+    User = apps.get_model('auth', 'User')
+    models_to_fill = [apps.get_model('events', 'Event'), apps.get_model('events', 'ArchivedEvent')]
+
+    type_labels = dict(EventType._meta.get_field('name').choices)
+    location_labels = dict(Location._meta.get_field('name').choices)
+
+    def fill(field, obj, **values):
+        for model in models_to_fill:
+            model.objects.filter(**{field: obj}).update(**values)
+
+    for event_type in EventType.objects.all():
+        fill('event_type', event_type, event_type_label=type_labels.get(event_type.name, event_type.name),
+             event_type_color=event_type.color)
+    for location in Location.objects.all():
+        display = location_labels.get(location.name, location.name)
+        if location.custom_name:
+            display = f'{display} - {location.custom_name}'
+        fill('location', location, location_display=display)
+    for department in Department.objects.all():
+        fill('department', department, department_name=department.name)
+    for user in User.objects.all():
+        fill('responsible_person', user,
+             responsible_name=f'{user.first_name} {user.last_name}'.strip() or user.username)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_deleted_at'),
+    ]
+
+    operations = [
+        # Ao desfazer, executado por último (após a remoção das colunas)
+        migrations.RunPython(migrations.RunPython.noop, rebuild_fts_index),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='department_name',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Departamento (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='event_type_color',
+            field=models.CharField(blank=True, max_length=7, verbose_name='Cor do tipo'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='event_type_label',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Tipo (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='location_display',
+            field=models.CharField(blank=True, max_length=160, verbose_name='Local (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='archivedevent',
+            name='responsible_name',
+            field=models.CharField(blank=True, max_length=320, verbose_name='Responsável (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='department_name',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Departamento (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='event_type_color',
+            field=models.CharField(blank=True, editable=False, max_length=7, verbose_name='Cor do tipo'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='event_type_label',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Tipo (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='location_display',
+            field=models.CharField(blank=True, editable=False, max_length=160, verbose_name='Local (exibição)'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='responsible_name',
+            field=models.CharField(blank=True, editable=False, max_length=320, verbose_name='Responsável (exibição)'),
+        ),
+        migrations.RunPython(fill_display_columns, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_fts_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_event_display_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_key', models.CharField(max_length=80, verbose_name='Evento ou Ocorrência')),
+                ('start_datetime', models.DateTimeField(verbose_name='Data e Hora de Início')),
+                ('end_datetime', models.DateTimeField(verbose_name='Data e Hora de Término')),
+                ('is_public', models.BooleanField(default=False, verbose_name='Evento Público')),
+                ('reason', models.CharField(choices=[('deleted', 'Excluído'), ('hidden', 'Fora do feed')], max_length=10, verbose_name='Motivo')),
+                ('removed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Removido em')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='events.department', verbose_name='Departamento Responsável')),
+                ('responsible_person', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Responsável do Evento')),
+            ],
+            options={
+                'verbose_name': 'Evento Removido dos Feeds',
+                'verbose_name_plural': 'Eventos Removidos dos Feeds',
+                'ordering': ['removed_at'],
+            },
+        ),
+    ]
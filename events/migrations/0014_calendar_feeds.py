@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_event_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarFeed',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='Chave')),
+                ('kind', models.CharField(choices=[('public', 'Público'), ('department', 'Departamento'), ('user', 'Pessoal')], max_length=10, verbose_name='Tipo')),
+                ('sees_all', models.BooleanField(default=False, verbose_name='Vê todos os eventos')),
+                ('token', models.CharField(blank=True, max_length=64, verbose_name='Token de acesso')),
+                ('filename', models.CharField(max_length=200, verbose_name='Nome do arquivo')),
+                ('body', models.BinaryField(verbose_name='Conteúdo')),
+                ('etag', models.CharField(max_length=50, verbose_name='ETag')),
+                ('sync_token', models.CharField(blank=True, max_length=200, verbose_name='Token de sincronização')),
+                ('generated_at', models.DateTimeField(verbose_name='Gerado em')),
+                ('dirty_since', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Desatualizado desde')),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.department', verbose_name='Departamento')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Feed de Calendário',
+                'verbose_name_plural': 'Feeds de Calendário',
+            },
+        ),
+    ]
@@ -100,6 +100,34 @@ class Location(models.Model):
         return name_display
 
 
+class EventQuerySet(models.QuerySet):
+    """Consultas reutilizáveis sobre eventos"""
+    
+    def overlapping(self, range_start, range_end):
+        """Eventos que se sobrepõem ao intervalo [range_start, range_end)"""
+        return self.filter(start_datetime__lt=range_end, end_datetime__gt=range_start)
+    
+    def series_active_in(self, range_start, range_end):
+        """Eventos-modelo de séries que podem ter ocorrências no intervalo"""
+        return self.filter(
+            series__isnull=False,
+            start_datetime__lt=range_end,
+        ).filter(
+            models.Q(series__ends_at__isnull=True) | models.Q(series__ends_at__gt=range_start)
+        )
+    
+    def display_projection(self, *extra_fields):
+        """Modo de projeção: só as colunas exibidas (nomes desnormalizados), sem joins"""
+        return self.only(*self.model.DISPLAY_PROJECTION, *extra_fields)
+
+
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    """Gerenciador padrão: oculta eventos excluídos que aguardam a remoção definitiva"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Event(models.Model):
     """Modelo principal para eventos institucionais"""
     
@@ -160,12 +188,30 @@ class Event(models.Model):
     # Campos de visibilidade
     is_public = models.BooleanField(default=False, verbose_name="Evento Público", help_text="Visível na área pública do sistema")  # type: ignore
     
+    # Colunas de exibição desnormalizadas (mantidas em sincronia com os cadastros por sinais)
+    event_type_label = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Tipo (exibição)")
+    event_type_color = models.CharField(max_length=7, blank=True, editable=False, verbose_name="Cor do tipo")
+    location_display = models.CharField(max_length=160, blank=True, editable=False, verbose_name="Local (exibição)")
+    department_name = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Departamento (exibição)")
+    responsible_name = models.CharField(max_length=320, blank=True, editable=False, verbose_name="Responsável (exibição)")
+    
+    # Exclusão lógica (as linhas dependentes são removidas por purge_deleted_events)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True, verbose_name="Excluído em")
+    
+    objects = EventManager()
+    # Inclui os eventos excluídos (remoção definitiva e manutenção)
+    all_objects = EventQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
         ordering = ['-start_datetime']
         indexes = [
             models.Index(fields=['start_datetime']),
+            # Consultas de sobreposição de intervalo (calendário)
+            models.Index(fields=['start_datetime', 'end_datetime']),
+            # Detecção de reservas simultâneas por local
+            models.Index(fields=['location', 'start_datetime', 'end_datetime']),
             models.Index(fields=['status']),
             models.Index(fields=['event_type']),
             models.Index(fields=['department']),
@@ -174,9 +220,48 @@ class Event(models.Model):
     def __str__(self) -> str:
         return f"{self.name} - {self.start_datetime.strftime('%d/%m/%Y %H:%M')}"  # type: ignore
     
+    # Colunas de exibição derivadas de cada relacionamento
+    DISPLAY_COLUMNS = {
+        'event_type': ('event_type_label', 'event_type_color'),
+        'location': ('location_display',),
+        'department': ('department_name',),
+        'responsible_person': ('responsible_name',),
+    }
+    
+    # Colunas lidas pelo modo de projeção (listagens, calendário e exportações)
+    DISPLAY_PROJECTION = (
+        'id', 'name', 'start_datetime', 'end_datetime', 'status', 'is_public', 'description', 'updated_at',
+        'event_type_label', 'event_type_color', 'location_display', 'department_name', 'responsible_name',
+    )
+    
+    def save(self, *args, **kwargs):
+        self.refresh_display_fields()
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('events:event_detail', kwargs={'pk': self.pk})
     
+    @staticmethod
+    def display_values(field, obj):
+        """Valores das colunas de exibição para o objeto relacionado (None = sem relacionamento)"""
+        if field == 'event_type':
+            return {
+                'event_type_label': obj.get_name_display() if obj else '',
+                'event_type_color': obj.color if obj else '',
+            }
+        if field == 'location':
+            return {'location_display': str(obj) if obj else ''}
+        if field == 'department':
+            return {'department_name': obj.name if obj else ''}
+        return {'responsible_name': (obj.get_full_name() or obj.username) if obj else ''}
+    
+    def refresh_display_fields(self):
+        """Atualiza as colunas de exibição a partir dos relacionamentos"""
+        for field in self.DISPLAY_COLUMNS:
+            obj = getattr(self, field) if getattr(self, f'{field}_id') else None
+            for column, value in self.display_values(field, obj).items():
+                setattr(self, column, value)
+    
     @property
     def is_past(self):
         """Verifica se o evento já passou"""
@@ -233,6 +318,132 @@ class Event(models.Model):
 # EventDocument model has been removed as requested
 
 
+class EventSeries(models.Model):
+    """Recorrência de um evento (RRULE)
+    
+    O evento associado é a primeira ocorrência e o modelo das demais, que não
+    são gravadas: são expandidas apenas para o intervalo consultado.
+    """
+    # Limite de ocorrências consideradas ao calcular o fim de séries finitas
+    MAX_OCCURRENCES = 1000
+    
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='series', verbose_name="Evento")
+    rrule = models.CharField(max_length=500, verbose_name="Regra de Recorrência",
+                           help_text="Formato RFC 5545, ex.: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10")
+    ends_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True,
+                                 verbose_name="Término da Última Ocorrência")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Série de Eventos"
+        verbose_name_plural = "Séries de Eventos"
+    
+    def __str__(self) -> str:
+        return f"{self.event.name} ({self.rrule})"
+    
+    def get_rule(self, dtstart=None):
+        """Regra do dateutil com início na primeira ocorrência (horário local)"""
+        from dateutil.rrule import rrulestr
+        
+        rule = self.rrule.strip()
+        if rule.upper().startswith('RRULE:'):
+            rule = rule[6:]
+        return rrulestr(rule, dtstart=dtstart or timezone.localtime(self.event.start_datetime))
+    
+    @property
+    def duration(self):
+        return self.event.end_datetime - self.event.start_datetime
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        
+        try:
+            # O evento pode ainda não estar gravado (inline do admin)
+            self.get_rule(dtstart=timezone.localtime())
+        except (ValueError, TypeError) as e:
+            raise ValidationError({'rrule': f"Regra de recorrência inválida: {e}"})
+    
+    def save(self, *args, **kwargs):
+        self.ends_at = self._compute_ends_at()
+        super().save(*args, **kwargs)
+    
+    def _compute_ends_at(self):
+        """Fim da última ocorrência, ou None para séries sem término"""
+        if 'COUNT=' not in self.rrule.upper() and 'UNTIL=' not in self.rrule.upper():
+            return None
+        last = None
+        for index, start in enumerate(self.get_rule()):
+            if index >= self.MAX_OCCURRENCES:
+                return None
+            last = start
+        return last + self.duration if last else self.event.end_datetime
+    
+    def occurrences(self, range_start, range_end):
+        """(início, fim) das ocorrências virtuais que se sobrepõem ao intervalo
+        
+        Exclui a primeira ocorrência (o próprio evento) e as ocorrências com
+        exceção registrada (canceladas ou substituídas por um evento editado).
+        """
+        duration = self.duration
+        first_start = self.event.start_datetime
+        skipped = {exception.original_start for exception in self.exceptions.all()}
+        
+        starts = self.get_rule().between(
+            timezone.localtime(range_start - duration), timezone.localtime(range_end), inc=True
+        )
+        for start in starts:
+            end = start + duration
+            if start == first_start or start in skipped:
+                continue
+            if start < range_end and end > range_start:
+                yield start, end
+    
+    def cancel_occurrence(self, original_start):
+        """Remove uma ocorrência da série"""
+        exception, _ = self.exceptions.get_or_create(original_start=original_start)
+        return exception
+    
+    def detach_occurrence(self, original_start, **changes):
+        """Grava uma ocorrência como evento próprio (edição de uma única ocorrência)"""
+        template = self.event
+        excluded = {'id', 'created_at', 'updated_at'}
+        values = {
+            field.attname: getattr(template, field.attname)
+            for field in Event._meta.concrete_fields if field.name not in excluded
+        }
+        values['start_datetime'] = original_start
+        values['end_datetime'] = original_start + self.duration
+        values.update(changes)
+        
+        replacement = Event.objects.create(**values)
+        self.exceptions.update_or_create(
+            original_start=original_start, defaults={'replacement': replacement}
+        )
+        return replacement
+
+
+class EventSeriesException(models.Model):
+    """Ocorrência de uma série cancelada ou substituída por um evento editado"""
+    series = models.ForeignKey(EventSeries, on_delete=models.CASCADE, related_name='exceptions',
+                             verbose_name="Série")
+    original_start = models.DateTimeField(verbose_name="Início Original da Ocorrência")
+    replacement = models.OneToOneField(Event, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='replaced_occurrence', verbose_name="Evento Substituto")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    
+    class Meta:
+        verbose_name = "Exceção da Série"
+        verbose_name_plural = "Exceções das Séries"
+        ordering = ['original_start']
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'original_start'], name='unique_series_exception'),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.series.event.name} - {self.original_start.strftime('%d/%m/%Y %H:%M')}"  # type: ignore
+
+
 class EventHistory(models.Model):
     """Histórico de alterações dos eventos (versionamento)"""
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='history')
@@ -250,3 +461,136 @@ class EventHistory(models.Model):
     def __str__(self) -> str:
         return f"{self.event.name} - {self.field_name} - {self.changed_at.strftime('%d/%m/%Y %H:%M')}"  # type: ignore
 
+
+
+class ArchivedEvent(models.Model):
+    """Eventos concluídos ou cancelados antigos, movidos para fora da tabela principal
+    
+    Mesmas colunas de Event; preenchido pelo comando archive_events e
+    consultado pelos relatórios quando o período alcança o arquivo.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    name = models.CharField(max_length=200, verbose_name="Nome do Evento")
+    event_type = models.ForeignKey(EventType, on_delete=models.PROTECT, related_name='+', verbose_name="Tipo de Evento")
+    start_datetime = models.DateTimeField(verbose_name="Data e Hora de Início")
+    end_datetime = models.DateTimeField(verbose_name="Data e Hora de Término")
+    location_mode = models.CharField(max_length=20, choices=Event.LOCATION_MODE_CHOICES, verbose_name="Modalidade do Evento")
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+', null=True, blank=True,
+                               verbose_name="Localização")
+    virtual_link = models.URLField(blank=True, verbose_name="Link Virtual")
+    target_audience = models.CharField(max_length=20, choices=Event.TARGET_AUDIENCE_CHOICES, verbose_name="Público-alvo")
+    responsible_person = models.ForeignKey(User, on_delete=models.PROTECT, related_name='+',
+                                         verbose_name="Responsável do Evento")
+    department = models.ForeignKey(Department, on_delete=models.PROTECT, related_name='+',
+                                 verbose_name="Departamento Responsável")
+    status = models.CharField(max_length=20, choices=Event.STATUS_CHOICES, verbose_name="Status")
+    description = models.TextField(blank=True, verbose_name="Descrição")
+    observations = models.TextField(blank=True, verbose_name="Observações")
+    created_at = models.DateTimeField(verbose_name="Criado em")
+    updated_at = models.DateTimeField(verbose_name="Atualizado em")
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='+', verbose_name="Criado por")
+    is_public = models.BooleanField(default=False, verbose_name="Evento Público")  # type: ignore
+    event_type_label = models.CharField(max_length=100, blank=True, verbose_name="Tipo (exibição)")
+    event_type_color = models.CharField(max_length=7, blank=True, verbose_name="Cor do tipo")
+    location_display = models.CharField(max_length=160, blank=True, verbose_name="Local (exibição)")
+    department_name = models.CharField(max_length=100, blank=True, verbose_name="Departamento (exibição)")
+    responsible_name = models.CharField(max_length=320, blank=True, verbose_name="Responsável (exibição)")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Arquivado em")
+    
+    class Meta:
+        verbose_name = "Evento Arquivado"
+        verbose_name_plural = "Eventos Arquivados"
+        ordering = ['-start_datetime']
+        indexes = [
+            models.Index(fields=['start_datetime']),
+            models.Index(fields=['department']),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.name} - {self.start_datetime.strftime('%d/%m/%Y %H:%M')}"  # type: ignore
+
+
+class ArchivedEventHistory(models.Model):
+    """Histórico dos eventos arquivados"""
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name='history')
+    field_name = models.CharField(max_length=50, verbose_name="Campo Alterado")
+    old_value = models.TextField(verbose_name="Valor Anterior")
+    new_value = models.TextField(verbose_name="Novo Valor")
+    changed_at = models.DateTimeField(verbose_name="Data da Alteração")
+    changed_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='+', verbose_name="Alterado por")
+    
+    class Meta:
+        verbose_name = "Histórico do Evento Arquivado"
+        verbose_name_plural = "Histórico dos Eventos Arquivados"
+        ordering = ['-changed_at']
+
+
+class EventTombstone(models.Model):
+    """Evento (ou ocorrência de série) que saiu dos feeds de calendário
+    
+    Registrado quando o evento é excluído ou deixa de ser visível para parte
+    dos assinantes (ficou privado, mudou de departamento ou de responsável).
+    Os feeds incrementais (sync_token) enviam esses registros como eventos
+    cancelados; as colunas de acesso guardam os valores anteriores à mudança.
+    """
+    REASON_CHOICES = [
+        ('deleted', 'Excluído'),
+        ('hidden', 'Fora do feed'),
+    ]
+    
+    event_key = models.CharField(max_length=80, verbose_name="Evento ou Ocorrência")
+    start_datetime = models.DateTimeField(verbose_name="Data e Hora de Início")
+    end_datetime = models.DateTimeField(verbose_name="Data e Hora de Término")
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                                 verbose_name="Departamento Responsável")
+    is_public = models.BooleanField(default=False, verbose_name="Evento Público")  # type: ignore
+    responsible_person = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                                         verbose_name="Responsável do Evento")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                                 verbose_name="Criado por")
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES, verbose_name="Motivo")
+    removed_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Removido em")
+    
+    class Meta:
+        verbose_name = "Evento Removido dos Feeds"
+        verbose_name_plural = "Eventos Removidos dos Feeds"
+        ordering = ['removed_at']
+    
+    def __str__(self) -> str:
+        return f"{self.event_key} ({self.get_reason_display()})"  # type: ignore
+
+
+class CalendarFeed(models.Model):
+    """Feed de calendário pré-gerado, servido aos assinantes sem consultar eventos
+    
+    Regenerado em segundo plano (comando refresh_calendar_feeds) quando
+    alterações de eventos o marcam como desatualizado ou quando expira.
+    """
+    KIND_CHOICES = [
+        ('public', 'Público'),
+        ('department', 'Departamento'),
+        ('user', 'Pessoal'),
+    ]
+    
+    key = models.CharField(max_length=40, primary_key=True, verbose_name="Chave")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Tipo")
+    # Departamento do feed ou, em feeds pessoais de gestores, o departamento visível ao gestor
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+                                 verbose_name="Departamento")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+                           verbose_name="Usuário")
+    sees_all = models.BooleanField(default=False, verbose_name="Vê todos os eventos")  # type: ignore
+    token = models.CharField(max_length=64, blank=True, verbose_name="Token de acesso")
+    filename = models.CharField(max_length=200, verbose_name="Nome do arquivo")
+    body = models.BinaryField(verbose_name="Conteúdo")
+    etag = models.CharField(max_length=50, verbose_name="ETag")
+    sync_token = models.CharField(max_length=200, blank=True, verbose_name="Token de sincronização")
+    generated_at = models.DateTimeField(verbose_name="Gerado em")
+    dirty_since = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name="Desatualizado desde")
+    
+    class Meta:
+        verbose_name = "Feed de Calendário"
+        verbose_name_plural = "Feeds de Calendário"
+    
+    def __str__(self) -> str:
+        return self.key
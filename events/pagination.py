@@ -0,0 +1,115 @@
+"""
+Keyset (seek) pagination for event listings
+
+Pages are addressed by an opaque cursor holding the (start_datetime, id) of
+the boundary row instead of an OFFSET, so every page costs the same as the
+first one and no COUNT is needed to paginate.
+"""
+import base64
+import json
+import uuid
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(direction, row):
+    """Gera o cursor opaco para a linha limite (modelo ou dict de .values())"""
+    if isinstance(row, dict):
+        start, pk = row['start_datetime'], row['id']
+    else:
+        start, pk = row.start_datetime, row.pk
+    payload = json.dumps({'d': direction, 's': start.isoformat(), 'id': str(pk)})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodifica um cursor; retorna (direção, start_datetime, id) ou None se inválido"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        start = parse_datetime(payload['s'])
+        if payload['d'] not in ('next', 'prev') or start is None:
+            return None
+        return payload['d'], start, uuid.UUID(str(payload['id']))
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class KeysetPage:
+    """Página de resultados com a mesma interface básica de django.core.paginator.Page"""
+
+    def __init__(self, object_list, has_next, has_previous, total_count=None):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.total_count = total_count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor('next', self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor('prev', self.object_list[0])
+
+
+def keyset_paginate(queryset, cursor=None, per_page=20, total_count=None):
+    """Pagina o queryset em ordem decrescente de (start_datetime, id)
+
+    Args:
+        queryset: QuerySet de eventos (modelos ou .values() com start_datetime e id)
+        cursor: cursor recebido do cliente (next_cursor/previous_cursor)
+        per_page: itens por página
+        total_count: total opcional (ex.: get_cached_count) exibido junto à página
+    """
+    position = decode_cursor(cursor)
+
+    if position is None:
+        rows = list(queryset.order_by('-start_datetime', '-id')[:per_page + 1])
+        return KeysetPage(rows[:per_page], len(rows) > per_page, False, total_count)
+
+    direction, start, pk = position
+    if direction == 'next':
+        rows = list(queryset.filter(
+            Q(start_datetime__lt=start) | Q(start_datetime=start, id__lt=pk)
+        ).order_by('-start_datetime', '-id')[:per_page + 1])
+        return KeysetPage(rows[:per_page], len(rows) > per_page, True, total_count)
+
+    rows = list(queryset.filter(
+        Q(start_datetime__gt=start) | Q(start_datetime=start, id__gt=pk)
+    ).order_by('start_datetime', 'id')[:per_page + 1])
+    has_previous = len(rows) > per_page
+    rows = rows[:per_page]
+    rows.reverse()
+    return KeysetPage(rows, True, has_previous, total_count)
+
+
+def get_cached_count(queryset, cache_key, timeout=300):
+    """Total do queryset em cache; a chave deve incluir a versão dos dados e os filtros"""
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, timeout)
+    return count
@@ -0,0 +1,53 @@
+"""
+Lazy expansion of recurring event series
+
+Only the first occurrence of a series is an Event row. The remaining
+occurrences are generated from the series RRULE for the requested window
+by ``expand_occurrences`` and exposed as ``Occurrence`` objects, which
+behave like the template event with their own start and end.
+"""
+from datetime import timezone as dt_timezone
+from django.db.models import Prefetch
+from .models import EventSeriesException
+
+
+class Occurrence:
+    """Ocorrência virtual de uma série: o evento-modelo em outro horário"""
+
+    is_occurrence = True
+
+    def __init__(self, event, start_datetime, end_datetime):
+        self.event = event
+        self.start_datetime = start_datetime
+        self.end_datetime = end_datetime
+
+    def __getattr__(self, name):
+        return getattr(self.event, name)
+
+    @property
+    def occurrence_key(self):
+        """Identificador estável da ocorrência (evento + início em UTC)"""
+        return f"{self.event.pk}_{self.start_datetime.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%S')}"
+
+    def __repr__(self):
+        return f'<Occurrence {self.occurrence_key}>'
+
+
+def expand_occurrences(queryset, range_start, range_end):
+    """Ocorrências virtuais das séries do queryset que se sobrepõem ao intervalo
+
+    O queryset deve conter os filtros de acesso e de listagem, mas não o filtro
+    de intervalo: eventos-modelo de séries começam antes das ocorrências.
+    São feitas duas consultas (eventos-modelo e exceções), em ordem de início.
+    """
+    templates = queryset.series_active_in(range_start, range_end).select_related('series').prefetch_related(
+        Prefetch('series__exceptions', queryset=EventSeriesException.objects.only('series_id', 'original_start'))
+    )
+
+    occurrences = [
+        Occurrence(event, start, end)
+        for event in templates
+        for start, end in event.series.occurrences(range_start, range_end)
+    ]
+    occurrences.sort(key=lambda occurrence: occurrence.start_datetime)
+    return occurrences
@@ -0,0 +1,107 @@
+"""
+Full-text search over event name, description and observations
+
+On SQLite the search uses an FTS5 virtual table (``events_event_fts``) kept
+in sync by database triggers, created in migration 0007. Other backends, or
+SQLite builds without FTS5, fall back to ``icontains`` lookups.
+"""
+import re
+from django.db import connection
+from django.db.models import Q, Value, FloatField, CharField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+FTS_TABLE = 'events_event_fts'
+
+# Pesos do bm25 por coluna: event_id (não indexada), name, description, observations
+FTS_WEIGHTS = (0.0, 10.0, 4.0, 1.0)
+
+# Marcadores usados pelo snippet() antes do escape do HTML
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+_fts_available = None
+
+
+def fts_available():
+    """Verifica (uma vez por processo) se o índice FTS5 existe no banco"""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available
+
+
+def _uses_fts(queryset, match):
+    """O índice FTS cobre apenas a tabela principal (eventos arquivados usam icontains)"""
+    return bool(match) and fts_available() and queryset.model._meta.db_table == 'events_event'
+
+
+def build_match_query(term):
+    """Converte o texto digitado em uma expressão MATCH do FTS5
+
+    Cada palavra vira um prefixo entre aspas ("palav"*), combinadas com AND.
+    Retorna None quando o texto não contém palavras pesquisáveis.
+    """
+    words = re.findall(r'\w+', term or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _fts_subquery(select, match):
+    return RawSQL(
+        f'SELECT {select} FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.event_id = "events_event"."id"',
+        (match,)
+    )
+
+
+def search_events(queryset, term):
+    """Filtra o queryset de eventos pelo texto de busca"""
+    term = (term or '').strip()
+    if not term:
+        return queryset
+
+    match = build_match_query(term)
+    if _uses_fts(queryset, match):
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT event_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+        )
+
+    return queryset.filter(
+        Q(name__icontains=term) |
+        Q(description__icontains=term) |
+        Q(observations__icontains=term)
+    )
+
+
+def annotate_search(queryset, term):
+    """Anota search_rank (menor = mais relevante) e search_snippet com o trecho destacado
+
+    Deve ser aplicado a um queryset já filtrado por search_events.
+    """
+    match = build_match_query(term)
+    if not _uses_fts(queryset, match):
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField()),
+            search_snippet=Value('', output_field=CharField()),
+        )
+
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    return queryset.annotate(
+        search_rank=_fts_subquery(f'bm25({FTS_TABLE}, {weights})', match),
+        # Trecho da descrição (coluna 2); os marcadores são convertidos por highlight_snippet
+        search_snippet=_fts_subquery(
+            f"snippet({FTS_TABLE}, 2, char(2), char(3), '…', 16)", match
+        ),
+    )
+
+
+def highlight_snippet(snippet):
+    """Escapa o trecho retornado pelo FTS e destaca os termos com <mark>"""
+    if not snippet:
+        return ''
+    return escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
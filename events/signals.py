@@ -1,36 +1,50 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
+from django.utils import timezone
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Event, EventHistory
+from accounts.models import UserProfile
+from .models import (
+    Event, EventHistory, EventType, Location, Department, EventSeries, EventSeriesException, ArchivedEvent
+)
+from .cache import bump_data_version, bump_related_version
+from .feed_store import mark_feeds_dirty, mark_user_feeds_dirty, mark_all_feeds_dirty
+from .fragments import build_calendar_fragments, rebuild_calendar_fragments
+from .sync import (
+    SCOPE_FIELDS, get_tombstone_retention, record_tombstones, record_event_changes, record_series_change,
+    record_cancelled_occurrence,
+)
 from notifications.services import NotificationService
 
 
+# Campos monitorados no histórico (também usados pelas edições em lote)
+TRACKED_FIELDS = {
+    'name': 'Nome do Evento',
+    'event_type': 'Tipo de Evento',
+    'start_datetime': 'Data/Hora de Início',
+    'end_datetime': 'Data/Hora de Término',
+    'location_mode': 'Modalidade',
+    'location': 'Localização',
+    'virtual_link': 'Link Virtual',
+    'target_audience': 'Público-alvo',
+    'responsible_person': 'Responsável',
+    'department': 'Departamento',
+    'status': 'Status',
+    'description': 'Descrição',
+    'is_public': 'Evento Público',
+}
+
+
 @receiver(pre_save, sender=Event)
 def track_event_changes(sender, instance, **kwargs):
     """Registra mudanças nos eventos para o histórico"""
     if instance.pk:  # Se o evento já existe
         try:
             old_instance = Event.objects.get(pk=instance.pk)
+            instance._old_department_id = old_instance.department_id
+            instance._old_instance = old_instance
             changes = []
             
-            # Campos a serem monitorados
-            tracked_fields = {
-                'name': 'Nome do Evento',
-                'event_type': 'Tipo de Evento',
-                'start_datetime': 'Data/Hora de Início',
-                'end_datetime': 'Data/Hora de Término',
-                'location_mode': 'Modalidade',
-                'location': 'Localização',
-                'virtual_link': 'Link Virtual',
-                'target_audience': 'Público-alvo',
-                'responsible_person': 'Responsável',
-                'department': 'Departamento',
-                'status': 'Status',
-                'description': 'Descrição',
-                'is_public': 'Evento Público',
-            }
-            
-            for field, field_name in tracked_fields.items():
+            for field, field_name in TRACKED_FIELDS.items():
                 old_value = getattr(old_instance, field, None)
                 new_value = getattr(instance, field, None)
                 
@@ -123,4 +137,175 @@ def handle_status_changes(sender, instance, created, **kwargs):
                 NotificationService.create_event_notification(
                     event=instance,
                     notification_type='event_ended'
-                )
\ No newline at end of file
+                )
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_caches(sender, instance, **kwargs):
+    """Invalida os dados de eventos em cache quando um evento muda"""
+    # Departamento atual e, se o evento mudou de departamento, o anterior
+    bump_data_version(department_ids={
+        instance.department_id, getattr(instance, '_old_department_id', instance.department_id)
+    })
+
+
+@receiver(post_save, sender=EventSeries)
+@receiver(post_delete, sender=EventSeries)
+@receiver(post_save, sender=EventSeriesException)
+@receiver(post_delete, sender=EventSeriesException)
+def invalidate_series_caches(sender, **kwargs):
+    """Invalida os dados em cache quando a recorrência ou as exceções de uma série mudam"""
+    bump_data_version()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def mark_event_feeds_dirty(sender, instance, **kwargs):
+    """Feeds que exibem o evento (ou exibiam, antes da alteração) são regenerados em segundo plano"""
+    old_instance = getattr(instance, '_old_instance', None)
+    mark_feeds_dirty([instance, old_instance] if old_instance is not None else [instance])
+
+
+@receiver(post_save, sender=EventSeries)
+@receiver(post_delete, sender=EventSeries)
+@receiver(post_save, sender=EventSeriesException)
+@receiver(post_delete, sender=EventSeriesException)
+def mark_series_feeds_dirty(sender, instance, **kwargs):
+    """Ocorrências de séries aparecem nos feeds do evento-modelo"""
+    if sender is EventSeries:
+        template = Event.all_objects.filter(pk=instance.event_id)
+    else:
+        template = Event.all_objects.filter(series__pk=instance.series_id)
+    mark_feeds_dirty(template.values(*SCOPE_FIELDS))
+
+
+@receiver(post_save, sender=Event)
+def refresh_series_end(sender, instance, created, **kwargs):
+    """Recalcula o término da série quando o horário do evento-modelo muda"""
+    if created:
+        return
+    series = EventSeries.objects.filter(event=instance).first()
+    if series is not None:
+        series.event = instance
+        series.save(update_fields=['ends_at', 'updated_at'])
+
+
+@receiver(post_save, sender=Event)
+def record_feed_removals(sender, instance, created, **kwargs):
+    """Registra para os feeds incrementais o que a alteração tirou deles"""
+    old_instance = getattr(instance, '_old_instance', None)
+    if not created and old_instance is not None:
+        record_event_changes([(old_instance, instance)])
+
+
+@receiver(pre_delete, sender=Event)
+def record_deleted_event(sender, instance, **kwargs):
+    """Registra a exclusão definitiva para os feeds incrementais"""
+    # Exclusões lógicas já foram registradas; eventos encerrados há mais que a
+    # retenção (ex.: arquivados) permanecem no histórico dos assinantes
+    if instance.deleted_at or instance.end_datetime < timezone.now() - get_tombstone_retention():
+        return
+    record_tombstones([instance], 'deleted')
+
+
+@receiver(pre_save, sender=EventSeries)
+def record_series_rule_change(sender, instance, update_fields=None, **kwargs):
+    """A mudança da regra troca as ocorrências da série"""
+    if instance.pk and (update_fields is None or 'rrule' in update_fields):
+        old_series = EventSeries.objects.filter(pk=instance.pk).select_related('event').first()
+        if old_series is not None and old_series.rrule != instance.rrule:
+            record_series_change(old_series)
+
+
+@receiver(pre_delete, sender=EventSeries)
+def record_deleted_series(sender, instance, **kwargs):
+    """Ocorrências de uma série removida saem dos feeds"""
+    # Séries de eventos excluídos logicamente já foram registradas com o evento
+    if not instance.event.deleted_at:
+        record_series_change(instance)
+
+
+@receiver(post_save, sender=EventSeriesException)
+def record_occurrence_exception(sender, instance, created, **kwargs):
+    """Ocorrência cancelada ou substituída sai dos feeds incrementais"""
+    if created:
+        record_cancelled_occurrence(instance)
+
+
+@receiver(post_delete, sender=EventSeriesException)
+def restore_occurrence(sender, instance, **kwargs):
+    """Ocorrência restaurada: a série volta aos feeds incrementais como alterada"""
+    EventSeries.objects.filter(pk=instance.series_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_related_caches(sender, **kwargs):
+    """Invalida os dados em cache quando cadastros exibidos junto aos eventos mudam"""
+    bump_data_version()
+    bump_related_version()
+    mark_all_feeds_dirty()
+
+
+@receiver(post_save, sender=User)
+def invalidate_event_caches_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """Nomes de responsáveis aparecem nos dados em cache; ignora apenas o registro de login"""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_data_version()
+    bump_related_version()
+    mark_all_feeds_dirty()
+
+
+@receiver(post_save, sender=UserProfile)
+def mark_profile_feeds_dirty(sender, instance, **kwargs):
+    """Tipo de usuário e departamento definem os eventos do feed pessoal"""
+    mark_user_feeds_dirty([instance.user_id])
+
+
+@receiver(post_save, sender=Event)
+def rebuild_event_calendar_fragments(sender, instance, **kwargs):
+    """Reconstrói os fragmentos do calendário do evento salvo"""
+    build_calendar_fragments([instance])
+
+
+@receiver(post_save, sender=EventType)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Department)
+def rebuild_related_calendar_fragments(sender, instance, created, **kwargs):
+    """Tipo, local e departamento aparecem nos fragmentos dos eventos que os referenciam"""
+    if created:
+        return
+    field_name = {
+        EventType: 'event_type',
+        Location: 'location',
+        Department: 'department',
+    }[sender]
+    if sync_display_columns(field_name, instance):
+        rebuild_calendar_fragments(Event.objects.filter(**{field_name: instance}))
+
+
+@receiver(post_save, sender=User)
+def rebuild_responsible_calendar_fragments(sender, instance, created, update_fields=None, **kwargs):
+    """O nome do responsável aparece nos fragmentos dos seus eventos"""
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    if sync_display_columns('responsible_person', instance):
+        rebuild_calendar_fragments(Event.objects.filter(responsible_person=instance))
+
+
+def sync_display_columns(field_name, instance):
+    """Atualiza as colunas de exibição desnormalizadas dos eventos que referenciam instance
+
+    Apenas as linhas com valores desatualizados são alteradas (inclusive
+    eventos excluídos e arquivados). Retorna True se algum evento mudou.
+    """
+    values = Event.display_values(field_name, instance)
+    ArchivedEvent.objects.filter(**{field_name: instance}).exclude(**values).update(**values)
+    changed = Event.all_objects.filter(**{field_name: instance}).exclude(**values).update(**values)
+    return changed > 0
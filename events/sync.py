@@ -0,0 +1,145 @@
+"""
+Sync tokens and tombstones for incremental calendar feeds
+
+A feed response carries a sync token: the signed moment its data was read.
+A request with that token receives only the events changed since then
+(``updated_at``), the occurrences of series changed since then, and the
+tombstones recorded since then: events and occurrences that were deleted
+or left the feed (turned private, moved to another department...), sent as
+cancelled VEVENTs. Tokens older than the tombstone retention are rejected.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from .models import EventSeries, EventTombstone
+from .recurrence import Occurrence
+
+SYNC_TOKEN_SALT = 'events.feed_sync'
+
+# Janela dos feeds (eventos que começam nos próximos N dias)
+FEED_WINDOW = timedelta(days=180)
+
+# Recuo do token: alterações gravadas durante a leitura do feed são reenviadas
+SYNC_TOKEN_OVERLAP = timedelta(seconds=60)
+
+# Campos cuja mudança pode tirar o evento do feed de parte dos assinantes
+SCOPE_FIELDS = ('is_public', 'department_id', 'responsible_person_id', 'created_by_id')
+
+
+class InvalidSyncToken(Exception):
+    """Token adulterado ou mais antigo que a retenção dos registros de remoção"""
+
+
+def get_tombstone_retention():
+    """Tempo de retenção dos registros de remoção (validade dos tokens)"""
+    return timedelta(days=getattr(settings, 'EVENT_FEED_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def make_sync_token(moment=None):
+    """Token das alterações a partir de moment (padrão: agora, menos SYNC_TOKEN_OVERLAP)"""
+    moment = moment or timezone.now() - SYNC_TOKEN_OVERLAP
+    return signing.dumps(int(moment.timestamp() * 10 ** 6), salt=SYNC_TOKEN_SALT, compress=True)
+
+
+def parse_sync_token(token):
+    """Momento representado pelo token; InvalidSyncToken se inválido ou expirado"""
+    try:
+        micros = signing.loads(token, salt=SYNC_TOKEN_SALT, max_age=get_tombstone_retention())
+    except signing.BadSignature:
+        raise InvalidSyncToken(token)
+    return datetime.fromtimestamp(micros / 10 ** 6, tz=dt_timezone.utc)
+
+
+def _window_occurrences(event, now, series=None):
+    """Ocorrências virtuais de um evento-modelo na janela dos feeds, conforme os valores de event"""
+    if series is None:
+        try:
+            series = event.series
+        except EventSeries.DoesNotExist:
+            return []
+    # Ocorrências calculadas a partir desta instância (valores anteriores à mudança)
+    series.event = event
+    return [Occurrence(event, start, end) for start, end in series.occurrences(now, now + FEED_WINDOW)]
+
+
+def _tombstone(item, reason, now):
+    return EventTombstone(
+        event_key=str(getattr(item, 'occurrence_key', item.pk)),
+        start_datetime=item.start_datetime,
+        end_datetime=item.end_datetime,
+        department_id=item.department_id,
+        is_public=item.is_public,
+        responsible_person_id=item.responsible_person_id,
+        created_by_id=item.created_by_id,
+        reason=reason,
+        removed_at=now,
+    )
+
+
+def record_tombstones(events, reason, include_event=True):
+    """Registra a saída dos eventos (e das ocorrências de suas séries na janela) dos feeds
+
+    Args:
+        events: eventos com os valores anteriores à remoção
+        reason: 'deleted' ou 'hidden'
+        include_event: False registra apenas as ocorrências (série reprogramada)
+    """
+    now = timezone.now()
+    tombstones = []
+    for event in events:
+        if include_event:
+            tombstones.append(_tombstone(event, reason, now))
+        tombstones.extend(_tombstone(occurrence, reason, now) for occurrence in _window_occurrences(event, now))
+    EventTombstone.objects.bulk_create(tombstones, batch_size=500)
+    return len(tombstones)
+
+
+def record_event_changes(changes):
+    """Registra o que as alterações tiraram dos feeds
+
+    Mudanças de visibilidade, departamento ou responsável tiram o evento dos
+    feeds que o exibiam; mudanças de horário de um evento-modelo trocam as
+    chaves das ocorrências da série.
+
+    Args:
+        changes: pares (evento antes, evento depois)
+    """
+    hidden, rescheduled = [], []
+    for old, new in changes:
+        if any(getattr(old, field) != getattr(new, field) for field in SCOPE_FIELDS):
+            hidden.append(old)
+        elif (old.start_datetime, old.end_datetime) != (new.start_datetime, new.end_datetime):
+            rescheduled.append(old)
+    return record_tombstones(hidden, 'hidden') + record_tombstones(rescheduled, 'hidden', include_event=False)
+
+
+def record_series_change(old_series):
+    """Registra as ocorrências de uma série cuja regra mudou ou foi removida"""
+    now = timezone.now()
+    EventTombstone.objects.bulk_create([
+        _tombstone(occurrence, 'hidden', now)
+        for occurrence in _window_occurrences(old_series.event, now, old_series)
+    ], batch_size=500)
+
+
+def record_cancelled_occurrence(exception):
+    """Registra a ocorrência cancelada (ou substituída por um evento próprio) de uma série"""
+    series = exception.series
+    occurrence = Occurrence(series.event, exception.original_start, exception.original_start + series.duration)
+    EventTombstone.objects.bulk_create([_tombstone(occurrence, 'deleted', timezone.now())])
+
+
+def tombstones_since(since, access_filter=None):
+    """Registros de remoção posteriores a since, restritos ao filtro de acesso do feed"""
+    tombstones = EventTombstone.objects.filter(removed_at__gt=since)
+    if access_filter is not None:
+        tombstones = tombstones.filter(access_filter)
+    return tombstones.order_by('removed_at')
+
+
+def purge_tombstones(older_than=None):
+    """Remove registros mais antigos que a retenção (tokens anteriores já são recusados)"""
+    older_than = get_tombstone_retention() if older_than is None else older_than
+    deleted, _ = EventTombstone.objects.filter(removed_at__lt=timezone.now() - older_than).delete()
+    return deleted
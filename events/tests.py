@@ -0,0 +1,1326 @@
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+import json
+from events.models import Department, EventType, Location, Event, EventSeries
+
+
+class EventTestMixin:
+    """Dados básicos compartilhados pelos testes de eventos"""
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(
+            username='admin_test',
+            email='admin@example.com',
+            password='testpass123',
+            first_name='Ana',
+            last_name='Souza'
+        )
+        self.user.profile.user_type = 'administrador'
+        self.user.profile.save()
+
+        self.department = Department.objects.create(name='Comunicação')
+        self.event_type = EventType.objects.create(name='reuniao', color='#3B82F6')
+        self.location = Location.objects.create(name='auditorio')
+
+        self.client = Client()
+        self.client.login(username='admin_test', password='testpass123')
+
+    def create_event(self, name='Reunião de Teste', start=None, hours=2, **kwargs):
+        start = start or timezone.now().replace(microsecond=0) + timedelta(days=1)
+        data = {
+            'name': name,
+            'event_type': self.event_type,
+            'start_datetime': start,
+            'end_datetime': start + timedelta(hours=hours),
+            'location_mode': 'presencial',
+            'location': self.location,
+            'target_audience': 'publico_interno',
+            'responsible_person': self.user,
+            'department': self.department,
+            'status': 'planejado',
+            'created_by': self.user,
+        }
+        data.update(kwargs)
+        return Event.objects.create(**data)
+
+
+class CalendarDataViewTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.create_event()
+        self.url = reverse('events:calendar_data')
+        today = timezone.localdate()
+        self.params = {
+            'start': today.isoformat(),
+            'end': (today + timedelta(days=30)).isoformat(),
+        }
+
+    def get_events(self, response):
+        content = response.getvalue() if response.streaming else response.content
+        return json.loads(content)
+
+    def test_returns_etag_and_events(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertEqual(self.get_events(response)[0]['id'], str(self.event.id))
+
+    def test_matching_etag_returns_304_without_event_queries(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('events_event' in q['sql'] for q in queries.captured_queries))
+
+    def test_event_change_invalidates_etag(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        self.event.name = 'Reunião Alterada'
+        self.event.save()
+
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get_events(response)[0]['title'], 'Reunião Alterada')
+
+    def test_includes_events_straddling_range_boundary(self):
+        range_start = timezone.make_aware(
+            timezone.datetime.combine(timezone.localdate(), timezone.datetime.min.time())
+        )
+        straddling = self.create_event('Evento Noturno', start=range_start - timedelta(hours=2), hours=4)
+
+        ids = [item['id'] for item in self.get_events(self.client.get(self.url, self.params))]
+        self.assertIn(str(straddling.id), ids)
+
+    def test_range_is_required_and_limited(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+        today = timezone.localdate()
+        response = self.client.get(self.url, {
+            'start': today.isoformat(),
+            'end': (today + timedelta(days=365)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class CalendarFragmentTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.create_event()
+
+    def test_fragment_built_on_save(self):
+        from events.fragments import calendar_fragment_key
+
+        key = calendar_fragment_key(self.event.pk, self.event.updated_at, 'private')
+        self.assertEqual(json.loads(cache.get(key))['title'], self.event.name)
+
+    def test_related_change_rebuilds_fragment(self):
+        from events.fragments import calendar_fragment_key
+
+        self.department.name = 'Cerimonial'
+        self.department.save()
+
+        key = calendar_fragment_key(self.event.pk, self.event.updated_at, 'private')
+        self.assertEqual(json.loads(cache.get(key))['extendedProps']['department'], 'Cerimonial')
+
+
+class EventsApiTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.create_event(description='Pauta da reunião')
+        self.url = reverse('events:events_api')
+
+    def test_json_mode_returns_compact_rows(self):
+        response = self.client.get(self.url, {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertNotIn('events_html', data)
+        self.assertEqual(data['total_count'], 1)
+        self.assertIsNone(data['next_cursor'])
+        row = data['events'][0]
+        self.assertEqual(row['id'], str(self.event.id))
+        self.assertEqual(row['type'], 'Reunião')
+        self.assertEqual(row['location'], 'Auditório')
+        self.assertEqual(row['responsible'], 'Ana Souza')
+        self.assertEqual(row['url'], reverse('events:event_detail', kwargs={'pk': self.event.pk}))
+
+    def test_html_mode_refreshes_card_after_update(self):
+        self.assertIn('Reunião de Teste', self.client.get(self.url).json()['events_html'])
+
+        self.event.name = 'Sessão Extraordinária'
+        self.event.save()
+        html = self.client.get(self.url).json()['events_html']
+        self.assertIn('Sessão Extraordinária', html)
+        self.assertNotIn('Reunião de Teste', html)
+
+    def test_event_list_page_renders_cards(self):
+        response = self.client.get(reverse('events:event_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Reunião de Teste')
+
+    def test_cursor_pagination_walks_all_events(self):
+        base = timezone.now().replace(microsecond=0)
+        for index in range(44):
+            self.create_event(f'Evento {index}', start=base + timedelta(days=index + 2))
+
+        seen = []
+        cursor = None
+        while True:
+            params = {'format': 'json'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(self.url, params).json()
+            self.assertEqual(data['total_count'], 45)
+            seen.extend(row['id'] for row in data['events'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(len(set(seen)), 45)
+
+        previous = self.client.get(self.url, {'format': 'json', 'cursor': data['previous_cursor']}).json()
+        self.assertEqual(len(previous['events']), 20)
+        self.assertEqual(previous['events'][-1]['id'], seen[39])
+
+    def test_tampered_cursor_restarts_from_first_page(self):
+        import base64
+
+        payload = json.dumps({'d': 'next', 's': timezone.now().isoformat(), 'id': 'nao-e-uuid'})
+        cursor = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        response = self.client.get(self.url, {'format': 'json', 'cursor': cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['events'][0]['id'], str(self.event.id))
+
+
+class EventSearchTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.budget = self.create_event('Audiência sobre Orçamento', description='Debate da <lei> orçamentária anual')
+        self.other = self.create_event('Sessão Solene', observations='Homenagem aos servidores')
+
+    def test_search_is_prefix_and_accent_insensitive(self):
+        from events.search import search_events
+
+        results = search_events(Event.objects.all(), 'orcament')
+        self.assertEqual(list(results), [self.budget])
+
+        results = search_events(Event.objects.all(), 'servidores')
+        self.assertEqual(list(results), [self.other])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        from events.search import search_events
+
+        self.other.name = 'Sessão de Posse'
+        self.other.save()
+        self.assertEqual(list(search_events(Event.objects.all(), 'posse')), [self.other])
+
+        self.other.delete()
+        self.assertFalse(search_events(Event.objects.all(), 'posse').exists())
+
+    def test_events_api_returns_escaped_snippet(self):
+        data = self.client.get(reverse('events:events_api'), {'format': 'json', 'search': 'lei'}).json()
+        self.assertEqual(data['total_count'], 1)
+        snippet = data['events'][0]['snippet']
+        self.assertIn('&lt;<mark>lei</mark>&gt;', snippet)
+
+
+class ResponsibleLookupTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.joao = User.objects.create_user(username='joao.s', first_name='João', last_name='Silva')
+
+    def test_autocomplete_is_accent_insensitive(self):
+        response = self.client.get(reverse('accounts:user_autocomplete'), {'q': 'joao'})
+        self.assertEqual(response.json()['results'], [{'id': self.joao.pk, 'name': 'João Silva'}])
+
+    def test_candidates_follow_name_changes(self):
+        from accounts.name_index import search_user_ids
+
+        self.assertEqual(search_user_ids('silva'), [self.joao.pk])
+        self.joao.last_name = 'Pereira'
+        self.joao.save()
+        self.assertEqual(search_user_ids('silva'), [])
+        self.assertEqual(search_user_ids('pere'), [self.joao.pk])
+
+    def test_event_form_resolves_responsible_text(self):
+        from events.forms import EventForm
+
+        start = timezone.localtime() + timedelta(days=3)
+        data = {
+            'name': 'Reunião de Planejamento',
+            'event_type': self.event_type.pk,
+            'start_datetime': start.strftime('%Y-%m-%dT%H:%M'),
+            'end_datetime': (start + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M'),
+            'location_mode': 'presencial',
+            'location': self.location.pk,
+            'target_audience': 'publico_interno',
+            'responsible_person': '',
+            'responsible_person_text': 'Joao Silva',
+            'department': self.department.pk,
+            'status': 'planejado',
+        }
+        form = EventForm(data=data, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['responsible_person'], self.joao)
+
+        # Usuário selecionado prevalece; nome de outro usuário é recusado
+        form = EventForm(data=dict(data, responsible_person=self.joao.pk), user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        form = EventForm(data=dict(data, responsible_person=self.user.pk), user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('responsible_person_text', form.errors)
+
+
+class LocationConflictTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = timezone.now().replace(second=0, microsecond=0) + timedelta(days=5)
+        self.booked = self.create_event('Sessão Ordinária', start=self.start, hours=3)
+
+    def form_data(self, start, hours=1, **kwargs):
+        data = {
+            'name': 'Reunião de Comissão',
+            'event_type': self.event_type.pk,
+            'start_datetime': timezone.localtime(start).strftime('%Y-%m-%dT%H:%M'),
+            'end_datetime': timezone.localtime(start + timedelta(hours=hours)).strftime('%Y-%m-%dT%H:%M'),
+            'location_mode': 'presencial',
+            'location': self.location.pk,
+            'target_audience': 'publico_interno',
+            'responsible_person': self.user.pk,
+            'responsible_person_text': 'Ana Souza',
+            'department': self.department.pk,
+            'status': 'planejado',
+        }
+        data.update(kwargs)
+        return data
+
+    def test_event_form_rejects_overlapping_booking(self):
+        from events.forms import EventForm
+
+        form = EventForm(data=self.form_data(self.start + timedelta(hours=1)), user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Sessão Ordinária', str(form.non_field_errors()))
+
+        form = EventForm(data=self.form_data(self.start + timedelta(hours=3)), user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_editing_event_does_not_conflict_with_itself(self):
+        from events.forms import EventForm
+
+        form = EventForm(data=self.form_data(self.start, hours=4), instance=self.booked, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_series_occurrences_block_the_location(self):
+        from events.forms import EventForm
+
+        weekly = self.create_event('Reunião Semanal', start=self.start + timedelta(days=1), hours=2)
+        EventSeries.objects.create(event=weekly, rrule='FREQ=WEEKLY;COUNT=4')
+
+        form = EventForm(data=self.form_data(self.start + timedelta(days=15, hours=1)), user=self.user)
+        self.assertFalse(form.is_valid())
+        self.assertIn('Reunião Semanal', str(form.non_field_errors()))
+
+        form = EventForm(data=self.form_data(self.start + timedelta(days=15, hours=2)), user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_cancelled_bookings_do_not_block(self):
+        from events.conflicts import find_conflicts
+
+        self.booked.status = 'cancelado'
+        self.booked.save()
+        self.assertFalse(find_conflicts(self.location, self.start, self.start + timedelta(hours=1)))
+
+    def test_bulk_slot_check(self):
+        other_room = Location.objects.create(name='plenarinho')
+        slots = [
+            {'location': self.location.pk, 'start': (self.start + timedelta(hours=2)).isoformat(),
+             'end': (self.start + timedelta(hours=4)).isoformat()},
+            {'location': self.location.pk, 'start': (self.start + timedelta(hours=3)).isoformat(),
+             'end': (self.start + timedelta(hours=5)).isoformat()},
+            {'location': other_room.pk, 'start': self.start.isoformat(),
+             'end': (self.start + timedelta(hours=1)).isoformat()},
+        ]
+        response = self.client.post(reverse('events:check_location_slots'), json.dumps({'slots': slots}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+
+        self.assertFalse(results[0]['available'])
+        self.assertEqual(results[0]['conflicts'][0]['id'], str(self.booked.id))
+        self.assertEqual(results[0]['clashes'], [1])
+        self.assertEqual(results[1]['conflicts'], [])
+        self.assertEqual(results[1]['clashes'], [0])
+        self.assertTrue(results[2]['available'])
+
+    def test_bulk_slot_check_rejects_non_string_bounds(self):
+        slots = [{'location': self.location.pk, 'start': 20250101, 'end': ['2025-01-02']}]
+        response = self.client.post(reverse('events:check_location_slots'), json.dumps({'slots': slots}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class LocationAvailabilityTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.day = timezone.localdate() + timedelta(days=7)
+        while self.day.weekday() >= 5:
+            self.day += timedelta(days=1)
+        self.plenarinho = Location.objects.create(name='plenarinho')
+        self.url = reverse('events:location_availability')
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(timezone.datetime.combine(self.day, timezone.datetime.min.time())) + \
+            timedelta(hours=hour, minutes=minute)
+
+    def get_free(self, **params):
+        data = {
+            'locations': f'{self.location.pk},{self.plenarinho.pk}',
+            'start': self.day.isoformat(),
+            'end': (self.day + timedelta(days=1)).isoformat(),
+        }
+        data.update(params)
+        response = self.client.get(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        return {item['id']: item['free'] for item in response.json()['locations']}
+
+    def test_free_intervals_skip_bookings_and_short_gaps(self):
+        self.create_event('Manhã', start=self.at(9), hours=2)
+        self.create_event('Sobreposto', start=self.at(10), hours=2)
+        self.create_event('Tarde', start=self.at(12, 30), hours=1)
+        self.create_event('Cancelado', start=self.at(15), hours=2, status='cancelado')
+
+        free = self.get_free()
+        spans = [(slot['start'], slot['end']) for slot in free[self.location.pk]]
+        self.assertEqual(spans, [
+            (self.at(8).isoformat(), self.at(9).isoformat()),
+            (self.at(13, 30).isoformat(), self.at(18).isoformat()),
+        ])
+        self.assertEqual(free[self.plenarinho.pk][0]['minutes'], 600)
+
+    def test_series_occurrences_are_busy(self):
+        weekly = self.create_event('Reunião Semanal', start=self.at(14) - timedelta(weeks=1), hours=2)
+        EventSeries.objects.create(event=weekly, rrule='FREQ=WEEKLY;COUNT=4')
+
+        free = self.get_free()
+        spans = [(slot['start'], slot['end']) for slot in free[self.location.pk]]
+        self.assertEqual(spans, [
+            (self.at(8).isoformat(), self.at(14).isoformat()),
+            (self.at(16).isoformat(), self.at(18).isoformat()),
+        ])
+
+    def test_invalid_parameters_return_400(self):
+        self.assertEqual(self.client.get(self.url, {'locations': 'x'}).status_code, 400)
+        response = self.client.get(self.url, {
+            'locations': self.location.pk, 'start': self.day.isoformat(),
+            'end': (self.day + timedelta(days=400)).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+        for min_duration in ('9' * 20, str(60 * 24 * 200)):
+            response = self.client.get(self.url, {
+                'locations': self.location.pk, 'start': self.day.isoformat(),
+                'end': (self.day + timedelta(days=1)).isoformat(), 'min_duration': min_duration,
+            })
+            self.assertEqual(response.status_code, 400)
+
+
+class EventSeriesTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.localdate()
+        self.first_start = timezone.make_aware(
+            timezone.datetime.combine(today + timedelta(days=1), timezone.datetime.min.time())
+        ) + timedelta(hours=10)
+        self.event = self.create_event('Reunião Semanal', start=self.first_start, hours=1)
+        self.series = EventSeries.objects.create(event=self.event, rrule='FREQ=WEEKLY;COUNT=4')
+        self.range_start = self.first_start - timedelta(days=1)
+        self.range_end = self.first_start + timedelta(days=60)
+
+    def test_only_the_template_is_stored(self):
+        from events.recurrence import expand_occurrences
+
+        self.assertEqual(Event.objects.count(), 1)
+        occurrences = expand_occurrences(Event.objects.all(), self.range_start, self.range_end)
+        self.assertEqual([o.start_datetime for o in occurrences],
+                         [self.first_start + timedelta(weeks=week) for week in (1, 2, 3)])
+        self.assertEqual(occurrences[0].name, 'Reunião Semanal')
+        self.assertEqual(self.series.ends_at, self.first_start + timedelta(weeks=3, hours=1))
+
+    def test_expansion_is_limited_to_window(self):
+        from events.recurrence import expand_occurrences
+
+        window_start = self.first_start + timedelta(weeks=2)
+        occurrences = expand_occurrences(Event.objects.all(), window_start, window_start + timedelta(hours=2))
+        self.assertEqual([o.start_datetime for o in occurrences], [window_start])
+
+        after_end = self.first_start + timedelta(weeks=5)
+        self.assertEqual(expand_occurrences(Event.objects.all(), after_end, after_end + timedelta(days=7)), [])
+
+    def test_exceptions_skip_or_replace_occurrences(self):
+        from events.recurrence import expand_occurrences
+
+        self.series.cancel_occurrence(self.first_start + timedelta(weeks=1))
+        replacement = self.series.detach_occurrence(self.first_start + timedelta(weeks=2), name='Reunião Remarcada',
+                                                    start_datetime=self.first_start + timedelta(weeks=2, hours=3),
+                                                    end_datetime=self.first_start + timedelta(weeks=2, hours=4))
+
+        occurrences = expand_occurrences(Event.objects.all(), self.range_start, self.range_end)
+        self.assertEqual([o.start_datetime for o in occurrences], [self.first_start + timedelta(weeks=3)])
+        self.assertEqual(replacement.replaced_occurrence.series, self.series)
+
+    def test_calendar_includes_occurrences(self):
+        response = self.client.get(reverse('events:calendar_data'), {
+            'start': timezone.localdate().isoformat(),
+            'end': (timezone.localdate() + timedelta(days=40)).isoformat(),
+        })
+        events = json.loads(response.getvalue() if response.streaming else response.content)
+        self.assertEqual(len(events), 4)
+        self.assertEqual(len({item['id'] for item in events}), 4)
+        self.assertTrue(all(item['title'] == 'Reunião Semanal' for item in events))
+
+    def test_events_api_lists_occurrences_for_date_window(self):
+        data = self.client.get(reverse('events:events_api'), {
+            'format': 'json',
+            'start_date': timezone.localdate().isoformat(),
+            'end_date': (timezone.localdate() + timedelta(days=40)).isoformat(),
+        }).json()
+        self.assertEqual(data['total_count'], 1)
+        self.assertEqual(data['events'][0]['recurrence'], 'FREQ=WEEKLY;COUNT=4')
+        self.assertEqual(len(data['occurrences']), 3)
+
+
+class EventImportTest(EventTestMixin, TestCase):
+    HEADER = 'name;event_type;start_datetime;end_datetime;location_mode;location;target_audience;responsible_person;department\n'
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_superuser = True
+        self.user.is_staff = True
+        self.user.save()
+        self.manager = User.objects.create_user(username='gestor', first_name='Carlos', last_name='Lima')
+        self.manager.profile.user_type = 'gestor'
+        self.manager.profile.department = self.department
+        self.manager.profile.save()
+
+    def csv_lines(self, *rows):
+        return (self.HEADER + ''.join(row + '\n' for row in rows)).splitlines(keepends=True)
+
+    def test_imports_rows_with_history_and_notifications(self):
+        from events.importer import EventImporter
+        from events.models import EventHistory
+        from notifications.models import Notification
+
+        rows = [
+            f'Sessão {day};Reunião;{day:02d}/11/2030 09:00;{day:02d}/11/2030 11:00;presencial;Auditório;'
+            f'publico_interno;Carlos Lima;Comunicação'
+            for day in range(1, 21)
+        ]
+        result = EventImporter(self.user).run(self.csv_lines(*rows))
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 20)
+        self.assertEqual(Event.objects.filter(responsible_person=self.manager).count(), 20)
+        self.assertEqual(EventHistory.objects.filter(field_name='Evento Criado').count(), 20)
+        self.assertEqual(Notification.objects.filter(recipient=self.manager, notification_type='event_created').count(), 20)
+        self.assertEqual(list(Event.objects.filter(name='Sessão 7').values_list('location__name', flat=True)), ['auditorio'])
+
+    def test_invalid_rows_block_import_unless_skipped(self):
+        from events.importer import EventImporter
+
+        lines = self.csv_lines(
+            'Válido;reuniao;2030-11-03 09:00;2030-11-03 10:00;presencial;auditorio;publico_interno;;Comunicação',
+            'Tipo ruim;inexistente;2030-11-04 09:00;2030-11-04 10:00;presencial;auditorio;publico_interno;;Comunicação',
+            'Conflito;reuniao;2030-11-03 09:30;2030-11-03 10:30;presencial;auditorio;publico_interno;;Comunicação',
+        )
+        result = EventImporter(self.user).run(lines)
+        self.assertEqual(result.created, 0)
+        self.assertEqual([line for line, _ in result.errors], [3, 2, 4])
+        self.assertFalse(Event.objects.exists())
+
+        result = EventImporter(self.user, skip_invalid=True).run(lines)
+        self.assertEqual(result.created, 0)
+
+        result = EventImporter(self.user, skip_invalid=True).run(lines[:3])
+        self.assertEqual(result.created, 1)
+
+    def test_clashes_between_rows_of_different_batches(self):
+        from events.importer import EventImporter
+
+        lines = self.csv_lines(
+            'Primeira;reuniao;2030-11-03 09:00;2030-11-03 10:00;presencial;auditorio;publico_interno;;Comunicação',
+            'Outro dia;reuniao;2030-11-05 09:00;2030-11-05 10:00;presencial;auditorio;publico_interno;;Comunicação',
+            'Sobreposta;reuniao;2030-11-03 09:30;2030-11-03 10:30;presencial;auditorio;publico_interno;;Comunicação',
+        )
+        result = EventImporter(self.user, batch_size=1).run(lines)
+        self.assertEqual(result.created, 0)
+        self.assertEqual([line for line, _ in result.errors], [2, 4])
+        self.assertIn('linha 4', result.errors[0][1])
+        self.assertFalse(Event.objects.exists())
+
+    def test_admin_upload(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        EventType.objects.create(name='audiencia_publica', color='#10B981')
+
+        content = ''.join(self.csv_lines(
+            'Audiência;audiencia_publica;2030-12-01T14:00;2030-12-01T16:00;presencial;auditorio;ambos;admin_test;Comunicação'
+        )).encode('utf-8')
+        response = self.client.post(reverse('admin:events_event_import_csv'), {
+            'csv_file': SimpleUploadedFile('eventos.csv', content, content_type='text/csv'),
+        })
+        self.assertRedirects(response, reverse('admin:events_event_changelist'))
+        self.assertTrue(Event.objects.filter(name='Audiência', event_type__name='audiencia_publica').exists())
+
+
+class StatusTransitionTest(EventTestMixin, TestCase):
+    def test_transitions_use_bulk_updates_and_history(self):
+        from events.models import EventHistory
+        from events.transitions import apply_status_transitions
+        from notifications.models import Notification
+
+        now = timezone.now()
+        responsible = User.objects.create_user(username='responsavel', first_name='Rita', last_name='Alves')
+        running = self.create_event('Em curso', start=now - timedelta(minutes=30), hours=2, responsible_person=responsible)
+        finished = self.create_event('Encerrado', start=now - timedelta(hours=3), hours=2, status='em_andamento',
+                                     responsible_person=responsible)
+        old = self.create_event('Antigo', start=now - timedelta(days=30), hours=2, responsible_person=responsible)
+        future = self.create_event('Futuro', start=now + timedelta(days=1))
+        Notification.objects.all().delete()
+        EventHistory.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            changed = apply_status_transitions(now)
+        self.assertEqual(changed, {'em_andamento': 1, 'concluido': 2})
+        self.assertLess(len(queries), 20)
+
+        statuses = dict(Event.objects.values_list('name', 'status'))
+        self.assertEqual(statuses, {'Em curso': 'em_andamento', 'Encerrado': 'concluido',
+                                    'Antigo': 'concluido', 'Futuro': 'planejado'})
+        self.assertEqual(EventHistory.objects.filter(field_name='Status').count(), 3)
+
+        # Apenas transições recentes geram notificação
+        notified = set(Notification.objects.filter(recipient=responsible).values_list('event_id', flat=True))
+        self.assertEqual(notified, {running.pk, finished.pk})
+        self.assertNotIn(old.pk, notified)
+        self.assertNotIn(future.pk, notified)
+
+        self.assertEqual(apply_status_transitions(now), {'em_andamento': 0, 'concluido': 0})
+
+    def test_events_changed_concurrently_get_no_history(self):
+        from unittest import mock
+        from events.models import EventHistory
+        from events import transitions
+
+        now = timezone.now()
+        running = self.create_event('Em curso', start=now - timedelta(minutes=30), hours=2)
+        cancelled = self.create_event('Cancelado', start=now - timedelta(minutes=30), hours=2)
+        pending = transitions.pending_transitions(now)
+        # Cancelado entre a leitura das transições pendentes e o UPDATE
+        Event.objects.filter(pk=cancelled.pk).update(status='cancelado')
+        EventHistory.objects.all().delete()
+
+        with mock.patch.object(transitions, 'pending_transitions', return_value=pending):
+            changed = transitions.apply_status_transitions(now)
+        self.assertEqual(changed, {'em_andamento': 1, 'concluido': 0})
+        self.assertEqual(Event.objects.get(pk=cancelled.pk).status, 'cancelado')
+        self.assertEqual(
+            list(EventHistory.objects.filter(field_name='Status').values_list('event_id', flat=True)),
+            [running.pk]
+        )
+
+
+class EventBulkUpdateTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('events:events_bulk_update')
+        base = timezone.now() + timedelta(days=2)
+        self.events = [self.create_event(f'Evento {i}', start=base + timedelta(days=i)) for i in range(5)]
+        self.other_department = Department.objects.create(name='Cerimonial')
+
+    def post(self, ids, changes, client=None):
+        return (client or self.client).post(self.url, json.dumps({'ids': ids, 'changes': changes}),
+                                            content_type='application/json')
+
+    def test_bulk_update_applies_changes_with_history(self):
+        from events.models import EventHistory
+
+        EventHistory.objects.all().delete()
+        ids = [str(event.id) for event in self.events[:3]]
+        response = self.post(ids, {'status': 'cancelado', 'department': self.other_department.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['updated']), sorted(ids))
+
+        self.assertEqual(Event.objects.filter(status='cancelado', department=self.other_department).count(), 3)
+        self.assertEqual(Event.objects.filter(status='planejado').count(), 2)
+        history = EventHistory.objects.filter(event_id=self.events[0].id)
+        self.assertEqual(
+            set(history.values_list('field_name', 'old_value', 'new_value')),
+            {('Status', 'planejado', 'cancelado'), ('Departamento', 'Comunicação', 'Cerimonial')},
+        )
+
+    def test_events_without_permission_are_denied(self):
+        viewer = User.objects.create_user(username='leitor', password='testpass123')
+        own = self.create_event('Próprio', created_by=viewer)
+        client = Client()
+        client.login(username='leitor', password='testpass123')
+
+        data = self.post([str(own.id), str(self.events[0].id)], {'is_public': True}, client=client).json()
+        self.assertEqual(data['updated'], [str(own.id)])
+        self.assertEqual(data['denied'], [str(self.events[0].id)])
+        self.assertFalse(Event.objects.get(pk=self.events[0].pk).is_public)
+
+    def test_requires_changes(self):
+        self.assertEqual(self.post([str(self.events[0].id)], {}).status_code, 400)
+        self.assertEqual(self.post(['invalido'], {'status': 'concluido'}).status_code, 400)
+
+
+class EventArchiveTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.old = self.create_event('Seminário antigo', start=now - timedelta(days=400), status='concluido')
+        self.old_cancelled = self.create_event('Oficina cancelada', start=now - timedelta(days=500), status='cancelado')
+        self.recent = self.create_event('Reunião recente', start=now - timedelta(days=10), status='concluido')
+        self.planned = self.create_event('Evento antigo em aberto', start=now - timedelta(days=400))
+
+    def test_archive_moves_old_events_with_history(self):
+        from events.archive import archive_events
+        from events.models import ArchivedEvent, ArchivedEventHistory, EventHistory
+
+        history_count = EventHistory.objects.filter(event=self.old).count()
+        self.assertGreater(history_count, 0)
+
+        self.assertEqual(archive_events(horizon_days=365, batch_size=1), 2)
+
+        self.assertEqual(
+            set(Event.objects.values_list('name', flat=True)),
+            {'Reunião recente', 'Evento antigo em aberto'}
+        )
+        archived = ArchivedEvent.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.name, self.old.name)
+        self.assertEqual(archived.start_datetime, self.old.start_datetime)
+        self.assertEqual(archived.created_at, self.old.created_at)
+        self.assertEqual(ArchivedEventHistory.objects.filter(event=archived).count(), history_count)
+        self.assertFalse(EventHistory.objects.filter(event_id=self.old.pk).exists())
+
+        self.assertEqual(archive_events(horizon_days=365), 0)
+
+    def test_reports_union_archive_when_period_reaches_it(self):
+        from events.archive import archive_events
+
+        archive_events(horizon_days=365)
+        url = reverse('reports:api_data')
+
+        start = (timezone.now() - timedelta(days=600)).date().isoformat()
+        data = self.client.get(url, {'start_date': start, 'search': 'antigo'}).json()
+        self.assertEqual(data['total_events'], 2)
+        self.assertEqual(
+            {event['name'] for event in data['events']},
+            {'Seminário antigo', 'Evento antigo em aberto'}
+        )
+
+        data = self.client.get(url, {'start_date': start}).json()
+        self.assertEqual(data['total_events'], 4)
+        self.assertEqual(data['completed_events'], 2)
+        self.assertEqual(data['events_by_type'], [{'event_type__name': 'reuniao', 'count': 4}])
+
+        # Período recente não consulta o arquivo
+        start = (timezone.now() - timedelta(days=30)).date().isoformat()
+        data = self.client.get(url, {'start_date': start}).json()
+        self.assertEqual(data['total_events'], 1)
+
+    def test_saved_reports_and_trend_include_archive(self):
+        from events.archive import archive_events
+        from reports.models import Report
+        from reports.views import get_report_data
+
+        self.recent.start_datetime = timezone.now() - timedelta(days=300)
+        self.recent.save()
+        archive_events(horizon_days=200)
+        today = timezone.now().date()
+        report = Report.objects.create(
+            name='Período', report_type='events_by_period', start_date=today - timedelta(days=600),
+            end_date=today, created_by=self.user,
+        )
+        report.event_types.add(self.event_type)
+        self.assertEqual(
+            {row['name'] for row in get_report_data(report)},
+            {'Seminário antigo', 'Oficina cancelada', 'Reunião recente', 'Evento antigo em aberto'}
+        )
+
+        report.report_type = 'events_by_status'
+        self.assertCountEqual(
+            get_report_data(report),
+            [{'status': 'concluido', 'count': 2}, {'status': 'cancelado', 'count': 1},
+             {'status': 'planejado', 'count': 1}]
+        )
+
+        # Evento arquivado dentro dos últimos 12 meses entra na tendência
+        data = self.client.get(reverse('reports:api_trend')).json()
+        self.assertEqual(sum(data['event_counts']), 1)
+
+
+class EventSoftDeleteTest(EventTestMixin, TestCase):
+    def test_delete_view_hides_event_and_purge_removes_dependents(self):
+        from events.deletion import purge_deleted_events
+        from events.models import EventHistory
+        from notifications.models import Notification
+
+        event = self.create_event('Evento notificado')
+        kept = self.create_event('Outro evento')
+        Notification.objects.bulk_create([
+            Notification(recipient=self.user, event=event, notification_type='event_updated',
+                         title=f'Aviso {i}', message='Evento alterado')
+            for i in range(7)
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('events:event_delete', kwargs={'pk': event.pk}))
+        self.assertRedirects(response, reverse('events:event_list'), fetch_redirect_response=False)
+        self.assertFalse(any('DELETE' in query['sql'] for query in queries.captured_queries))
+
+        self.assertFalse(Event.objects.filter(pk=event.pk).exists())
+        self.assertIsNotNone(Event.all_objects.get(pk=event.pk).deleted_at)
+        self.assertEqual(self.client.get(reverse('events:event_detail', kwargs={'pk': event.pk})).status_code, 404)
+        self.assertEqual(Notification.objects.filter(event_id=event.pk).count(), 7)
+
+        # Notificações do evento excluído ficam ocultas até a remoção definitiva
+        hidden = Notification.objects.filter(event_id=event.pk).first()
+        system = Notification.objects.create(recipient=self.user, notification_type='system_alert',
+                                             title='Manutenção', message='Sistema em manutenção')
+        self.assertEqual(self.client.get(reverse('notifications:unread_count')).json()['count'], 1)
+        recent = self.client.get(reverse('notifications:recent')).json()['notifications']
+        self.assertEqual([item['id'] for item in recent], [system.pk])
+        response = self.client.get(reverse('notifications:list'))
+        self.assertEqual(list(response.context['notifications']), [system])
+        self.assertEqual(response.context['unread_count'], 1)
+        self.assertEqual(self.client.get(reverse('notifications:detail', args=[hidden.pk])).status_code, 404)
+
+        self.assertEqual(purge_deleted_events(chunk_size=3), 1)
+        self.assertFalse(Event.all_objects.filter(pk=event.pk).exists())
+        self.assertFalse(Notification.objects.filter(event_id=event.pk).exists())
+        self.assertFalse(EventHistory.objects.filter(event_id=event.pk).exists())
+        self.assertTrue(EventHistory.objects.filter(event=kept).exists())
+        self.assertEqual(purge_deleted_events(), 0)
+
+
+class EventDisplayColumnsTest(EventTestMixin, TestCase):
+    def test_columns_filled_on_save_and_synced_with_related_rows(self):
+        event = self.create_event('Reunião de planejamento')
+        self.assertEqual(event.event_type_label, 'Reunião')
+        self.assertEqual(event.event_type_color, '#3B82F6')
+        self.assertEqual(event.location_display, 'Auditório')
+        self.assertEqual(event.department_name, 'Comunicação')
+        self.assertEqual(event.responsible_name, 'Ana Souza')
+
+        self.location.custom_name = 'Sala 2'
+        self.location.save()
+        self.department.name = 'Imprensa'
+        self.department.save()
+        self.user.first_name = 'Ana Maria'
+        self.user.save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.location_display, 'Auditório - Sala 2')
+        self.assertEqual(event.department_name, 'Imprensa')
+        self.assertEqual(event.responsible_name, 'Ana Maria Souza')
+
+        # Fragmentos do calendário refletem os novos nomes
+        response = self.client.get(reverse('events:calendar_data'), {
+            'start': timezone.localdate().isoformat(),
+            'end': (timezone.localdate() + timedelta(days=7)).isoformat(),
+        })
+        props = json.loads(response.getvalue() if response.streaming else response.content)[0]['extendedProps']
+        self.assertEqual(props['department'], 'Imprensa')
+        self.assertEqual(props['location'], 'Auditório - Sala 2')
+
+    def test_projection_mode_avoids_joins(self):
+        for i in range(3):
+            self.create_event(f'Evento {i}', start=timezone.now() + timedelta(days=i + 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('events:events_api'), {'format': 'json'})
+        self.assertEqual(len(response.json()['events']), 3)
+        self.assertEqual(response.json()['events'][0]['responsible'], 'Ana Souza')
+        page_query = [query['sql'] for query in queries.captured_queries if 'event_type_label' in query['sql']]
+        self.assertTrue(page_query)
+        for sql in page_query:
+            self.assertNotIn('events_eventtype', sql)
+            self.assertNotIn('auth_user', sql)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('events:event_list'))
+        self.assertContains(response, 'Ana Souza')
+        self.assertFalse(any(
+            'events_event' in query['sql'] and 'JOIN "events_department"' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+
+class ConditionalGetTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_department = Department.objects.create(name='Jurídico')
+        self.event = self.create_event('Reunião de pauta')
+
+    def test_events_api_answers_304_before_querying_events(self):
+        url = reverse('events:events_api')
+        response = self.client.get(url, {'format': 'json'})
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'format': 'json'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('events_event' in query['sql'] for query in queries.captured_queries))
+
+        # Mudanças passam a valer também para If-Modified-Since
+        self.create_event('Nova reunião')
+        response = self.client.get(url, {'format': 'json'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_department_filter_uses_department_stamp(self):
+        url = reverse('events:events_api')
+        params = {'format': 'json', 'department': self.department.pk}
+        etag = self.client.get(url, params)['ETag']
+
+        # Evento de outro departamento não invalida a resposta filtrada
+        self.create_event('Parecer', department=self.other_department)
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Evento que sai do departamento filtrado invalida
+        self.event.department = self.other_department
+        self.event.save()
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_event_list_and_reports_support_conditional_requests(self):
+        response = self.client.get(reverse('events:event_list'))
+        self.assertEqual(
+            self.client.get(reverse('events:event_list'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+
+        url = reverse('reports:api_data')
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+
+class EventDetailCacheTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.create_event('Reunião de pauta', is_public=True)
+        self.url = reverse('events:event_detail', kwargs={'pk': self.event.pk})
+
+    def test_repeat_view_uses_cached_fragments(self):
+        first = self.client.get(self.url)
+        self.assertContains(first, 'Reunião de pauta')
+        self.assertContains(first, 'Comunicação')
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse(any('events_eventhistory' in query for query in sql))
+        self.assertEqual(sum('FROM "events_event"' in query for query in sql), 1)
+
+        # Alterar o evento renova os fragmentos
+        self.event.name = 'Reunião de pauta (adiada)'
+        self.event.save()
+        self.assertContains(self.client.get(self.url), 'Reunião de pauta (adiada)')
+
+    def test_fragments_vary_by_role(self):
+        edit_url = reverse('events:event_edit', kwargs={'pk': self.event.pk})
+        self.assertContains(self.client.get(self.url), edit_url)
+
+        viewer = User.objects.create_user(username='leitor', password='testpass123')
+        viewer.profile.user_type = 'visualizador'
+        viewer.profile.save()
+        client = Client()
+        client.login(username='leitor', password='testpass123')
+        self.assertNotContains(client.get(self.url), edit_url)
+
+
+class EventRestApiTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_department = Department.objects.create(name='Jurídico')
+        self.events = [self.create_event(f'Reunião {day}', start=timezone.now() + timedelta(days=day)) for day in range(1, 4)]
+        self.create_event('Parecer', department=self.other_department)
+        self.url = reverse('events:api_events')
+
+    def test_returns_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'name,department_name', 'department': self.department.pk})
+        data = response.json()
+        self.assertEqual([event['name'] for event in data['events']], ['Reunião 3', 'Reunião 2', 'Reunião 1'])
+        self.assertEqual(set(data['events'][0]), {'name', 'department_name'})
+
+        sql = next(query['sql'] for query in queries.captured_queries if 'FROM "events_event"' in query['sql'])
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_cursor_pagination_and_validation(self):
+        data = self.client.get(self.url, {'per_page': 2, 'count': '1'}).json()
+        self.assertEqual((data['count'], data['total_count']), (2, 4))
+        data = self.client.get(self.url, {'per_page': 2, 'cursor': data['next_cursor']}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertIsNone(data['next_cursor'])
+
+        self.assertEqual(self.client.get(self.url, {'fields': 'name,secret'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'per_page': 500}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start_date': 'ontem'}).status_code, 400)
+
+
+class EventBatchApiTest(EventTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.event = self.create_event('Reunião de pauta')
+        self.url = reverse('events:events_batch')
+
+    def post(self, items, **params):
+        url = self.url + ('?skip_invalid=1' if params.get('skip_invalid') else '')
+        return self.client.post(url, json.dumps(items), content_type='application/json')
+
+    def new_item(self, name, day, **kwargs):
+        start = timezone.localtime() + timedelta(days=day)
+        item = {
+            'name': name,
+            'event_type': self.event_type.pk,
+            'start_datetime': start.strftime('%Y-%m-%d %H:%M'),
+            'end_datetime': (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M'),
+            'location_mode': 'virtual',
+            'virtual_link': 'https://exemplo.com/sala',
+            'target_audience': 'publico_interno',
+            'department': self.department.pk,
+        }
+        item.update(kwargs)
+        return item
+
+    def test_creates_and_updates_in_bulk(self):
+        from events.models import EventHistory
+        from notifications.models import Notification
+
+        manager = User.objects.create_user(username='gestor_batch', password='testpass123')
+        manager.profile.user_type = 'gestor'
+        manager.profile.department = self.department
+        manager.profile.save()
+
+        items = [self.new_item(f'Oficina {day}', day + 2) for day in range(3)]
+        items.append({'id': str(self.event.pk), 'status': 'cancelado'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(items)
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['created'], data['updated']), (3, 1))
+        self.assertEqual([result['status'] for result in data['results']], ['created'] * 3 + ['updated'])
+        inserts = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "events_event"')]
+        self.assertEqual(len(inserts), 1)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, 'cancelado')
+        self.assertEqual(self.event.name, 'Reunião de pauta')
+        created = Event.objects.get(pk=data['results'][0]['id'])
+        self.assertEqual((created.created_by, created.department_name), (self.user, 'Comunicação'))
+        self.assertTrue(EventHistory.objects.filter(event=created, field_name='Evento Criado').exists())
+        self.assertTrue(EventHistory.objects.filter(event=self.event, field_name='Status').exists())
+        self.assertEqual(Notification.objects.filter(recipient=manager, notification_type='event_created').count(), 3)
+        self.assertTrue(Notification.objects.filter(recipient=manager, notification_type='event_cancelled').exists())
+
+    def test_invalid_items_block_batch_unless_skipped(self):
+        items = [
+            self.new_item('Oficina', 2),
+            self.new_item('Sem link', 3, virtual_link=''),
+            self.new_item('Auditório A', 4, location_mode='presencial', location=self.location.pk),
+            self.new_item('Auditório B', 4, location_mode='presencial', location=self.location.pk),
+        ]
+        response = self.post(items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result['status'] for result in response.json()['results']], ['valid', 'invalid', 'invalid', 'invalid']
+        )
+        self.assertEqual(Event.objects.count(), 1)
+
+        data = self.post(items, skip_invalid=True).json()
+        self.assertTrue(data['applied'])
+        self.assertEqual(data['created'], 1)
+        self.assertEqual(self.post({'name': 'x'}).status_code, 400)
+
+    def test_duplicate_ids_are_rejected(self):
+        items = [{'id': str(self.event.pk), 'name': 'A'}, {'id': str(self.event.pk), 'description': 'desc B'}]
+        response = self.post(items)
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['valid', 'invalid'])
+        self.assertIn('id', results[1]['errors'])
+
+        data = self.post(items, skip_invalid=True).json()
+        self.assertEqual(data['updated'], 1)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.name, self.event.description), ('A', ''))
+
+    def test_untracked_field_updates_are_saved(self):
+        from events.models import EventHistory
+
+        history_count = EventHistory.objects.filter(event=self.event).count()
+        data = self.post([{'id': str(self.event.pk), 'observations': 'Levar projetor'}]).json()
+        self.assertTrue(data['applied'])
+        self.assertEqual(data['updated'], 1)
+        self.assertEqual(data['results'][0]['status'], 'updated')
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.observations, 'Levar projetor')
+        # Observações não entram no histórico
+        self.assertEqual(EventHistory.objects.filter(event=self.event).count(), history_count)
+
+        data = self.post([{'id': str(self.event.pk), 'observations': 'Levar projetor'}]).json()
+        self.assertEqual(data['results'][0]['status'], 'unchanged')
+
+
+class IcsWriterTest(EventTestMixin, TestCase):
+    def test_output_matches_icalendar(self):
+        from icalendar import Calendar, Event as ICalEvent, Alarm
+        from events import ics
+
+        start = timezone.now().replace(microsecond=0)
+        name = 'Audiência; orçamento, "LDO" \\ ' + 'ação ' * 20
+        reference = Calendar()
+        reference.add('prodid', '-//EventoSys//Teste//PT')
+        reference.add('version', '2.0')
+        reference.add('x-wr-calname', name)
+        ical_event = ICalEvent()
+        ical_event.add('uid', 'event-1@eventosys.local')
+        ical_event.add('dtstart', start)
+        ical_event.add('dtend', start + timedelta(hours=2))
+        ical_event.add('summary', name)
+        ical_event.add('description', 'Linha 1\nLinha 2\\nTexto ' + 'x' * 120)
+        ical_event.add('url', 'https://exemplo.com/a?b=c,d')
+        ical_event.add('priority', 9)
+        alarm = Alarm()
+        alarm.add('action', 'DISPLAY')
+        alarm.add('trigger', timedelta(hours=-24))
+        ical_event.add_component(alarm)
+        reference.add_component(ical_event)
+
+        vevent = ics.render_component('VEVENT', {
+            'UID': ics.text('event-1@eventosys.local'),
+            'DTSTART': ics.date_time(start),
+            'DTEND': ics.date_time(start + timedelta(hours=2)),
+            'SUMMARY': ics.text(name),
+            'DESCRIPTION': ics.text('Linha 1\nLinha 2\\nTexto ' + 'x' * 120),
+            'URL': ics.uri('https://exemplo.com/a?b=c,d'),
+            'PRIORITY': ics.integer(9),
+            'LOCATION': None,
+        }, ics.EVENT_ORDER, [ics.render_component('VALARM', {
+            'ACTION': ics.text('DISPLAY'),
+            'TRIGGER': ics.duration(timedelta(hours=-24)),
+        })])
+        properties = {
+            'PRODID': ics.text('-//EventoSys//Teste//PT'),
+            'VERSION': ics.text('2.0'),
+            'X-WR-CALNAME': ics.text(name),
+        }
+        self.assertEqual(b''.join(ics.stream_calendar(properties, [vevent])), reference.to_ical())
+
+    def test_exports_and_feeds_stream_events(self):
+        from events.feed_views import generate_user_token
+
+        self.create_event('Sessão pública', is_public=True)
+        self.create_event('Reunião interna')
+        urls = [
+            reverse('events:export_calendar_ics'),
+            reverse('events:public_calendar_feed'),
+            reverse('events:user_calendar_feed', args=[self.user.pk, generate_user_token(self.user)]),
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            # Exportações são transmitidas; feeds completos são servidos já gerados
+            body = (b''.join(response.streaming_content) if response.streaming else response.content).decode()
+            self.assertIn('Sessão pública', body)
+            self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n'))
+        self.assertIn('[PRIVADO] Reunião interna', body)
+
+    def test_vevent_blocks_are_shared_between_feeds(self):
+        from unittest import mock
+        from events.feed_views import generate_user_token
+        from events.feed_store import refresh_calendar_feeds
+        from events.integrations import CalendarFeedIntegration
+
+        event = self.create_event('Reunião interna')
+        other = User.objects.create_user(username='outro_admin', password='testpass123')
+        other.profile.user_type = 'administrador'
+        other.profile.save()
+
+        def feed(user):
+            url = reverse('events:user_calendar_feed', args=[user.pk, generate_user_token(user)])
+            return self.client.get(url).content.decode()
+
+        render = CalendarFeedIntegration.render_feed_parts
+        with mock.patch.object(CalendarFeedIntegration, 'render_feed_parts', side_effect=render) as rendered:
+            first, second = feed(self.user), feed(other)
+            self.assertEqual(rendered.call_count, 1)
+            # Partes específicas do assinante aplicadas sobre o bloco compartilhado
+            self.assertIn(f'UID:user-{self.user.pk}-event-{event.pk}', first)
+            self.assertIn(f'UID:user-{other.pk}-event-{event.pk}', second)
+
+            event.name = 'Reunião remarcada'
+            event.save()
+            refresh_calendar_feeds()
+            self.assertIn('[PRIVADO] Reunião remarcada', feed(other))
+            self.assertEqual(rendered.call_count, 2)
+
+
+class CalendarPdfExportTest(EventTestMixin, TestCase):
+    def test_single_projected_query(self):
+        now = timezone.now()
+        for day in range(3):
+            self.create_event(f'Reunião {day}', start=now.replace(day=1, hour=12, minute=0) + timedelta(days=day))
+        self.create_event('Reunião cancelada', start=now.replace(day=1, hour=15, minute=0), status='cancelado')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('events:export_calendar_pdf'))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        event_queries = [query['sql'] for query in queries if 'FROM "events_event"' in query['sql']]
+        self.assertEqual(len(event_queries), 1)
+        self.assertNotIn('JOIN "events_eventtype"', event_queries[0])
+
+    def test_month_grid_layout(self):
+        now = timezone.now()
+        for hour in range(6):
+            self.create_event(f'Sessão {hour}', start=now.replace(day=10, hour=8 + hour, minute=0))
+
+        response = self.client.get(reverse('events:export_calendar_pdf'), {'layout': 'grid'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+
+class FeedSyncTest(EventTestMixin, TestCase):
+    def feed(self, url, **params):
+        response = self.client.get(url, params)
+        body = (b''.join(response.streaming_content) if response.streaming else response.content).decode()
+        return response, body
+
+    def test_not_modified(self):
+        from events.feed_store import refresh_calendar_feeds
+
+        self.create_event('Sessão pública', is_public=True)
+        url = reverse('events:department_calendar_feed', args=[self.department.pk])
+        response, body = self.feed(url)
+        self.assertIn('Sessão pública', body)
+        self.assertTrue(response['X-Sync-Token'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.create_event('Nova sessão', is_public=True)
+        refresh_calendar_feeds()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_changes_since_token(self):
+        from events.deletion import soft_delete_events
+        from events.sync import make_sync_token
+
+        unchanged = self.create_event('Sessão mantida', is_public=True)
+        edited = self.create_event('Sessão editada', is_public=True)
+        hidden = self.create_event('Sessão fechada', is_public=True)
+        deleted = self.create_event('Sessão excluída', is_public=True)
+        token = make_sync_token(timezone.now())
+
+        edited.name = 'Sessão remarcada'
+        edited.save()
+        hidden.is_public = False
+        hidden.save()
+        soft_delete_events([deleted.pk])
+        self.create_event('Reunião interna')
+
+        response, body = self.feed(reverse('events:public_calendar_feed'), sync_token=token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Sessão remarcada', body)
+        self.assertNotIn(str(unchanged.pk), body)
+        self.assertNotIn('Reunião interna', body)
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        for event in (hidden, deleted):
+            self.assertIn(f'UID:public-event-{event.pk}@eventosys.local\r\nSTATUS:CANCELLED', body)
+
+    def test_invalid_token(self):
+        response = self.client.get(reverse('events:public_calendar_feed'), {'sync_token': 'invalido'})
+        self.assertEqual(response.status_code, 410)
+
+
+class CalendarFeedStoreTest(EventTestMixin, TestCase):
+    def test_requests_serve_the_stored_feed(self):
+        from events.feed_store import refresh_calendar_feeds
+        from events.models import CalendarFeed
+
+        event = self.create_event('Sessão pública', is_public=True)
+        url = reverse('events:public_calendar_feed')
+        self.assertIn('Sessão pública', self.client.get(url).content.decode())
+
+        event.name = 'Sessão remarcada'
+        event.save()
+        self.assertIsNotNone(CalendarFeed.objects.get(pk='public').dirty_since)
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(url).content.decode()
+        self.assertFalse([query for query in queries if 'events_event' in query['sql']])
+        self.assertIn('Sessão pública', body)
+
+        self.assertEqual(refresh_calendar_feeds(), 1)
+        self.assertIsNone(CalendarFeed.objects.get(pk='public').dirty_since)
+        self.assertIn('Sessão remarcada', self.client.get(url).content.decode())
+
+    def test_stale_feed_is_regenerated_without_the_worker(self):
+        from events.feed_store import FEED_STALE_AFTER, feed_cache_key
+        from events.models import CalendarFeed
+
+        event = self.create_event('Sessão pública', is_public=True)
+        url = reverse('events:public_calendar_feed')
+        self.client.get(url)
+        event.name = 'Sessão remarcada'
+        event.save()
+        self.assertIn('Sessão pública', self.client.get(url).content.decode())
+
+        # Worker parado: outra requisição já regenera o feed (trava obtida),
+        # esta continua recebendo o feed gravado sem consultar eventos
+        CalendarFeed.objects.filter(pk='public').update(
+            generated_at=timezone.now() - FEED_STALE_AFTER - timedelta(minutes=1)
+        )
+        cache.clear()
+        cache.add(f"{feed_cache_key('public')}:lock", True)
+        with CaptureQueriesContext(connection) as queries:
+            body = self.client.get(url).content.decode()
+        self.assertFalse([query for query in queries if 'events_event' in query['sql']])
+        self.assertIn('Sessão pública', body)
+
+        # Sem regeneração em andamento, uma requisição regenera o feed expirado
+        cache.delete(f"{feed_cache_key('public')}:lock")
+        self.assertIn('Sessão remarcada', self.client.get(url).content.decode())
+        feed = CalendarFeed.objects.get(pk='public')
+        self.assertIsNone(feed.dirty_since)
+        self.assertGreater(feed.generated_at, timezone.now() - timedelta(minutes=1))
+
+    def test_changes_mark_only_affected_feeds(self):
+        from events.feed_views import generate_user_token
+        from events.models import CalendarFeed
+
+        viewer = User.objects.create_user(username='visualizador_test', password='testpass123')
+        other_department = Department.objects.create(name='Jurídico')
+        self.client.get(reverse('events:public_calendar_feed'))
+        self.client.get(reverse('events:department_calendar_feed', args=[other_department.pk]))
+        self.client.get(reverse('events:user_calendar_feed', args=[self.user.pk, generate_user_token(self.user)]))
+        self.client.get(reverse('events:user_calendar_feed', args=[viewer.pk, generate_user_token(viewer)]))
+
+        self.create_event('Reunião interna')
+        dirty = set(CalendarFeed.objects.filter(dirty_since__isnull=False).values_list('key', flat=True))
+        self.assertEqual(dirty, {f'user:{self.user.pk}'})
+
+        self.create_event('Sessão pública', is_public=True)
+        dirty = set(CalendarFeed.objects.filter(dirty_since__isnull=False).values_list('key', flat=True))
+        self.assertEqual(dirty, {'public', f'user:{self.user.pk}', f'user:{viewer.pk}'})
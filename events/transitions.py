@@ -0,0 +1,118 @@
+"""
+Time-driven status transitions
+
+Moves events from planejado to em_andamento when they start and to
+concluido when they end, using set-based UPDATE statements. The history
+rows and notifications that the per-instance signals would produce are
+written in bulk afterwards; no Event is loaded and saved one by one.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from notifications.services import NotificationService
+from .cache import bump_data_version
+from .feed_store import mark_feeds_dirty
+from .fragments import rebuild_calendar_fragments
+from .models import Event, EventHistory
+from .sync import SCOPE_FIELDS
+
+# Transições automáticas: (status de origem, novo status, tipo de notificação)
+STARTED = (('planejado',), 'em_andamento', 'event_starting')
+ENDED = (('planejado', 'em_andamento'), 'concluido', 'event_ended')
+
+# Só notifica transições cujo horário passou há pouco (evita avisos em massa
+# ao colocar em dia eventos antigos)
+DEFAULT_NOTIFY_WINDOW = timedelta(hours=1)
+
+# Tamanho dos lotes de ids nas consultas IN
+ID_BATCH_SIZE = 500
+
+
+def _batches(items, size=ID_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def pending_transitions(now=None):
+    """Eventos com status desatualizado: {novo status: [(id, status atual, criador)]}"""
+    now = now or timezone.now()
+    ended = Event.objects.filter(status__in=ENDED[0], end_datetime__lte=now)
+    started = Event.objects.filter(status__in=STARTED[0], start_datetime__lte=now, end_datetime__gt=now)
+    fields = ('id', 'status', 'created_by_id')
+    return {
+        STARTED[1]: list(started.values_list(*fields)),
+        ENDED[1]: list(ended.values_list(*fields)),
+    }
+
+
+def apply_status_transitions(now=None, notify_window=DEFAULT_NOTIFY_WINDOW):
+    """Aplica as transições de status pendentes
+
+    Returns:
+        dict: novo status -> quantidade de eventos alterados
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        pending = pending_transitions(now)
+        applied = {new_status: [] for new_status in pending}
+        for sources, new_status, _ in (STARTED, ENDED):
+            for batch in _batches(pending[new_status]):
+                for source in sources:
+                    creators = {event_id: created_by_id for event_id, status, created_by_id in batch
+                                if status == source}
+                    if not creators:
+                        continue
+                    # O filtro pelo status lido evita sobrescrever alterações concorrentes
+                    count = Event.objects.filter(pk__in=creators, status=source).update(
+                        status=new_status, updated_at=now
+                    )
+                    if count == len(creators):
+                        updated = list(creators)
+                    elif count:
+                        # Parte do lote mudou antes do UPDATE: relê os eventos efetivamente alterados
+                        updated = Event.objects.filter(
+                            pk__in=creators, status=new_status, updated_at=now
+                        ).values_list('pk', flat=True)
+                    else:
+                        updated = []
+                    applied[new_status].extend((event_id, source, creators[event_id]) for event_id in updated)
+        history = [
+            EventHistory(
+                event_id=event_id,
+                field_name='Status',
+                old_value=old_status,
+                new_value=new_status,
+                changed_by_id=created_by_id,
+            )
+            for new_status, rows in applied.items()
+            for event_id, old_status, created_by_id in rows
+        ]
+        EventHistory.objects.bulk_create(history, batch_size=ID_BATCH_SIZE)
+
+    changed = {new_status: len(rows) for new_status, rows in applied.items()}
+    if not history:
+        return changed
+
+    # UPDATE não dispara os sinais: invalida caches e renova os fragmentos aqui
+    bump_data_version()
+    changed_ids = [event_id for rows in applied.values() for event_id, _, _ in rows]
+    for batch in _batches(changed_ids):
+        rebuild_calendar_fragments(Event.objects.filter(pk__in=batch))
+        mark_feeds_dirty(Event.objects.filter(pk__in=batch).values(*SCOPE_FIELDS))
+
+    _notify(applied, now, notify_window)
+    return changed
+
+
+def _notify(pending, now, notify_window):
+    """Notificações em lote das transições recentes"""
+    since = now - notify_window
+    for _, new_status, notification_type in (STARTED, ENDED):
+        ids = [event_id for event_id, _, _ in pending[new_status]]
+        boundary = 'start_datetime__gte' if new_status == STARTED[1] else 'end_datetime__gte'
+        for batch in _batches(ids):
+            events = Event.objects.filter(pk__in=batch, **{boundary: since}).only(
+                'id', 'name', 'start_datetime', 'department_id', 'responsible_person_id', 'created_by_id'
+            )
+            NotificationService.create_bulk_event_notifications(events, notification_type)
@@ -3,6 +3,7 @@ from . import views
 from . import utils
 from . import dashboard_views
 from . import feed_views
+from . import api_views
 
 app_name = 'events'
 
@@ -16,6 +17,10 @@ urlpatterns = [
     # Event CRUD
     path('events/', views.EventListView.as_view(), name='event_list'),
     path('events/api/', views.events_api, name='events_api'),
+    path('events/bulk-update/', views.events_bulk_update, name='events_bulk_update'),
+    path('events/batch/', views.events_batch_api, name='events_batch'),
+    path('locations/check-slots/', views.check_location_slots_api, name='check_location_slots'),
+    path('locations/availability/', views.location_availability_api, name='location_availability'),
     path('events/create/', views.EventCreateView.as_view(), name='event_create'),
     path('events/<uuid:pk>/', views.EventDetailView.as_view(), name='event_detail'),
     path('events/<uuid:pk>/edit/', views.EventUpdateView.as_view(), name='event_edit'),
@@ -42,4 +47,7 @@ urlpatterns = [
     path('calendar/feed/user/<int:user_id>/<str:token>/', feed_views.user_calendar_feed, name='user_calendar_feed'),
     path('calendar/feed/department/<int:department_id>/', feed_views.department_calendar_feed, name='department_calendar_feed'),
     path('calendar/feed/public/', feed_views.public_calendar_feed, name='public_calendar_feed'),
+    
+    # REST API
+    path('api/v1/events/', api_views.events_rest_api, name='api_events'),
 ]
\ No newline at end of file
@@ -1,96 +1,241 @@
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from icalendar import Calendar, Event as ICalEvent
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import letter, A4, landscape
 from reportlab.lib.colors import HexColor
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from io import BytesIO
+from collections import Counter
+from django.utils.html import escape
+import calendar
 import uuid
 from datetime import datetime, timedelta
 from accounts.utils import get_user_accessible_events
 from .models import Event
+from . import ics
+from .ics_fragments import get_ics_blocks, ICS_CHUNK_SIZE
 
 
-@login_required
-def export_calendar_ics(request):
-    """Export calendar events to ICS format"""
-    # Get user accessible events
-    events = get_user_accessible_events(request.user)
-    
-    # Filter by date range if provided
+# Colunas lidas pelas exportações ICS além da projeção de exibição (sem joins)
+ICS_EXTRA_FIELDS = ('virtual_link', 'created_at')
+
+
+def _ics_status(event):
+    return 'CONFIRMED' if event.status in ['planejado', 'em_andamento'] else 'CANCELLED'
+
+
+def render_export_event(event):
+    """VEVENT da exportação do calendário interno"""
+    return ics.render_component('VEVENT', {
+        'UID': ics.text(f'event-{event.id}@eventosys.local'),
+        'DTSTART': ics.date_time(event.start_datetime),
+        'DTEND': ics.date_time(event.end_datetime),
+        'SUMMARY': ics.text(event.name),
+        'DESCRIPTION': ics.text(
+            f'Tipo: {event.event_type_label}\n'
+            f'Responsável: {event.responsible_name}\n'
+            f'Status: {event.get_status_display()}\n\n'
+            f'{event.description}'
+        ),
+        'LOCATION': ics.text(event.location_display) if event.location_display else None,
+        'URL': ics.uri(event.virtual_link) if event.virtual_link else None,
+        'CREATED': ics.date_time(event.created_at),
+        'LAST-MODIFIED': ics.date_time(event.updated_at),
+        'CATEGORIES': ics.text(event.event_type_label),
+        'STATUS': ics.text(_ics_status(event)),
+    }, ics.EVENT_ORDER)
+
+
+def render_public_export_event(event):
+    """VEVENT da exportação do calendário público"""
+    return ics.render_component('VEVENT', {
+        'UID': ics.text(f'public-event-{event.id}@eventosys.local'),
+        'DTSTART': ics.date_time(event.start_datetime),
+        'DTEND': ics.date_time(event.end_datetime),
+        'SUMMARY': ics.text(f'[PÚBLICO] {event.name}'),
+        'DESCRIPTION': ics.text(
+            f'Evento público institucional\n\n'
+            f'Tipo: {event.event_type_label}\n'
+            f'Responsável: {event.responsible_name}\n\n'
+            f'{event.description}'
+        ),
+        'LOCATION': ics.text(event.location_display) if event.location_display else None,
+        'URL': ics.uri(event.virtual_link) if event.virtual_link else None,
+        'CREATED': ics.date_time(event.created_at),
+        'LAST-MODIFIED': ics.date_time(event.updated_at),
+        'CATEGORIES': ics.text(f'Público,{event.event_type_label}'),
+        'STATUS': ics.text(_ics_status(event)),
+    }, ics.EVENT_ORDER)
+
+
+def _filter_export_range(request, events):
+    """Período dos parâmetros start/end ou, por padrão, os próximos 3 meses"""
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
     
     if start_date and end_date:
-        events = events.filter(
+        return events.filter(
             start_datetime__gte=start_date,
             end_datetime__lte=end_date
         )
-    else:
-        # Default to next 3 months
-        now = timezone.now()
-        three_months = now + timedelta(days=90)
-        events = events.filter(
-            start_datetime__gte=now,
-            start_datetime__lte=three_months
-        )
     
-    # Create calendar
-    cal = Calendar()
-    cal.add('prodid', '-//EventoSys//Sistema de Gestão de Eventos//PT')
-    cal.add('version', '2.0')
-    cal.add('calscale', 'GREGORIAN')
-    cal.add('method', 'PUBLISH')
-    cal.add('x-wr-calname', 'EventoSys - Eventos Institucionais')
-    cal.add('x-wr-caldesc', 'Calendário de eventos institucionais')
-    cal.add('x-wr-timezone', 'America/Sao_Paulo')
+    # Default to next 3 months
+    now = timezone.now()
+    three_months = now + timedelta(days=90)
+    return events.filter(
+        start_datetime__gte=now,
+        start_datetime__lte=three_months
+    )
+
+
+def _stream_ics(properties, events, render, variant, filename):
+    """Resposta ICS gerada enquanto o queryset é percorrido, com os VEVENTs em cache por evento"""
+    events = events.display_projection(*ICS_EXTRA_FIELDS).iterator(chunk_size=ICS_CHUNK_SIZE)
+    blocks = get_ics_blocks(events, variant, render)
+    response = StreamingHttpResponse(ics.stream_calendar(properties, blocks), content_type='text/calendar')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def export_calendar_ics(request):
+    """Export calendar events to ICS format"""
+    events = _filter_export_range(request, get_user_accessible_events(request.user))
+    properties = ics.calendar_properties(
+        '-//EventoSys//Sistema de Gestão de Eventos//PT',
+        'EventoSys - Eventos Institucionais',
+        'Calendário de eventos institucionais',
+    )
+    return _stream_ics(
+        properties, events, render_export_event, 'export',
+        f'eventosys_calendar_{timezone.now().strftime("%Y%m%d")}.ics'
+    )
+
+
+# Colunas lidas pela exportação em PDF (uma única consulta projetada)
+PDF_COLUMNS = (
+    'start_datetime', 'name', 'event_type_label', 'event_type_color',
+    'location_display', 'status', 'responsible_name',
+)
+
+# Eventos listados por dia na grade mensal (os demais são resumidos em "+N")
+PDF_GRID_EVENTS_PER_DAY = 4
+
+PDF_WEEKDAYS = ('Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb')
+PDF_MONTHS = (
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro',
+)
+
+STATUS_LABELS = dict(Event.STATUS_CHOICES)
+
+
+def _pdf_table(rows, styles):
+    """Tabela com uma linha por evento"""
+    data = [['Data/Hora', 'Evento', 'Tipo', 'Local', 'Status', 'Responsável']]
+    for row in rows:
+        data.append([
+            row['start_datetime'].strftime('%d/%m/%Y\n%H:%M'),
+            Paragraph(row['name'], styles['Normal']),
+            row['event_type_label'],
+            row['location_display'] or '-',
+            STATUS_LABELS.get(row['status'], row['status']),
+            row['responsible_name']
+        ])
     
-    # Add events
-    for event in events.select_related('event_type', 'location', 'responsible_person'):
-        ical_event = ICalEvent()
-        ical_event.add('uid', f'event-{event.id}@eventosys.local')
-        ical_event.add('dtstart', event.start_datetime)
-        ical_event.add('dtend', event.end_datetime)
-        ical_event.add('summary', event.name)
-        ical_event.add('description', 
-                      f'Tipo: {event.event_type.get_name_display()}\n'
-                      f'Responsável: {event.responsible_person.get_full_name() or event.responsible_person.username}\n'
-                      f'Status: {event.get_status_display()}\n\n'
-                      f'{event.description}')
-        
-        if event.location:
-            ical_event.add('location', str(event.location))
-        
-        if event.virtual_link:
-            ical_event.add('url', event.virtual_link)
-        
-        ical_event.add('created', event.created_at)
-        ical_event.add('last-modified', event.updated_at)
-        ical_event.add('categories', event.event_type.get_name_display())
-        ical_event.add('status', 'CONFIRMED' if event.status in ['planejado', 'em_andamento'] else 'CANCELLED')
-        
-        cal.add_component(ical_event)
+    table = Table(data, colWidths=[1.2*inch, 2.5*inch, 1.2*inch, 1.2*inch, 1*inch, 1.5*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3b82f6')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#ffffff')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#ffffff'), HexColor('#f9fafb')])
+    ]))
+    return [table]
+
+
+def _pdf_month_grids(rows, months, styles):
+    """Uma grade (semanas x dias) por mês, com um parágrafo por dia em vez de um por evento"""
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(timezone.localtime(row['start_datetime']).date(), []).append(row)
     
-    # Generate response
-    response = HttpResponse(cal.to_ical(), content_type='text/calendar')
-    response['Content-Disposition'] = f'attachment; filename="eventosys_calendar_{timezone.now().strftime("%Y%m%d")}.ics"'
-    return response
+    cell_style = ParagraphStyle('GridCell', parent=styles['Normal'], fontSize=7, leading=8.5)
+    month_style = ParagraphStyle('GridMonth', parent=styles['Heading2'], alignment=1)
+    month_calendar = calendar.Calendar(firstweekday=6)  # Semana começa no domingo
+    
+    elements = []
+    for year, month in months:
+        data = [list(PDF_WEEKDAYS)]
+        for week in month_calendar.monthdatescalendar(year, month):
+            cells = []
+            for day in week:
+                if day.month != month:
+                    cells.append('')
+                    continue
+                day_rows = by_day.get(day, [])
+                lines = [f'<b>{day.day}</b>']
+                for row in day_rows[:PDF_GRID_EVENTS_PER_DAY]:
+                    local_start = timezone.localtime(row['start_datetime'])
+                    color = row['event_type_color'] or '#374151'
+                    lines.append(
+                        f'<font color="{color}">{local_start.strftime("%H:%M")}</font> {escape(row["name"])}'
+                    )
+                if len(day_rows) > PDF_GRID_EVENTS_PER_DAY:
+                    lines.append(f'<i>+{len(day_rows) - PDF_GRID_EVENTS_PER_DAY} evento(s)</i>')
+                cells.append(Paragraph('<br/>'.join(lines), cell_style))
+            data.append(cells)
+        
+        table = Table(data, colWidths=[1.05*inch] * 7, rowHeights=[0.3*inch] + [1.1*inch] * (len(data) - 1))
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3b82f6')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#ffffff')),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
+        ]))
+        elements.append(Paragraph(f'{PDF_MONTHS[month - 1]} {year}', month_style))
+        elements.append(table)
+        elements.append(Spacer(1, 20))
+    return elements
+
+
+def _pdf_months(rows, start_of_month=None):
+    """Meses exibidos na grade: os dos eventos ou, sem eventos, o mês padrão"""
+    months = {(start.year, start.month) for start in (timezone.localtime(row['start_datetime']) for row in rows)}
+    if start_of_month is not None:
+        months.add((start_of_month.year, start_of_month.month))
+    return sorted(months)
 
 
 @login_required
 def export_calendar_pdf(request):
-    """Export calendar events to PDF format"""
+    """Export calendar events to PDF format
+    
+    Com ``layout=grid`` os eventos são exibidos em grades mensais em vez da
+    tabela com uma linha por evento.
+    """
     # Get user accessible events
     events = get_user_accessible_events(request.user)
+    grid_layout = request.GET.get('layout') == 'grid'
     
     # Filter by date range if provided
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
+    start_of_month = None
     
     if start_date and end_date:
         events = events.filter(
@@ -110,11 +255,16 @@ def export_calendar_pdf(request):
         )
         period_text = f"Período: {start_of_month.strftime('%B %Y')}"
     
-    events = events.select_related('event_type', 'location', 'responsible_person', 'department').order_by('start_datetime')
+    # Uma única consulta projetada; os totais por status são acumulados na mesma passada
+    rows = list(events.order_by('start_datetime').values(*PDF_COLUMNS))
+    status_counts = Counter(STATUS_LABELS.get(row['status'], row['status']) for row in rows)
     
     # Create PDF
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    doc = SimpleDocTemplate(
+        buffer, pagesize=landscape(A4) if grid_layout else A4,
+        rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18
+    )
     
     # Container for the 'Flowable' objects
     elements = []
@@ -144,41 +294,11 @@ def export_calendar_pdf(request):
     elements.append(Paragraph(f"Gerado em: {timezone.now().strftime('%d/%m/%Y %H:%M')}", subtitle_style))
     elements.append(Spacer(1, 20))
     
-    if events.exists():
-        # Create table data
-        data = [['Data/Hora', 'Evento', 'Tipo', 'Local', 'Status', 'Responsável']]
-        
-        for event in events:
-            data.append([
-                event.start_datetime.strftime('%d/%m/%Y\n%H:%M'),
-                Paragraph(event.name, styles['Normal']),
-                event.event_type.get_name_display(),
-                str(event.location) if event.location else '-',
-                event.get_status_display(),
-                event.responsible_person.get_full_name() or event.responsible_person.username
-            ])
-        
-        # Create table
-        table = Table(data, colWidths=[1.2*inch, 2.5*inch, 1.2*inch, 1.2*inch, 1*inch, 1.5*inch])
-        
-        # Style the table
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#3b82f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), HexColor('#ffffff')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e5e7eb')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [HexColor('#ffffff'), HexColor('#f9fafb')])
-        ]))
-        
-        elements.append(table)
+    if rows:
+        if grid_layout:
+            elements.extend(_pdf_month_grids(rows, _pdf_months(rows, start_of_month), styles))
+        else:
+            elements.extend(_pdf_table(rows, styles))
         
         # Summary
         elements.append(Spacer(1, 30))
@@ -189,13 +309,7 @@ def export_calendar_pdf(request):
             textColor=HexColor('#6b7280')
         )
         
-        total_events = events.count()
-        status_counts = {}
-        for event in events:
-            status = event.get_status_display()
-            status_counts[status] = status_counts.get(status, 0) + 1
-        
-        summary_text = f"<b>Resumo:</b> {total_events} evento(s) no período<br/>"
+        summary_text = f"<b>Resumo:</b> {len(rows)} evento(s) no período<br/>"
         for status, count in status_counts.items():
             summary_text += f"• {status}: {count}<br/>"
         
@@ -226,64 +340,13 @@ def export_calendar_pdf(request):
 @login_required
 def export_public_calendar_ics(request):
     """Export public calendar events to ICS format (requires authentication)"""
-    # Get only public events
-    events = Event.objects.filter(is_public=True)
-    
-    # Filter by date range if provided
-    start_date = request.GET.get('start')
-    end_date = request.GET.get('end')
-    
-    if start_date and end_date:
-        events = events.filter(
-            start_datetime__gte=start_date,
-            end_datetime__lte=end_date
-        )
-    else:
-        # Default to next 3 months
-        now = timezone.now()
-        three_months = now + timedelta(days=90)
-        events = events.filter(
-            start_datetime__gte=now,
-            start_datetime__lte=three_months
-        )
-    
-    # Create calendar
-    cal = Calendar()
-    cal.add('prodid', '-//EventoSys//Eventos Públicos//PT')
-    cal.add('version', '2.0')
-    cal.add('calscale', 'GREGORIAN')
-    cal.add('method', 'PUBLISH')
-    cal.add('x-wr-calname', 'EventoSys - Eventos Públicos')
-    cal.add('x-wr-caldesc', 'Calendário de eventos públicos')
-    cal.add('x-wr-timezone', 'America/Sao_Paulo')
-    
-    # Add events
-    for event in events.select_related('event_type', 'location', 'responsible_person'):
-        ical_event = ICalEvent()
-        ical_event.add('uid', f'public-event-{event.id}@eventosys.local')
-        ical_event.add('dtstart', event.start_datetime)
-        ical_event.add('dtend', event.end_datetime)
-        ical_event.add('summary', f'[PÚBLICO] {event.name}')
-        ical_event.add('description', 
-                      f'Evento público institucional\n\n'
-                      f'Tipo: {event.event_type.get_name_display()}\n'
-                      f'Responsável: {event.responsible_person.get_full_name() or event.responsible_person.username}\n\n'
-                      f'{event.description}')
-        
-        if event.location:
-            ical_event.add('location', str(event.location))
-        
-        if event.virtual_link:
-            ical_event.add('url', event.virtual_link)
-        
-        ical_event.add('created', event.created_at)
-        ical_event.add('last-modified', event.updated_at)
-        ical_event.add('categories', f'Público,{event.event_type.get_name_display()}')
-        ical_event.add('status', 'CONFIRMED' if event.status in ['planejado', 'em_andamento'] else 'CANCELLED')
-        
-        cal.add_component(ical_event)
-    
-    # Generate response
-    response = HttpResponse(cal.to_ical(), content_type='text/calendar')
-    response['Content-Disposition'] = f'attachment; filename="eventosys_public_calendar_{timezone.now().strftime("%Y%m%d")}.ics"'
-    return response
\ No newline at end of file
+    events = _filter_export_range(request, Event.objects.filter(is_public=True))
+    properties = ics.calendar_properties(
+        '-//EventoSys//Eventos Públicos//PT',
+        'EventoSys - Eventos Públicos',
+        'Calendário de eventos públicos',
+    )
+    return _stream_ics(
+        properties, events, render_public_export_event, 'public_export',
+        f'eventosys_public_calendar_{timezone.now().strftime("%Y%m%d")}.ics'
+    )
@@ -5,15 +5,30 @@ from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
 from django.db.models import Q, Count
-from django.http import JsonResponse, HttpResponse
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.core.cache import cache
 from django.template.loader import render_to_string
-from django.core.paginator import Paginator
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 from django.db import transaction
-from accounts.utils import has_permission, can_edit_event, can_view_event, get_user_accessible_events, log_user_action
+from accounts.utils import has_permission, can_edit_event, can_view_event, get_user_accessible_events, get_access_scope_key, log_user_action
 from .models import Event, EventType, Department, Location
-from .forms import EventForm, EventFilterForm  # EventDocumentFormSet removed
+from .forms import EventForm, EventFilterForm, EventBulkUpdateForm  # EventDocumentFormSet removed
+from .cache import get_data_version, get_related_version, make_params_key, get_cache_timeout
+from .fragments import get_calendar_fragments, get_occurrence_fragments
+from .recurrence import expand_occurrences
+from .pagination import keyset_paginate, get_cached_count
+from .search import search_events, annotate_search, highlight_snippet
+from .conflicts import check_slots
+from .availability import find_free_slots
+from .bulk import bulk_update_events
+from .batch import apply_event_batch
+from .conditional import conditional_event_data
+from .deletion import soft_delete_events
+from datetime import datetime, timedelta
 import json
 
 
@@ -137,50 +152,80 @@ def debug_dashboard_api(request):
                           f"API Error: {str(e)}".encode('utf-8'))
 
 
+def filter_events(queryset, params):
+    """Aplica os filtros do EventFilterForm (lista de eventos e events_api)
+    
+    params pode ser o QueryDict da requisição ou um EventFilterForm já validado.
+    """
+    form = params if isinstance(params, EventFilterForm) else EventFilterForm(params)
+    if not form.is_valid():
+        return queryset
+    
+    if form.cleaned_data.get('event_type'):
+        queryset = queryset.filter(event_type=form.cleaned_data['event_type'])
+    
+    if form.cleaned_data.get('department'):
+        queryset = queryset.filter(department=form.cleaned_data['department'])
+    
+    if form.cleaned_data.get('status'):
+        queryset = queryset.filter(status=form.cleaned_data['status'])
+    
+    if form.cleaned_data.get('responsible_person'):
+        queryset = queryset.filter(responsible_person=form.cleaned_data['responsible_person'])
+    
+    if form.cleaned_data.get('start_date'):
+        queryset = queryset.filter(start_datetime__date__gte=form.cleaned_data['start_date'])
+    
+    if form.cleaned_data.get('end_date'):
+        queryset = queryset.filter(start_datetime__date__lte=form.cleaned_data['end_date'])
+    
+    if form.cleaned_data.get('search'):
+        queryset = search_events(queryset, form.cleaned_data['search'])
+    
+    return queryset
+
+
+# Parâmetros do EventFilterForm que alteram o resultado da listagem
+EVENT_FILTER_PARAMS = ('event_type', 'department', 'status', 'responsible_person', 'start_date', 'end_date', 'search')
+
+# Eventos por página na listagem e no events_api
+EVENTS_PER_PAGE = 20
+
+
+def paginate_events(request, queryset):
+    """Pagina a listagem por cursor (start_datetime, id) com total em cache
+    
+    O total é calculado uma vez por versão dos dados, escopo de acesso e filtros,
+    em vez de um COUNT(DISTINCT) a cada página.
+    """
+    params_key = make_params_key(request.GET, EVENT_FILTER_PARAMS)
+    count_key = f'events:count:{get_data_version()}:{get_access_scope_key(request.user)}:{params_key}'
+    total_count = get_cached_count(queryset, count_key, get_cache_timeout('event_count'))
+    return keyset_paginate(queryset, request.GET.get('cursor'), EVENTS_PER_PAGE, total_count)
+
+
+@method_decorator(conditional_event_data('event_list', per_user=True), name='get')
 class EventListView(LoginRequiredMixin, ListView):
     """Lista de eventos com filtros"""
     model = Event
     template_name = 'events/event_list.html'
     context_object_name = 'events'
-    paginate_by = 20
+    paginate_by = None  # Paginação por cursor em get_context_data
     
     def get_queryset(self):
-        queryset = get_user_accessible_events(self.request.user)
-        
-        # Aplicar filtros
-        form = EventFilterForm(self.request.GET)
-        if form.is_valid():
-            if form.cleaned_data.get('event_type'):
-                queryset = queryset.filter(event_type=form.cleaned_data['event_type'])
-            
-            if form.cleaned_data.get('department'):
-                queryset = queryset.filter(department=form.cleaned_data['department'])
-            
-            if form.cleaned_data.get('status'):
-                queryset = queryset.filter(status=form.cleaned_data['status'])
-            
-            if form.cleaned_data.get('responsible_person'):
-                queryset = queryset.filter(responsible_person=form.cleaned_data['responsible_person'])
-            
-            if form.cleaned_data.get('start_date'):
-                queryset = queryset.filter(start_datetime__date__gte=form.cleaned_data['start_date'])
-            
-            if form.cleaned_data.get('end_date'):
-                queryset = queryset.filter(start_datetime__date__lte=form.cleaned_data['end_date'])
-            
-            if form.cleaned_data.get('search'):
-                search_term = form.cleaned_data['search']
-                queryset = queryset.filter(
-                    Q(name__icontains=search_term) |
-                    Q(description__icontains=search_term)
-                )
-        
-        return queryset.select_related('event_type', 'department', 'responsible_person', 'location')
+        queryset = filter_events(get_user_accessible_events(self.request.user), self.request.GET)
+        # Cartões usam as colunas de exibição desnormalizadas (sem joins)
+        return queryset.display_projection()
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        page_obj = paginate_events(self.request, self.object_list)
+        context['events'] = page_obj
+        context['page_obj'] = page_obj
+        context['is_paginated'] = page_obj.has_other_pages()
         context['filter_form'] = EventFilterForm(self.request.GET)
         context['can_create_events'] = has_permission(self.request.user, 'create_event')
+        context['card_version'] = get_related_version()
         return context
 
 
@@ -203,7 +248,10 @@ class EventDetailView(LoginRequiredMixin, DetailView):
         context['can_edit'] = can_edit_event(self.request.user, event)
         context['documents'] = []  # Documents functionality removed
         # Participants functionality removed as requested
-        context['history'] = event.history.all()[:10]  # Últimas 10 alterações
+        # Últimas 10 alterações; consultadas apenas se o fragmento não estiver em cache
+        context['history'] = event.history.select_related('changed_by')[:10]
+        # Seções renderizadas em cache por evento/updated_at, papel e versão dos cadastros
+        context['detail_version'] = get_related_version()
         
         log_user_action(self.request, self.request.user, 'view_event', f'event_{event.id}')
         return context
@@ -305,24 +353,128 @@ class EventDeleteView(LoginRequiredMixin, DeleteView):
             return HttpResponseRedirect(reverse('events:event_detail', kwargs={'pk': obj.pk}))
         return obj
     
-    def delete(self, request, *args, **kwargs):  # type: ignore
-        event = self.get_object()
+    def form_valid(self, form):
+        event = self.object
         # Check if event is an HttpResponseRedirect
         from django.http import HttpResponseRedirect
         if isinstance(event, HttpResponseRedirect):
             return event
-            
-        event_name = event.name
-        response = super().delete(request, *args, **kwargs)
         
-        messages.success(request, f'Evento "{event_name}" excluído com sucesso!')
-        log_user_action(request, request.user, 'delete_event', f'event_{event.id}')
+        # Exclusão lógica: notificações e histórico são removidos em segundo plano
+        # (comando purge_deleted_events), sem bloquear a requisição
+        soft_delete_events([event.pk])
+        
+        messages.success(self.request, f'Evento "{event.name}" excluído com sucesso!')
+        log_user_action(self.request, self.request.user, 'delete_event', f'event_{event.id}')
+        
+        return HttpResponseRedirect(self.get_success_url())
+    
+    def delete(self, request, *args, **kwargs):  # type: ignore
+        return self.post(request, *args, **kwargs)
+
+
+# Parâmetros que alteram o conteúdo da resposta do calendário
+CALENDAR_DATA_PARAMS = ('start', 'end', 'event_type', 'department', 'status', 'public_only')
+
+
+def _calendar_cache_key(request):
+    """Chave de cache da resposta do calendário (versão dos dados, escopo e filtros)"""
+    if not hasattr(request, '_calendar_cache_key'):
+        public_only = request.GET.get('public_only', 'false').lower() == 'true'
+        if public_only or not request.user.is_authenticated:
+            scope = 'public'
+        else:
+            scope = get_access_scope_key(request.user)
         
-        return response
+        params_key = make_params_key(request.GET, CALENDAR_DATA_PARAMS)
+        request._calendar_cache_key = f'events:calendar:{get_data_version()}:{scope}:{params_key}'
+    return request._calendar_cache_key
 
 
+def _parse_range_bound(value):
+    """Converte um limite de intervalo (data ou data/hora ISO 8601) em datetime com fuso"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is None:
+                return None
+            parsed = datetime.combine(parsed_date, datetime.min.time())
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _get_calendar_range(request):
+    """Obtém e valida o intervalo obrigatório (start, end) da requisição do calendário"""
+    range_start = _parse_range_bound(request.GET.get('start'))
+    range_end = _parse_range_bound(request.GET.get('end'))
+    
+    if range_start is None or range_end is None:
+        raise ValueError('Os parâmetros "start" e "end" são obrigatórios (formato ISO 8601).')
+    
+    if range_start >= range_end:
+        raise ValueError('O parâmetro "start" deve ser anterior a "end".')
+    
+    max_days = getattr(settings, 'CALENDAR_MAX_RANGE_DAYS', 62)
+    if range_end - range_start > timedelta(days=max_days):
+        raise ValueError(f'O intervalo solicitado não pode exceder {max_days} dias.')
+    
+    return range_start, range_end
+
+
+def _iter_json_array(fragments, batch_size=100):
+    """Concatena fragmentos JSON já codificados em um array, em blocos, para streaming"""
+    yield '['
+    batch = []
+    first = True
+    for fragment in fragments:
+        batch.append(fragment)
+        if len(batch) >= batch_size:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+    yield ']'
+
+
+def _cache_stream(chunks, cache_key, timeout):
+    """Repassa os blocos da resposta e armazena o conteúdo completo no cache ao final"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(cache_key, ''.join(parts), timeout)
+
+
+@conditional_event_data('calendar_data')
 def calendar_data_view(request):
     """API para dados do calendário (JSON)"""
+    try:
+        range_start, range_end = _get_calendar_range(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    cache_key = _calendar_cache_key(request)
+    content = cache.get(cache_key)
+    if content is not None:
+        response = HttpResponse(content, content_type='application/json')
+    else:
+        chunks = _iter_json_array(_iter_calendar_events(request, range_start, range_end))
+        response = StreamingHttpResponse(
+            _cache_stream(chunks, cache_key, get_cache_timeout('calendar_data')),
+            content_type='application/json'
+        )
+    return response
+
+
+def _iter_calendar_events(request, range_start, range_end):
+    """Gera os eventos do intervalo no formato do FullCalendar (fragmentos JSON)"""
     # Check if it's a public request
     public_only = request.GET.get('public_only', 'false').lower() == 'true'
     
@@ -336,16 +488,6 @@ def calendar_data_view(request):
         else:
             events = get_user_accessible_events(request.user)
     
-    # Date range filters
-    start_date = request.GET.get('start')
-    end_date = request.GET.get('end')
-    
-    if start_date and end_date:
-        events = events.filter(
-            start_datetime__gte=start_date,
-            end_datetime__lte=end_date
-        )
-    
     # Advanced filters
     event_type = request.GET.get('event_type')
     if event_type:
@@ -359,99 +501,361 @@ def calendar_data_view(request):
     if status:
         events = events.filter(status=status)
     
-    # Select related to optimize queries
-    events = events.select_related('event_type', 'location', 'responsible_person', 'department')
+    # Eventos que se sobrepõem ao intervalo (inclui os que atravessam as bordas).
+    # Apenas id/updated_at: o conteúdo vem dos fragmentos pré-serializados
+    rows = list(events.overlapping(range_start, range_end).order_by('start_datetime').values_list('id', 'updated_at'))
     
-    # Convert to FullCalendar format
-    calendar_events = []
-    for event in events:
-        # Determine text color based on background
-        text_color = '#ffffff' if event.event_type.color else '#000000'
-        
-        calendar_events.append({
-            'id': str(event.id),
-            'title': event.name,
-            'start': event.start_datetime.isoformat(),
-            'end': event.end_datetime.isoformat(),
-            # Remove the URL to prevent automatic navigation - we'll handle clicks in JavaScript
-            'backgroundColor': event.event_type.color,
-            'borderColor': event.event_type.color,
-            'textColor': text_color,
-            'extendedProps': {
-                'type': event.event_type.get_name_display(),
-                'status': event.get_status_display(),
-                'location': str(event.location) if event.location else '',
-                'responsible': event.responsible_person.get_full_name() or event.responsible_person.username,
-                'department': event.department.name if event.department else '',
-                'isPublic': event.is_public,
-                'description': event.description[:100] + '...' if len(event.description) > 100 else event.description,
-                # Add the URL to extendedProps so we can use it in the modal
-                'url': reverse('events:event_detail', kwargs={'pk': event.pk}) if not public_only else '#',
-            }
-        })
+    for start_index in range(0, len(rows), 500):
+        yield from get_calendar_fragments(rows[start_index:start_index + 500], public_only=public_only)
+    
+    # Ocorrências de séries recorrentes, expandidas apenas para o intervalo
+    occurrences = expand_occurrences(events, range_start, range_end)
+    if occurrences:
+        yield from get_occurrence_fragments(occurrences, public_only=public_only)
+
+
+# Rótulos das choices, resolvidos sem instanciar modelos
+STATUS_LABELS = dict(Event.STATUS_CHOICES)
+EVENT_URL_PLACEHOLDER = '00000000-0000-0000-0000-000000000000'
+
+
+# Colunas projetadas para o modo JSON do events_api
+EVENTS_API_FIELDS = Event.DISPLAY_PROJECTION + ('series__rrule',)
+
+
+def _serialize_event_row(row, detail_url):
+    """Converte uma linha de .values() no formato compacto do grid de eventos"""
+    description = row['description']
+    
+    return {
+        'id': str(row['id']),
+        'name': row['name'],
+        'start': row['start_datetime'].isoformat(),
+        'end': row['end_datetime'].isoformat(),
+        'status': row['status'],
+        'status_display': STATUS_LABELS.get(row['status'], row['status']),
+        'type': row['event_type_label'],
+        'color': row['event_type_color'],
+        'location': row['location_display'],
+        'department': row['department_name'],
+        'responsible': row['responsible_name'],
+        'is_public': row['is_public'],
+        'description': description[:100] + '...' if len(description) > 100 else description,
+        'url': detail_url.replace(EVENT_URL_PLACEHOLDER, str(row['id'])),
+        'recurrence': row['series__rrule'] or '',
+    }
+
+
+def _list_occurrences(request):
+    """Ocorrências de séries entre os filtros start_date e end_date (exige ambos)
     
-    return JsonResponse(calendar_events, safe=False)
+    Os demais filtros são aplicados aos eventos-modelo; séries sem período
+    definido não são expandidas na listagem.
+    """
+    form = EventFilterForm(request.GET)
+    if not form.is_valid():
+        return []
+    start_date = form.cleaned_data.get('start_date')
+    end_date = form.cleaned_data.get('end_date')
+    if not (start_date and end_date):
+        return []
+    
+    params = request.GET.copy()
+    for name in ('start_date', 'end_date'):
+        params.pop(name, None)
+    templates = filter_events(get_user_accessible_events(request.user), params)
+    
+    range_start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    return [
+        occurrence for occurrence in expand_occurrences(templates, range_start, range_end)
+        if occurrence.start_datetime >= range_start
+    ]
+
+
+def _serialize_occurrences(occurrences, detail_url):
+    """Serializa ocorrências virtuais no mesmo formato das linhas do events_api"""
+    template_ids = {occurrence.event.pk for occurrence in occurrences}
+    rows = {row['id']: row for row in Event.objects.filter(pk__in=template_ids).values(*EVENTS_API_FIELDS)}
+    
+    items = []
+    for occurrence in occurrences:
+        row = dict(rows[occurrence.event.pk], start_datetime=occurrence.start_datetime,
+                   end_datetime=occurrence.end_datetime)
+        item = _serialize_event_row(row, detail_url)
+        item['occurrence'] = occurrence.occurrence_key
+        items.append(item)
+    return items
 
 
 @login_required
+@conditional_event_data('events_api')
 def events_api(request):
-    """API endpoint for dynamic event filtering"""
-    # Get filter parameters from request
-    queryset = get_user_accessible_events(request.user)
+    """API endpoint for dynamic event filtering
+    
+    Por padrão retorna o HTML do grid (com cache por cartão de evento).
+    Com ``format=json`` retorna apenas os dados compactos de cada evento,
+    para renderização no cliente; na primeira página, se houver start_date e
+    end_date, inclui também as ocorrências de séries recorrentes do período.
+    """
+    queryset = filter_events(get_user_accessible_events(request.user), request.GET)
+    json_mode = request.GET.get('format') == 'json'
+    
+    search_term = request.GET.get('search', '').strip()
+    
+    if json_mode:
+        # Apenas as colunas exibidas no grid, sem instanciar modelos
+        fields = EVENTS_API_FIELDS
+        if search_term:
+            queryset = annotate_search(queryset, search_term)
+            fields += ('search_snippet',)
+        queryset = queryset.values(*fields)
+    else:
+        # Cartões usam as colunas de exibição desnormalizadas (sem joins)
+        queryset = queryset.display_projection()
     
-    # Apply filters using the same logic as EventListView
-    form = EventFilterForm(request.GET)
-    if form.is_valid():
-        if form.cleaned_data.get('event_type'):
-            queryset = queryset.filter(event_type=form.cleaned_data['event_type'])
-        
-        if form.cleaned_data.get('department'):
-            queryset = queryset.filter(department=form.cleaned_data['department'])
-        
-        if form.cleaned_data.get('status'):
-            queryset = queryset.filter(status=form.cleaned_data['status'])
-        
-        if form.cleaned_data.get('responsible_person'):
-            queryset = queryset.filter(responsible_person=form.cleaned_data['responsible_person'])
-        
-        if form.cleaned_data.get('start_date'):
-            queryset = queryset.filter(start_datetime__date__gte=form.cleaned_data['start_date'])
-        
-        if form.cleaned_data.get('end_date'):
-            queryset = queryset.filter(start_datetime__date__lte=form.cleaned_data['end_date'])
-        
-        if form.cleaned_data.get('search'):
-            search_term = form.cleaned_data['search']
-            queryset = queryset.filter(
-                Q(name__icontains=search_term) |
-                Q(description__icontains=search_term)
-            )
-    
-    # Apply the same select_related optimization
-    queryset = queryset.select_related('event_type', 'department', 'responsible_person', 'location')
-    
-    # Pagination
-    paginator = Paginator(queryset, 20)  # Same as EventListView
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
-    
-    # Render the events grid HTML
-    events_html = render_to_string('events/partials/events_grid.html', {
-        'events': page_obj,
-        'page_obj': page_obj,
-        'request': request
-    })
+    # Paginação por cursor (custo constante em qualquer página)
+    page_obj = paginate_events(request, queryset)
     
-    # Return JSON response
-    return JsonResponse({
-        'events_html': events_html,
-        'total_count': paginator.count,
-        'current_page': page_obj.number,
-        'total_pages': paginator.num_pages,
+    data = {
+        'total_count': page_obj.total_count,
+        'count': len(page_obj),
         'has_previous': page_obj.has_previous(),
         'has_next': page_obj.has_next(),
-        'start_index': page_obj.start_index() if page_obj else 0,
-        'end_index': page_obj.end_index() if page_obj else 0,
+        'next_cursor': page_obj.next_cursor,
+        'previous_cursor': page_obj.previous_cursor,
+    }
+    
+    if json_mode:
+        detail_url = reverse('events:event_detail', kwargs={'pk': EVENT_URL_PLACEHOLDER})
+        data['events'] = [_serialize_event_row(row, detail_url) for row in page_obj]
+        if search_term:
+            # Trecho da descrição com os termos buscados destacados (HTML escapado)
+            for item, row in zip(data['events'], page_obj):
+                item['snippet'] = highlight_snippet(row['search_snippet'])
+        if not request.GET.get('cursor'):
+            # Ocorrências de séries recorrentes no período filtrado (não paginadas)
+            data['occurrences'] = _serialize_occurrences(_list_occurrences(request), detail_url)
+    else:
+        # Render the events grid HTML (cartões em cache por evento/updated_at)
+        data['events_html'] = render_to_string('events/partials/events_grid.html', {
+            'events': page_obj,
+            'page_obj': page_obj,
+            'card_version': get_related_version(),
+        }, request=request)
+    
+    return JsonResponse(data)
+
+
+# Limite de eventos por edição em lote
+MAX_BULK_UPDATE_EVENTS = 1000
+
+
+@login_required
+@require_POST
+def events_bulk_update(request):
+    """Edição em lote dos eventos selecionados na listagem
+    
+    Aceita JSON {"ids": [...], "changes": {"status", "department", "is_public"}}
+    ou formulário com ids repetidos e os mesmos campos.
+    """
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'JSON inválido.'}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({'error': 'JSON inválido.'}, status=400)
+        event_ids = payload.get('ids') or []
+        form = EventBulkUpdateForm(payload.get('changes') or {})
+    else:
+        event_ids = request.POST.getlist('ids')
+        form = EventBulkUpdateForm(request.POST)
+    
+    if not isinstance(event_ids, list) or not event_ids or len(event_ids) > MAX_BULK_UPDATE_EVENTS:
+        return JsonResponse({'error': f'Selecione de 1 a {MAX_BULK_UPDATE_EVENTS} eventos.'}, status=400)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Alterações inválidas.', 'errors': form.errors}, status=400)
+    
+    try:
+        result = bulk_update_events(request.user, event_ids, form.get_changes())
+    except ValueError:
+        return JsonResponse({'error': 'Identificador de evento inválido.'}, status=400)
+    
+    log_user_action(request, request.user, 'bulk_update_events', f'{len(result.updated)} eventos')
+    return JsonResponse({
+        'updated': result.updated,
+        'unchanged': result.unchanged,
+        'denied': result.denied,
+    })
+
+
+@login_required
+@require_POST
+def events_batch_api(request):
+    """Criação e atualização de vários eventos em uma requisição
+    
+    Aceita um array JSON de eventos com os campos do EventForm; itens com
+    "id" atualizam o evento existente (campos ausentes mantêm os valores
+    atuais). Com ``skip_invalid=1`` os itens válidos são gravados mesmo se
+    houver itens com erro; caso contrário nada é gravado.
+    """
+    try:
+        payload = json.loads(request.body or b'[]')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido.'}, status=400)
+    
+    try:
+        result = apply_event_batch(request.user, payload, skip_invalid=request.GET.get('skip_invalid') == '1')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    if result.applied:
+        log_user_action(
+            request, request.user, 'batch_events',
+            f"{result.count('created')} criados, {result.count('updated')} atualizados"
+        )
+    return JsonResponse(result.as_dict(), status=200 if result.applied else 400)
+
+
+# Limite de horários por verificação em lote
+MAX_SLOTS_PER_CHECK = 500
+
+
+def _parse_slots(payload):
+    """Valida os horários enviados para check_location_slots_api"""
+    items = payload.get('slots') if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('Informe a lista "slots" com os horários a verificar.')
+    if len(items) > MAX_SLOTS_PER_CHECK:
+        raise ValueError(f'Máximo de {MAX_SLOTS_PER_CHECK} horários por verificação.')
+    
+    location_ids = {item.get('location') for item in items if isinstance(item, dict)}
+    locations = Location.objects.in_bulk([pk for pk in location_ids if isinstance(pk, int)])
+    
+    slots = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'Horário {position}: formato inválido.')
+        location = locations.get(item.get('location'))
+        start = _parse_range_bound(item.get('start'))
+        end = _parse_range_bound(item.get('end'))
+        if location is None:
+            raise ValueError(f'Horário {position}: localização inexistente.')
+        if start is None or end is None or start >= end:
+            raise ValueError(f'Horário {position}: "start" e "end" inválidos.')
+        slots.append({'location': location, 'start': start, 'end': end, 'exclude': item.get('exclude')})
+    return slots
+
+
+@login_required
+@require_POST
+def check_location_slots_api(request):
+    """Verifica em lote se os horários propostos estão livres nos locais
+    
+    Corpo JSON: {"slots": [{"location": id, "start": ISO, "end": ISO, "exclude": uuid opcional}]}
+    """
+    if not has_permission(request.user, 'create_event'):
+        return JsonResponse({'error': 'Sem permissão para reservar locais.'}, status=403)
+    
+    try:
+        slots = _parse_slots(json.loads(request.body or b'{}'))
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido.'}, status=400)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    
+    results = check_slots(slots)
+    return JsonResponse({
+        'results': [
+            {
+                'index': position,
+                'available': result['available'],
+                'conflicts': [
+                    {
+                        'id': str(row['id']),
+                        'name': row['name'],
+                        'start': row['start_datetime'].isoformat(),
+                        'end': row['end_datetime'].isoformat(),
+                    }
+                    for row in result['conflicts']
+                ],
+                'clashes': result['clashes'],
+            }
+            for position, result in enumerate(results)
+        ]
+    })
+
+
+def _parse_availability_params(params):
+    """Valida os parâmetros de location_availability_api"""
+    try:
+        location_ids = [int(pk) for pk in params.get('locations', '').split(',') if pk.strip()]
+    except ValueError:
+        raise ValueError('O parâmetro "locations" deve ser uma lista de ids separados por vírgula.')
+    max_locations = getattr(settings, 'AVAILABILITY_MAX_LOCATIONS', 50)
+    if not location_ids or len(location_ids) > max_locations:
+        raise ValueError(f'Informe de 1 a {max_locations} locais em "locations".')
+    
+    range_start = _parse_range_bound(params.get('start'))
+    range_end = _parse_range_bound(params.get('end'))
+    if range_start is None or range_end is None or range_start >= range_end:
+        raise ValueError('Os parâmetros "start" e "end" são obrigatórios e "start" deve ser anterior a "end".')
+    max_days = getattr(settings, 'AVAILABILITY_MAX_RANGE_DAYS', 186)
+    if range_end - range_start > timedelta(days=max_days):
+        raise ValueError(f'O período solicitado não pode exceder {max_days} dias.')
+    
+    try:
+        min_duration = timedelta(minutes=int(params.get('min_duration', 60)))
+        work_start = parse_time(params.get('work_start', '08:00'))
+        work_end = parse_time(params.get('work_end', '18:00'))
+    except (ValueError, OverflowError):
+        raise ValueError('Parâmetros "min_duration", "work_start" ou "work_end" inválidos.')
+    # Duração mínima limitada ao período máximo consultável
+    if not timedelta(0) < min_duration <= timedelta(days=max_days) or work_start is None or work_end is None \
+            or work_start >= work_end:
+        raise ValueError('Parâmetros "min_duration", "work_start" ou "work_end" inválidos.')
+    
+    weekdays = range(7) if params.get('weekends') in ('1', 'true') else range(5)
+    return location_ids, range_start, range_end, min_duration, work_start, work_end, weekdays
+
+
+@login_required
+def location_availability_api(request):
+    """Horários livres dos locais no período, dentro do expediente
+    
+    Parâmetros: locations (ids separados por vírgula), start, end,
+    min_duration (minutos, padrão 60), work_start/work_end (HH:MM, padrão
+    08:00-18:00) e weekends=1 para incluir sábados e domingos.
+    """
+    try:
+        location_ids, range_start, range_end, min_duration, work_start, work_end, weekdays = \
+            _parse_availability_params(request.GET)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    
+    locations = list(Location.objects.filter(pk__in=location_ids))
+    free_slots = find_free_slots(locations, range_start, range_end, min_duration,
+                                 work_start, work_end, weekdays)
+    
+    return JsonResponse({
+        'start': range_start.isoformat(),
+        'end': range_end.isoformat(),
+        'locations': [
+            {
+                'id': location.pk,
+                'name': str(location),
+                'free': [
+                    {
+                        'start': timezone.localtime(start).isoformat(),
+                        'end': timezone.localtime(end).isoformat(),
+                        'minutes': int((end - start).total_seconds() // 60),
+                    }
+                    for start, end in free_slots[location.pk]
+                ],
+            }
+            for location in locations
+        ],
     })
 
 
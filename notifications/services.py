@@ -43,6 +43,65 @@ class NotificationService:
         
         return notifications_created
     
+    @staticmethod
+    def create_bulk_event_notifications(events, notification_type, sender=None):
+        """Cria em lote as notificações de vários eventos
+        
+        Destinatários e preferências são resolvidos com poucas consultas para
+        todos os eventos e as notificações são gravadas com bulk_create
+        (importações, transições automáticas e edições em lote).
+        """
+        events = list(events)
+        if not events:
+            return []
+        
+        # Gestores dos departamentos envolvidos, em uma consulta
+        managers = {}
+        if notification_type in ['event_created', 'event_updated', 'event_cancelled']:
+            department_ids = {event.department_id for event in events if event.department_id}
+            dept_users = User.objects.filter(
+                profile__department_id__in=department_ids,
+                profile__user_type__in=['administrador', 'gestor']
+            ).values_list('profile__department_id', 'pk')
+            for department_id, user_id in dept_users:
+                managers.setdefault(department_id, set()).add(user_id)
+        
+        admins = set()
+        if notification_type in ['event_cancelled']:
+            admins = set(User.objects.filter(profile__user_type='administrador').values_list('pk', flat=True))
+        
+        recipients_by_event = []
+        for event in events:
+            recipients = {event.responsible_person_id} | managers.get(event.department_id, set()) | admins
+            recipients.discard(event.created_by_id)
+            recipients_by_event.append((event, recipients))
+        
+        all_recipients = set().union(*(recipients for _, recipients in recipients_by_event))
+        preferences = NotificationService._get_bulk_preferences(all_recipients)
+        priority = NotificationService._get_priority_for_type(notification_type)
+        
+        notifications = []
+        for event, recipients in recipients_by_event:
+            title = NotificationService._get_notification_title(event, notification_type)
+            message = NotificationService._get_notification_message(event, notification_type)
+            action_url = event.get_absolute_url()
+            for recipient_id in recipients:
+                if not NotificationService._should_send_notification(notification_type, preferences[recipient_id]):
+                    continue
+                notifications.append(Notification(
+                    recipient_id=recipient_id,
+                    sender_id=sender.pk if sender else event.created_by_id,
+                    notification_type=notification_type,
+                    priority=priority,
+                    title=title,
+                    message=message,
+                    event=event,
+                    action_url=action_url,
+                    action_text="Ver Evento"
+                ))
+        
+        return Notification.objects.bulk_create(notifications, batch_size=500)
+    
     @staticmethod
     def create_reminder_notifications():
         """Cria notificações de lembrete para eventos próximos"""
@@ -166,6 +225,19 @@ class NotificationService:
         preferences, created = NotificationPreference.objects.get_or_create(user=user)
         return preferences
     
+    @staticmethod
+    def _get_bulk_preferences(user_ids):
+        """Preferências de vários usuários; cria as ausentes com os valores padrão"""
+        preferences = {
+            preference.user_id: preference
+            for preference in NotificationPreference.objects.filter(user_id__in=user_ids)
+        }
+        missing = [NotificationPreference(user_id=user_id) for user_id in user_ids if user_id not in preferences]
+        if missing:
+            NotificationPreference.objects.bulk_create(missing, ignore_conflicts=True)
+            preferences.update((preference.user_id, preference) for preference in missing)
+        return preferences
+    
     @staticmethod
     def _should_send_notification(notification_type, preferences):
         """Verifica se deve enviar notificação baseado nas preferências"""
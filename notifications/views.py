@@ -13,10 +13,19 @@ from .forms import NotificationPreferenceForm
 from accounts.utils import log_user_action
 
 
+def user_notifications(user):
+    """Notificações visíveis do usuário
+    
+    As de eventos excluídos ficam ocultas até serem removidas em segundo plano
+    (purge_deleted_events); notificações sem evento continuam visíveis.
+    """
+    return user.notifications.filter(event__deleted_at__isnull=True)
+
+
 @login_required
 def notification_list(request):
     """Lista de notificações do usuário"""
-    notifications = request.user.notifications.order_by('-created_at')
+    notifications = user_notifications(request.user).order_by('-created_at')
     
     # Filtros
     filter_type = request.GET.get('type', '')
@@ -36,7 +45,7 @@ def notification_list(request):
     page_obj = paginator.get_page(page_number)
     
     # Contar não lidas
-    unread_count = request.user.notifications.filter(is_read=False).count()
+    unread_count = user_notifications(request.user).filter(is_read=False).count()
     
     context = {
         'notifications': page_obj,
@@ -53,7 +62,7 @@ def notification_list(request):
 @login_required
 def mark_as_read(request, pk):
     """Marca uma notificação como lida"""
-    notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
+    notification = get_object_or_404(user_notifications(request.user), pk=pk)
     
     if request.method == 'POST':
         notification.mark_as_read()
@@ -76,7 +85,7 @@ def mark_as_read(request, pk):
 def mark_all_as_read(request):
     """Marca todas as notificações como lidas"""
     if request.method == 'POST':
-        unread_notifications = request.user.notifications.filter(is_read=False)
+        unread_notifications = user_notifications(request.user).filter(is_read=False)
         count = unread_notifications.count()
         
         for notification in unread_notifications:
@@ -97,14 +106,14 @@ def mark_all_as_read(request):
 @login_required
 def get_unread_count(request):
     """Retorna o número de notificações não lidas (AJAX)"""
-    count = request.user.notifications.filter(is_read=False).count()
+    count = user_notifications(request.user).filter(is_read=False).count()
     return JsonResponse({'count': count})
 
 
 @login_required
 def get_recent_notifications(request):
     """Retorna notificações recentes (AJAX)"""
-    notifications = request.user.notifications.filter(
+    notifications = user_notifications(request.user).filter(
         is_read=False
     ).order_by('-created_at')[:5]
     
@@ -163,7 +172,7 @@ def delete_notification(request, pk):
 @login_required
 def notification_detail(request, pk):
     """Detalhe da notificação"""
-    notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
+    notification = get_object_or_404(user_notifications(request.user), pk=pk)
     
     # Marcar como lida automaticamente
     if not notification.is_read:
@@ -3,8 +3,10 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse, JsonResponse
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db.models import Count
 from datetime import datetime, timedelta
+from collections import Counter
+from itertools import chain
 import json
 import time
 import os
@@ -25,7 +27,11 @@ from openpyxl.utils import get_column_letter
 
 from .models import Report, ReportExecution
 from events.models import Event, EventType, Department, Location
+from events.search import search_events, annotate_search
+from events.archive import archive_reaches, get_user_accessible_archived_events
+from events.conditional import conditional_event_data
 from accounts.utils import get_user_accessible_events, has_permission
+from accounts.name_index import search_user_ids
 from accounts.models import User
 
 
@@ -103,6 +109,7 @@ def reports_view(request):
 
 
 @login_required
+@conditional_event_data('report_data', department_param='departments')
 def report_data_api(request):
     """API endpoint to fetch report data dynamically"""
     if not has_permission(request.user, 'view_reports'):
@@ -125,52 +132,19 @@ def report_data_api(request):
     if end_date:
         end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
     
-    # Base queryset
-    events = get_user_accessible_events(request.user)
-    
-    # Apply date filters
-    if start_date:
-        events = events.filter(start_datetime__date__gte=start_date)
-    if end_date:
-        events = events.filter(start_datetime__date__lte=end_date)
-    
-    # Apply status filter
-    if status:
-        events = events.filter(status=status)
-    
-    # Apply department filter
-    if department_ids:
-        events = events.filter(department_id__in=department_ids)
-    
-    # Apply event type filter
-    if event_type_ids:
-        events = events.filter(event_type_id__in=event_type_ids)
-    
-    # Apply location filter
-    if location_ids:
-        events = events.filter(location_id__in=location_ids)
-    
-    # Apply search filter
-    if search:
-        events = events.filter(
-            Q(name__icontains=search) | 
-            Q(description__icontains=search)
-        )
-    
-    # Apply responsible person search filter
-    if responsible_search:
-        events = events.filter(
-            Q(responsible_person__first_name__icontains=responsible_search) |
-            Q(responsible_person__last_name__icontains=responsible_search) |
-            Q(responsible_person__username__icontains=responsible_search)
-        )
+    # Filtered querysets (main table and, when the period reaches it, the archive)
+    querysets = get_report_querysets(
+        request.user, start_date=start_date, end_date=end_date, status=status,
+        department_ids=department_ids, event_type_ids=event_type_ids, location_ids=location_ids,
+        search=search, responsible_search=responsible_search,
+    )
     
     # Prepare response data
     data = {
-        'total_events': events.count(),
-        'completed_events': events.filter(status='concluido').count(),
-        'departments_count': events.values('department').distinct().count(),
-        'event_types_count': events.values('event_type').distinct().count(),
+        'total_events': sum(events.count() for events in querysets),
+        'completed_events': sum(events.filter(status='concluido').count() for events in querysets),
+        'departments_count': _count_distinct(querysets, 'department'),
+        'event_types_count': _count_distinct(querysets, 'event_type'),
     }
     
     # Add comparison data if dates are provided
@@ -178,37 +152,90 @@ def report_data_api(request):
         comparison_data = get_comparison_data(request.user, start_date, end_date)
         data['comparison'] = comparison_data
     
-    # Add events data
+    # Add events data (archived events fill the sample after the main table)
     events_data = []
-    for event in events.select_related('event_type', 'department', 'responsible_person')[:25]:
-        events_data.append({
-            'id': str(event.id),
-            'name': event.name,
-            'event_type': event.event_type.name,
-            'department': event.department.name,
-            'start_datetime': event.start_datetime.strftime('%d/%m/%Y %H:%M'),
-            'status': event.get_status_display(),
-            'responsible_person': f"{event.responsible_person.get_full_name() or event.responsible_person.username}",
-        })
+    for events in querysets:
+        sample_events = events.only(
+            'id', 'name', 'start_datetime', 'status', 'event_type_label', 'department_name', 'responsible_name'
+        )
+        if search:
+            # Com busca, os eventos mais relevantes primeiro
+            sample_events = annotate_search(sample_events, search).order_by('search_rank', '-start_datetime')
+        for event in sample_events[:25 - len(events_data)]:
+            events_data.append({
+                'id': str(event.id),
+                'name': event.name,
+                'event_type': event.event_type_label,
+                'department': event.department_name,
+                'start_datetime': event.start_datetime.strftime('%d/%m/%Y %H:%M'),
+                'status': event.get_status_display(),
+                'responsible_person': event.responsible_name,
+            })
+        if len(events_data) >= 25:
+            break
     
     data['events'] = events_data
     
     # Add chart data
-    data['events_by_type'] = list(
-        events.values('event_type__name')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:5]
-    )
-    
-    data['events_by_department'] = list(
-        events.values('department__name')
-        .annotate(count=Count('id'))
-        .order_by('-count')[:5]
-    )
+    data['events_by_type'] = _top_counts(querysets, 'event_type__name')
+    data['events_by_department'] = _top_counts(querysets, 'department__name')
     
     return JsonResponse(data)
 
 
+def filter_report_events(events, start_date=None, end_date=None, status=None, department_ids=None,
+                         event_type_ids=None, location_ids=None, search=None, responsible_search=None):
+    """Apply the report filters to an event queryset (main table or archive)"""
+    if start_date:
+        events = events.filter(start_datetime__date__gte=start_date)
+    if end_date:
+        events = events.filter(start_datetime__date__lte=end_date)
+    if status:
+        events = events.filter(status=status)
+    if department_ids:
+        events = events.filter(department_id__in=department_ids)
+    if event_type_ids:
+        events = events.filter(event_type_id__in=event_type_ids)
+    if location_ids:
+        events = events.filter(location_id__in=location_ids)
+    if search:
+        events = search_events(events, search)
+    if responsible_search:
+        events = events.filter(responsible_person_id__in=search_user_ids(responsible_search))
+    return events
+
+
+def get_report_querysets(user, start_date=None, **filters):
+    """Filtered events of the main table plus the archive when the period reaches it"""
+    querysets = [filter_report_events(get_user_accessible_events(user), start_date, **filters)]
+    if archive_reaches(start_date):
+        querysets.append(
+            filter_report_events(get_user_accessible_archived_events(user), start_date, **filters)
+        )
+    return querysets
+
+
+def _count_distinct(querysets, field):
+    """Number of distinct values of field across the querysets"""
+    if len(querysets) == 1:
+        return querysets[0].values(field).distinct().count()
+    values = set()
+    for events in querysets:
+        values.update(events.values_list(field, flat=True).distinct())
+    return len(values)
+
+
+def _top_counts(querysets, field, limit=5):
+    """Top values of field by event count (all of them when limit is None), summed across the querysets"""
+    if len(querysets) == 1:
+        return list(querysets[0].values(field).annotate(count=Count('id')).order_by('-count')[:limit])
+    counts = Counter()
+    for events in querysets:
+        for row in events.values(field).annotate(count=Count('id')).order_by():
+            counts[row[field]] += row['count']
+    return [{field: value, 'count': count} for value, count in counts.most_common(limit)]
+
+
 @login_required
 def locations_api(request):
     """API endpoint to fetch locations for dropdown"""
@@ -240,25 +267,17 @@ def get_comparison_data(user, start_date, end_date):
     previous_start_date = previous_end_date - timedelta(days=current_period_days - 1)
     
     # Get events for previous period
-    previous_events = get_user_accessible_events(user)
-    previous_events = previous_events.filter(
-        start_datetime__date__gte=previous_start_date,
-        start_datetime__date__lte=previous_end_date
-    )
+    previous_events = get_report_querysets(user, start_date=previous_start_date, end_date=previous_end_date)
     
     # Get events for current period
-    current_events = get_user_accessible_events(user)
-    current_events = current_events.filter(
-        start_datetime__date__gte=start_date,
-        start_datetime__date__lte=end_date
-    )
+    current_events = get_report_querysets(user, start_date=start_date, end_date=end_date)
     
     # Calculate metrics
-    previous_total = previous_events.count()
-    current_total = current_events.count()
+    previous_total = sum(events.count() for events in previous_events)
+    current_total = sum(events.count() for events in current_events)
     
-    previous_completed = previous_events.filter(status='concluido').count()
-    current_completed = current_events.filter(status='concluido').count()
+    previous_completed = sum(events.filter(status='concluido').count() for events in previous_events)
+    current_completed = sum(events.filter(status='concluido').count() for events in current_events)
     
     # Calculate changes
     total_change = current_total - previous_total
@@ -314,15 +333,11 @@ def trend_data_api(request):
             else:
                 end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
         
-        # Get events for this month
-        events = get_user_accessible_events(request.user)
-        events = events.filter(
-            start_datetime__date__gte=start_date,
-            start_datetime__date__lte=end_date
-        )
+        # Get events for this month (archived events when the month reaches the archive)
+        querysets = get_report_querysets(request.user, start_date=start_date, end_date=end_date)
         
         months.append(start_date.strftime('%b %Y'))
-        event_counts.append(events.count())
+        event_counts.append(sum(events.count() for events in querysets))
     
     return JsonResponse({
         'months': months,
@@ -368,33 +383,12 @@ def export_report(request):
             
             name = f"{report_type_label}{period_str}"
             
-            # Get filtered events data directly
-            events = get_user_accessible_events(request.user)
-            
-            # Apply all filters
-            if start_date:
-                events = events.filter(start_datetime__date__gte=start_date)
-            if end_date:
-                events = events.filter(start_datetime__date__lte=end_date)
-            if status:
-                events = events.filter(status=status)
-            if department_ids:
-                events = events.filter(department_id__in=department_ids)
-            if event_type_ids:
-                events = events.filter(event_type_id__in=event_type_ids)
-            if location_ids:
-                events = events.filter(location_id__in=location_ids)
-            if search:
-                events = events.filter(
-                    Q(name__icontains=search) | 
-                    Q(description__icontains=search)
-                )
-            if responsible_search:
-                events = events.filter(
-                    Q(responsible_person__first_name__icontains=responsible_search) |
-                    Q(responsible_person__last_name__icontains=responsible_search) |
-                    Q(responsible_person__username__icontains=responsible_search)
-                )
+            # Get filtered events data directly (archived events when the period reaches them)
+            querysets = get_report_querysets(
+                request.user, start_date=start_date, end_date=end_date, status=status,
+                department_ids=department_ids, event_type_ids=event_type_ids, location_ids=location_ids,
+                search=search, responsible_search=responsible_search,
+            )
             
             # Create export data structure
             export_data = {
@@ -402,7 +396,8 @@ def export_report(request):
                 'report_type': report_type,
                 'start_date': start_date,
                 'end_date': end_date,
-                'events': events,
+                'events': querysets[0],
+                'archived_events': querysets[1] if len(querysets) > 1 else None,
                 'created_by': request.user,
                 'format': format_type
             }
@@ -432,49 +427,38 @@ def export_report(request):
 
 def get_report_data(report):
     """Obter dados para o relatório"""
-    # Filtros base
-    events = get_user_accessible_events(report.created_by)
-    events = events.filter(
-        start_datetime__date__gte=report.start_date,
-        start_datetime__date__lte=report.end_date
+    # Filtros base e adicionais (inclui o arquivo quando o período o alcança)
+    querysets = get_report_querysets(
+        report.created_by,
+        start_date=report.start_date,
+        end_date=report.end_date,
+        department_ids=list(report.departments.values_list('pk', flat=True)),
+        event_type_ids=list(report.event_types.values_list('pk', flat=True)),
     )
     
-    # Aplicar filtros adicionais
-    if hasattr(report, 'departments') and report.departments.exists():
-        events = events.filter(department__in=report.departments.all())
-    
-    if hasattr(report, 'event_types') and report.event_types.exists():
-        events = events.filter(event_type__in=report.event_types.all())
-    
     # Retornar dados baseado no tipo de relatório
     if report.report_type == 'events_by_period':
-        return list(events.values(
+        return list(chain(*(events.values(
             'name', 'start_datetime', 'end_datetime', 'location__name',
             'event_type__name', 'status', 'description'
-        ))
+        ) for events in querysets)))
     
     elif report.report_type == 'events_by_type':
-        return list(events.values('event_type__name').annotate(
-            count=Count('id')
-        ).order_by('-count'))
+        return _top_counts(querysets, 'event_type__name', limit=None)
     
     elif report.report_type == 'events_by_department':
-        return list(events.values('department__name').annotate(
-            count=Count('id')
-        ).order_by('-count'))
+        return _top_counts(querysets, 'department__name', limit=None)
     
     elif report.report_type == 'events_by_status':
-        return list(events.values('status').annotate(
-            count=Count('id')
-        ).order_by('-count'))
+        return _top_counts(querysets, 'status', limit=None)
     
     else:
         # Relatório padrão com todos os campos
-        return list(events.values(
+        return list(chain(*(events.values(
             'name', 'start_datetime', 'end_datetime', 'location__name',
             'event_type__name', 'department__name', 'status', 'description',
             'responsible_person__first_name', 'responsible_person__last_name'
-        ))
+        ) for events in querysets)))
 
 
 def generate_pdf_report(report):
@@ -747,6 +731,17 @@ def generate_csv_report(report):
     return csv_content, filename
 
 
+def get_export_events(export_data):
+    """Events to export (main table, then archive) and their total
+
+    Display names come from the denormalized columns, so no joins are needed.
+    """
+    querysets = [export_data['events']]
+    if export_data.get('archived_events') is not None:
+        querysets.append(export_data['archived_events'])
+    return chain(*querysets), sum(events.count() for events in querysets)
+
+
 def generate_dynamic_pdf_report(export_data):
     """Generate PDF report from dynamic data"""
     buffer = BytesIO()
@@ -783,9 +778,9 @@ def generate_dynamic_pdf_report(export_data):
     elements.append(Spacer(1, 20))
     
     # Get events data
-    events = export_data['events'].select_related('event_type', 'department', 'location', 'responsible_person')
+    events, total = get_export_events(export_data)
     
-    if not events.exists():
+    if not total:
         elements.append(Paragraph("Nenhum evento encontrado para os critérios especificados.", styles['Normal']))
     else:
         # Create table
@@ -795,22 +790,14 @@ def generate_dynamic_pdf_report(export_data):
         ]]
         
         for event in events:
-            responsible_name = ''
-            if event.responsible_person:
-                responsible_name = event.responsible_person.get_full_name() or event.responsible_person.username
-            
-            location_name = ''
-            if event.location:
-                location_name = event.location.custom_name or event.location.name
-            
             table_data.append([
                 event.name[:30] + '...' if len(event.name) > 30 else event.name,
-                event.event_type.name,
-                event.department.name,
+                event.event_type_label,
+                event.department_name,
                 event.start_datetime.strftime('%d/%m/%Y %H:%M'),
                 event.get_status_display(),
-                responsible_name,
-                location_name
+                event.responsible_name,
+                event.location_display
             ])
         
         # Create table
@@ -832,7 +819,7 @@ def generate_dynamic_pdf_report(export_data):
         
         # Summary
         elements.append(Spacer(1, 20))
-        elements.append(Paragraph(f"Total de eventos: {events.count()}", styles['Normal']))
+        elements.append(Paragraph(f"Total de eventos: {total}", styles['Normal']))
     
     # Build PDF
     doc.build(elements)
@@ -876,9 +863,9 @@ def generate_dynamic_excel_report(export_data):
     row += 2
     
     # Get events data
-    events = export_data['events'].select_related('event_type', 'department', 'location', 'responsible_person')
+    events, total = get_export_events(export_data)
     
-    if not events.exists():
+    if not total:
         ws[f'A{row}'] = "Nenhum evento encontrado para os critérios especificados."
     else:
         # Headers
@@ -894,23 +881,15 @@ def generate_dynamic_excel_report(export_data):
         # Data
         for event in events:
             row += 1
-            responsible_name = ''
-            if event.responsible_person:
-                responsible_name = event.responsible_person.get_full_name() or event.responsible_person.username
-            
-            location_name = ''
-            if event.location:
-                location_name = event.location.custom_name or event.location.name
-            
             data_row = [
                 event.name,
-                event.event_type.name,
-                event.department.name,
+                event.event_type_label,
+                event.department_name,
                 event.start_datetime.strftime('%d/%m/%Y %H:%M'),
                 event.end_datetime.strftime('%d/%m/%Y %H:%M') if event.end_datetime else '',
                 event.get_status_display(),
-                responsible_name,
-                location_name,
+                event.responsible_name,
+                event.location_display,
                 event.description or ''
             ]
             
@@ -956,9 +935,9 @@ def generate_dynamic_csv_report(export_data):
     writer.writerow([])  # Empty line
     
     # Get events data
-    events = export_data['events'].select_related('event_type', 'department', 'location', 'responsible_person')
+    events, total = get_export_events(export_data)
     
-    if not events.exists():
+    if not total:
         writer.writerow(['Nenhum evento encontrado para os critérios especificados.'])
     else:
         # Headers
@@ -966,23 +945,15 @@ def generate_dynamic_csv_report(export_data):
         
         # Data
         for event in events:
-            responsible_name = ''
-            if event.responsible_person:
-                responsible_name = event.responsible_person.get_full_name() or event.responsible_person.username
-            
-            location_name = ''
-            if event.location:
-                location_name = event.location.custom_name or event.location.name
-            
             writer.writerow([
                 event.name,
-                event.event_type.name,
-                event.department.name,
+                event.event_type_label,
+                event.department_name,
                 event.start_datetime.strftime('%d/%m/%Y %H:%M'),
                 event.end_datetime.strftime('%d/%m/%Y %H:%M') if event.end_datetime else '',
                 event.get_status_display(),
-                responsible_name,
-                location_name,
+                event.responsible_name,
+                event.location_display,
                 event.description or ''
             ])
     